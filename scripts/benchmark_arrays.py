@@ -0,0 +1,46 @@
+# coding=utf-8
+"""Benchmark the NumPy export of UWG batches against per-model dict conversion."""
+from uwg_schema.arrays import to_arrays, from_arrays, SCALAR_NAMES
+from uwg_schema.generator import ModelGenerator
+from uwg_schema.model import UWG
+
+import argparse
+import time
+
+
+def timed(label, func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    print('{:<40}{:>10.3f} s'.format(label, time.perf_counter() - start))
+    return result
+
+
+def dict_export(models):
+    """Convert field by field through .dict(), the approach to_arrays replaces."""
+    rows = []
+    for model in models:
+        data = model.dict()
+        rows.append([data[name] for name in SCALAR_NAMES])
+    return rows, [model.schtraffic for model in models]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    # tile a set of unique models to the requested size
+    generator = ModelGenerator(seed=args.seed, custom_buildings=0)
+    unique = [generator.instance(UWG) for _ in range(1000)]
+    models = [unique[i % len(unique)] for i in range(args.rows)]
+    bld = [model.bld for model in models]
+    print('{} UWG models'.format(len(models)))
+
+    timed('.dict() export', dict_export, models)
+    records, schtraffic = timed('to_arrays', to_arrays, models)
+    payloads = timed('.dict() for parse_obj', lambda: [m.dict() for m in models])
+    timed('UWG.parse_obj', lambda: [UWG.parse_obj(p) for p in payloads])
+    timed('from_arrays', from_arrays, records, schtraffic, bld)
+    timed('from_arrays (validate=False)', from_arrays, records, schtraffic, bld,
+          validate=False)
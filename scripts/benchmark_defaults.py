@@ -0,0 +1,39 @@
+# coding=utf-8
+"""Measure the time and memory of UWG models with and without shared defaults."""
+from uwg_schema.defaults import shared_defaults
+from uwg_schema.model import UWG
+
+import argparse
+import gc
+import time
+import tracemalloc
+
+PARAMS = dict(bldheight=10, blddensity=0.5, vertohor=0.5, grasscover=0.1,
+              treecover=0.1, zone='1A', h_mix=1)
+
+
+def measure(count):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    models = [UWG(**PARAMS) for _ in range(count)]
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del models
+    return current, elapsed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=100000)
+    args = parser.parse_args()
+
+    copied, copied_time = measure(args.count)
+    with shared_defaults():
+        shared, shared_time = measure(args.count)
+    print('{} UWG models'.format(args.count))
+    print('{:<20}{:>12.1f} MB{:>10.2f} s'.format(
+        'copied defaults', copied / 1e6, copied_time))
+    print('{:<20}{:>12.1f} MB{:>10.2f} s'.format(
+        'shared defaults', shared / 1e6, shared_time))
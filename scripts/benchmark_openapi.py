@@ -0,0 +1,69 @@
+# coding=utf-8
+"""Time OpenAPI generation on synthetic model graphs of growing size."""
+from uwg_schema._base import type_tag
+from uwg_schema._openapi import default_stages, run_stages, _base_open_api
+
+import argparse
+import copy
+import time
+from typing import List, Optional
+
+from pydantic import Field, create_model
+from pydantic.schema import schema
+
+
+def model_graph(count, fields=12):
+    """Return count models that form a binary tree of references.
+
+    Model i refers to model (i - 1) // 2 so that the depth of the graph grows with
+    the log of the count, like the nested definitions of the UWG schema.
+    """
+    models = []
+    for i in range(count):
+        values = {
+            'type': (type_tag('Node{}'.format(i)), 'Node{}'.format(i)),
+            'name': (str, ...),
+        }
+        for j in range(fields):
+            values['value_{}'.format(j)] = \
+                (float, Field(0.0, ge=0)) if j % 2 else (Optional[int], None)
+        values['matrix'] = (List[List[float]], ...)
+        if models:
+            ref = models[(i - 1) // 2]
+            values['child'] = (Optional[ref], None)
+            values['children'] = (List[ref], [])
+        models.append(create_model('Node{}'.format(i), **values))
+    return models
+
+
+def best(func, repeat):
+    """Return the best time of a function call."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[50, 100, 200, 400])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print('{:>8}{:>14}{:>14}{:>16}'.format(
+        'models', 'schema ms', 'stages ms', 'stages us/model'))
+    for size in args.sizes:
+        models = model_graph(size)
+        schema_time = best(
+            lambda: schema(models, ref_prefix='#/components/schemas/'), args.repeat)
+        schemas = schema(models, ref_prefix='#/components/schemas/')['definitions']
+
+        # the stages change the schemas in place so each run gets its own copy
+        copies = [copy.deepcopy(schemas) for _ in range(args.repeat)]
+        stage_time = best(lambda: run_stages(copy.deepcopy(_base_open_api),
+                                             copies.pop(), default_stages()),
+                          args.repeat)
+        print('{:>8}{:>14.1f}{:>14.2f}{:>16.1f}'.format(
+            size, schema_time * 1000, stage_time * 1000, stage_time * 1e6 / size))
@@ -0,0 +1,53 @@
+# coding=utf-8
+"""Compare dispatching UWG models to worker processes as models, packed or shared."""
+from uwg_schema.generator import ModelGenerator
+from uwg_schema.model import UWG
+from uwg_schema.transport import pack, SharedModels
+
+import argparse
+import pickle
+import time
+from multiprocessing import Pool
+
+
+def work(model):
+    """Stand-in for a simulation that reads the schedules of the model."""
+    return sum(sum(row) for row in model.schtraffic)
+
+
+def dispatch(pool, items, chunksize, repeat):
+    """Return the best time to map work over the items."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        pool.map(work, items, chunksize=chunksize)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=2000)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--chunksize', type=int, default=16)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    generator = ModelGenerator(seed=0, custom_buildings=4, layers=4)
+    models = [generator.instance(UWG) for _ in range(args.count)]
+    print('{:<10}{:>14}{:>14}'.format('transfer', 'pickle B/obj', 'dispatch s'))
+    with Pool(args.workers) as pool:
+        pool.map(work, models[:args.workers])  # start the workers
+        size = sum(len(pickle.dumps(m)) for m in models) / args.count
+        elapsed = dispatch(pool, models, args.chunksize, args.repeat)
+        print('{:<10}{:>14.0f}{:>14.3f}'.format('model', size, elapsed))
+
+        packed = [pack(m) for m in models]
+        size = sum(len(pickle.dumps(p)) for p in packed) / args.count
+        elapsed = dispatch(pool, packed, args.chunksize, args.repeat)
+        print('{:<10}{:>14.0f}{:>14.3f}'.format('pack', size, elapsed))
+
+        with SharedModels(models) as shared:
+            size = sum(len(pickle.dumps(r)) for r in shared.refs) / args.count
+            elapsed = dispatch(pool, shared.refs, args.chunksize, args.repeat)
+            print('{:<10}{:>14.0f}{:>14.3f}'.format('shared', size, elapsed))
@@ -0,0 +1,65 @@
+# coding=utf-8
+"""Compare the type tag check with a constr regex on nested ref_bem_vector payloads."""
+from uwg_schema._base import NoExtraBaseModel, type_tag
+from uwg_schema.model import UWG
+from uwg_schema.samples import sample_custom_uwg, synthetic_definitions
+
+import argparse
+import time
+from typing import List
+
+from pydantic import constr
+
+
+class RegexMaterial(NoExtraBaseModel):
+    type: constr(regex='^Material$') = 'Material'
+
+
+class TagMaterial(NoExtraBaseModel):
+    type: type_tag('Material') = 'Material'
+
+
+class RegexLayers(NoExtraBaseModel):
+    material_lst: List[RegexMaterial]
+
+
+class TagLayers(NoExtraBaseModel):
+    material_lst: List[TagMaterial]
+
+
+def best(func, repeat):
+    """Return the best time of a function call."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--buildings', type=int, default=48)
+    parser.add_argument('--count', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    layers = {'material_lst': [{'type': 'Material'}] * 10000}
+    for model in (RegexLayers, TagLayers):
+        seconds = best(lambda: model.parse_obj(layers), args.repeat)
+        print('{:<12}{:>10.2f} us/tag'.format(model.__name__, seconds * 100))
+
+    # a custom UWG with one BEMDef and SchDef per building, about 9 tags each
+    bems, schs, bld = [], [], []
+    for i in range(args.buildings):
+        bemdef, schdef = synthetic_definitions('4A', 'largeoffice', 'new')
+        name = 'custom_{}'.format(i)
+        bems.append(dict(bemdef.dict(), bldtype=name))
+        schs.append(dict(schdef.dict(), bldtype=name))
+        bld.append((name, 'new', 1.0 / args.buildings))
+    payload = dict(sample_custom_uwg().dict(), bld=bld, ref_bem_vector=bems,
+                   ref_sch_vector=schs)
+    seconds = best(lambda: [UWG.parse_obj(payload) for _ in range(args.count)],
+                   args.repeat)
+    print('UWG with {} buildings: {:.2f} ms/payload'.format(
+        args.buildings, seconds * 1000 / args.count))
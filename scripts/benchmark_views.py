@@ -0,0 +1,47 @@
+# coding=utf-8
+"""Compare memory, attribute access and pickling of models and read-only views."""
+from uwg_schema.generator import ModelGenerator
+from uwg_schema.ref_bld_template import Material, Element, Building
+from uwg_schema.views import to_view
+
+import argparse
+import gc
+import pickle
+import time
+import timeit
+import tracemalloc
+
+
+def traced(func):
+    gc.collect()
+    tracemalloc.start()
+    result = func()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=50000)
+    args = parser.parse_args()
+
+    generator = ModelGenerator(seed=0)
+    print('{:<18}{:>14}{:>14}{:>14}{:>14}'.format(
+        'object', 'bytes/obj', 'access ns', 'pickle B', 'pickle us'))
+    for model in (Material, Element, Building):
+        payloads = [generator.payload(model) for _ in range(100)]
+        models, model_bytes = traced(
+            lambda: [model.parse_obj(payloads[i % 100]) for i in range(args.count)])
+        views, view_bytes = traced(lambda: [to_view(m) for m in models])
+        for label, items, size in (('model', models, model_bytes),
+                                   ('view', views, view_bytes)):
+            item = items[0]
+            access = timeit.timeit(lambda: item.type, number=100000) / 100000
+            data = pickle.dumps(items[:1000])
+            start = time.perf_counter()
+            pickle.loads(data)
+            unpickle = (time.perf_counter() - start) / 1000
+            print('{:<18}{:>14.0f}{:>14.1f}{:>14.0f}{:>14.2f}'.format(
+                '{} {}'.format(model.__name__, label), size / args.count,
+                access * 1e9, len(data) / 1000, unpickle * 1e6))
@@ -0,0 +1,36 @@
+# coding=utf-8
+"""Compare the size and parse time of SchDef payloads with encoded week matrices."""
+from uwg_schema.ref_bld_template import SchDef
+from uwg_schema.week_matrix import compact_json
+
+import argparse
+import json
+import os
+import timeit
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--number', type=int, default=2000)
+    args = parser.parse_args()
+
+    with open(os.path.join(root, 'samples', 'schdef.json')) as inf:
+        sample = inf.read()
+    schdef = SchDef.parse_raw(sample)
+    payloads = [
+        ('sample', sample),
+        ('json', schdef.json()),
+        ('float64', compact_json(schdef, 'float64')),
+        ('float32', compact_json(schdef, 'float32')),
+        ('uint8', compact_json(schdef, 'uint8')),
+        ('auto', compact_json(schdef))
+    ]
+    print('{:<10}{:>10}{:>14}{:>14}'.format(
+        'payload', 'bytes', 'json.loads us', 'parse_raw us'))
+    for label, text in payloads:
+        loads = timeit.timeit(lambda: json.loads(text), number=args.number)
+        parse = timeit.timeit(lambda: SchDef.parse_raw(text), number=args.number)
+        print('{:<10}{:>10}{:>14.1f}{:>14.1f}'.format(
+            label, len(text), loads / args.number * 1e6, parse / args.number * 1e6))
@@ -0,0 +1,40 @@
+# coding=utf-8
+"""Profile the time and memory of parse_obj, dict, copy and json for each model."""
+from uwg_schema.profiling import MODELS, OPERATIONS, profile_models, write_profile, \
+    compare_profiles
+
+import argparse
+import json
+import sys
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--models', nargs='+', choices=list(MODELS), default=None)
+    parser.add_argument('--operations', nargs='+', choices=list(OPERATIONS),
+                        default=None)
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', default=None,
+                        help='Optional JSON file for the report. Defaults to stdout.')
+    parser.add_argument('--baseline', default=None,
+                        help='Optional JSON report to check the new report against.')
+    parser.add_argument('--tolerance', type=float, default=0.1)
+    args = parser.parse_args()
+
+    report = profile_models(args.models, args.operations, args.scales, args.top,
+                            args.repeat)
+    if args.output:
+        write_profile(args.output, report)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    if args.baseline:
+        with open(args.baseline) as inf:
+            baseline = json.load(inf)
+        regressions = compare_profiles(baseline, report, tolerance=args.tolerance)
+        for r in regressions:
+            sys.stderr.write('{model} {operation} x{scale}: {metric} {baseline} -> '
+                             '{current}\n'.format(**r))
+        sys.exit(1 if regressions else 0)
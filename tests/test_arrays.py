@@ -0,0 +1,97 @@
+from uwg_schema.generator import ModelGenerator
+from uwg_schema.model import UWG
+from pydantic import ValidationError
+import pytest
+
+np = pytest.importorskip('numpy')
+from uwg_schema.arrays import to_arrays, from_arrays, SCALAR_NAMES  # noqa: E402
+
+
+def test_round_trip():
+    generator = ModelGenerator(seed=0, custom_buildings=0)
+    models = [generator.instance(UWG) for _ in range(20)]
+    records, schtraffic = to_arrays(models)
+    assert records.shape == (20,)
+    assert records.dtype.names == SCALAR_NAMES
+    assert schtraffic.shape == (20, 3, 24)
+    assert records['bldheight'][3] == models[3].bldheight
+    assert schtraffic[5].tolist() == models[5].schtraffic
+
+    new_models = from_arrays(records, schtraffic, bld=[m.bld for m in models])
+    assert new_models == models
+    for model in new_models:
+        assert UWG.parse_obj(model.dict()) == model
+
+
+def test_optional_defaults():
+    model = UWG(bldheight=10, blddensity=0.5, vertohor=0.5, grasscover=0.1,
+                treecover=0.1, zone='1A', h_mix=1)
+    records, _ = to_arrays([model])
+    assert np.isnan(records['shgc'][0])
+    new_model = from_arrays(records)[0]
+    assert new_model.shgc is None
+    assert new_model.bld == model.bld
+    assert new_model.schtraffic == model.schtraffic
+
+
+def test_invalid_values():
+    generator = ModelGenerator(seed=1, custom_buildings=0)
+    records, schtraffic = to_arrays([generator.instance(UWG) for _ in range(10)])
+    records['bldheight'][2] = -1
+    records['zone'][4] = '9Z'
+    records['blddensity'][6] = np.nan
+    with pytest.raises(ValidationError) as error:
+        from_arrays(records, schtraffic)
+    locs = sorted(e['loc'] for e in error.value.errors())
+    assert locs == [(2, 'bldheight'), (4, 'zone'), (6, 'blddensity')]
+
+    with pytest.raises(ValidationError):
+        from_arrays(records[:1], bld=[[['largeoffice', 'new', 0.5]]], validate=False)
+
+
+def test_missing_columns():
+    generator = ModelGenerator(seed=2, custom_buildings=0)
+    records, _ = to_arrays([generator.instance(UWG) for _ in range(2)])
+    names = [n for n in records.dtype.names if n not in ('bldheight', 'zone')]
+    with pytest.raises(ValidationError) as error:
+        from_arrays(records[names])
+    errors = sorted(error.value.errors(), key=lambda e: e['loc'])
+    assert [e['loc'] for e in errors] == [('bldheight',), ('zone',)]
+    assert all(e['type'] == 'value_error.missing' for e in errors)
+
+
+def test_reference_vectors():
+    generator = ModelGenerator(seed=3)
+    models = [generator.instance(UWG) for _ in range(10)]
+    assert any(m.ref_bem_vector is not None for m in models)
+    records, schtraffic = to_arrays(models)
+    new_models = from_arrays(records, schtraffic, bld=[m.bld for m in models])
+    for model, new_model in zip(models, new_models):
+        assert new_model.ref_bem_vector is None and new_model.ref_sch_vector is None
+        assert new_model.copy(update={'ref_bem_vector': model.ref_bem_vector,
+                                      'ref_sch_vector': model.ref_sch_vector}) == model
+
+
+def test_long_text():
+    generator = ModelGenerator(seed=4, custom_buildings=0)
+    models = [generator.instance(UWG) for _ in range(3)]
+    version = '1.2.{}'.format('3' * 40)
+    models[1] = models[1].copy(update={'version': version})
+    records, schtraffic = to_arrays(models)
+    assert records['version'][1] == version
+    new_models = from_arrays(records, schtraffic, bld=[m.bld for m in models])
+    assert new_models[1].version == version
+
+
+def test_unchecked_columns():
+    generator = ModelGenerator(seed=5, custom_buildings=0)
+    records, schtraffic = to_arrays([generator.instance(UWG) for _ in range(2)])
+    names = [n for n in records.dtype.names if n != 'h_mix']
+    with pytest.raises(ValidationError) as error:
+        from_arrays(records[names], validate=False)
+    assert [e['loc'] for e in error.value.errors()] == [('h_mix',)]
+
+    schtraffic[1, 2, 5] = np.nan
+    with pytest.raises(ValidationError) as error:
+        from_arrays(records, schtraffic)
+    assert [e['loc'] for e in error.value.errors()] == [(1, 'schtraffic', 2, 5)]
@@ -0,0 +1,57 @@
+from uwg_schema.generator import ModelGenerator
+from uwg_schema.model import UWG
+from uwg_schema.ref_bld_template import BEMDef
+import os
+import pytest
+
+pa = pytest.importorskip('pyarrow')
+from uwg_schema.arrow import arrow_schema, write_parquet, read_parquet, write_ipc, \
+    read_ipc, iter_batches  # noqa: E402
+
+root = os.path.dirname(os.path.dirname(__file__))
+target_folder = os.path.join(root, 'samples')
+
+
+@pytest.fixture(scope='module')
+def models():
+    generator = ModelGenerator(seed=0)
+    models = [generator.instance(UWG) for _ in range(40)]
+    models.append(UWG.parse_file(os.path.join(target_folder, 'custom_uwg.json')))
+    return models
+
+
+def test_arrow_schema():
+    schema = arrow_schema(UWG)
+    assert schema.names == list(UWG.__fields__)
+    assert schema.field('schtraffic').type == \
+        pa.list_(pa.list_(pa.float64(), 24), 3)
+    assert schema.field('bld').type.value_type.names == \
+        ['bldtype', 'builtera', 'fraction']
+    assert schema.field('shgc').nullable
+    assert not schema.field('bldheight').nullable
+    bem_type = schema.field('ref_bem_vector').type.value_type
+    assert pa.schema(list(bem_type)).names == list(BEMDef.__fields__)
+
+
+def test_parquet(models, tmpdir):
+    path = str(tmpdir.join('uwg.parquet'))
+    write_parquet(models, path, batch_size=10)
+    assert read_parquet(path) == models
+
+    filters = [('zone', '=', '1A'), ('bldheight', '>', 10)]
+    expected = [m for m in models if m.zone == '1A' and m.bldheight > 10]
+    assert read_parquet(path, filters) == expected
+
+
+def test_ipc(models, tmpdir):
+    path = str(tmpdir.join('uwg.arrow'))
+    write_ipc(models, path, batch_size=10)
+    assert read_ipc(path) == models
+
+    filters = pa.dataset.field('zone').isin(['1A', '2B'])
+    expected = [m for m in models if m.zone in ('1A', '2B')]
+    assert read_ipc(path, filters) == expected
+
+    batches = list(iter_batches(path, batch_size=4, format='ipc'))
+    assert all(len(batch) <= 4 for batch in batches)
+    assert sum(len(batch) for batch in batches) == len(models)
@@ -0,0 +1,93 @@
+from uwg_schema.bldtypes import BuildingTypeRegistry, BUILDING_TYPES, REF_BLDTYPE, \
+    REF_BUILTERA
+from uwg_schema.model import UWG
+from uwg_schema.ref_bld_template import BEMDef, SchDef
+from uwg_schema.samples import sample_bemdef, sample_schdef, _bemdef, _schdef
+from uwg_schema.session import check_bld_refs
+from uwg_schema.templates import ReferenceCache, resolve_references
+from pydantic import ValidationError
+import pytest
+
+
+def test_registry():
+    registry = BuildingTypeRegistry()
+    assert registry.types == REF_BLDTYPE
+    assert registry.builteras == REF_BUILTERA
+    assert registry.custom_types == ()
+    assert 'hospital' in registry and registry.is_reference('hospital')
+    assert 'lab' not in registry and not registry.is_reference('lab')
+    assert registry.intern('lab') == 'lab'
+
+    name = registry.register(''.join(['l', 'ab']))
+    assert name == 'lab'
+    assert registry.register('lab') is name
+    assert registry.intern(''.join(['la', 'b'])) is name
+    assert 'lab' in registry and not registry.is_reference('lab')
+    assert registry.custom_types == ('lab',)
+    assert len(registry) == 17
+
+    registry.unregister('lab')
+    assert 'lab' not in registry
+    with pytest.raises(AssertionError):
+        registry.unregister('hospital')
+
+
+def test_definitions():
+    registry = BuildingTypeRegistry()
+    bemdef, schdef = _bemdef('lab', 'new'), _schdef('lab', 'new')
+    registry.register_definitions(bemdef, schdef)
+    assert 'lab' in registry
+    assert registry.has_definitions('lab', 'new')
+    assert registry.definitions('lab', 'new') == (bemdef, schdef)
+    assert registry.definitions('lab', 'pre80') is None
+
+    with pytest.raises(AssertionError):
+        registry.register_definitions(bemdef, _schdef('lab', 'pre80'))
+    with pytest.raises(AssertionError):
+        registry.register_definitions(sample_bemdef(), sample_schdef())
+
+    registry.unregister('lab')
+    assert not registry.has_definitions('lab', 'new')
+
+
+def test_interned_models():
+    bemdef = sample_bemdef()
+    assert bemdef.bldtype is BUILDING_TYPES.intern('largeoffice')
+    assert bemdef.builtera is BUILDING_TYPES.intern_builtera('new')
+
+    bemdef = BEMDef.parse_obj(dict(sample_bemdef().dict(), builtera='New'))
+    schdef = SchDef.parse_obj(dict(sample_schdef().dict(), builtera='PRE80'))
+    assert (bemdef.builtera, schdef.builtera) == ('New', 'PRE80')
+    with pytest.raises(ValidationError):
+        BEMDef.parse_obj(dict(bemdef.dict(), builtera='old'))
+
+
+def test_resolve_registered():
+    bemdef, schdef = _bemdef('lab', 'new'), _schdef('lab', 'new', 0.35)
+    model = UWG(bldheight=10.0, blddensity=0.5, vertohor=0.5, zone='1A',
+                treecover=0.1, grasscover=0.1, h_mix=1, bld=[('lab', 'new', 1.0)])
+    values = {'bld': model.bld, 'ref_bem_vector': None, 'ref_sch_vector': None}
+    with pytest.raises(AssertionError):
+        check_bld_refs(values)
+    BUILDING_TYPES.register_definitions(bemdef, schdef)
+    try:
+        check_bld_refs(values)
+        resolved = resolve_references(model, ReferenceCache())
+        assert resolved == [('lab', 'new', 1.0, bemdef, schdef)]
+    finally:
+        BUILDING_TYPES.unregister('lab')
+
+
+def test_mixed_case():
+    registry = BuildingTypeRegistry()
+    assert 'LargeOffice' in registry and registry.is_reference('LargeOffice')
+    assert registry.is_builtera('New')
+    assert registry.intern('LargeOffice') == 'LargeOffice'
+    name = registry.register('Lab')
+    assert registry.register('LAB') is name and registry.custom_types == ('Lab',)
+    bemdef, schdef = _bemdef('lab', 'new'), _schdef('LAB', 'new')
+    registry.register_definitions(bemdef, schdef)
+    assert registry.definitions('Lab', 'New') == (bemdef, schdef)
+    assert registry.has_definitions('LAB', 'NEW')
+    registry.unregister('lab')
+    assert 'Lab' not in registry and not registry.has_definitions('lab', 'new')
@@ -0,0 +1,86 @@
+from uwg_schema.generator import ModelGenerator
+from uwg_schema.model import UWG
+from uwg_schema.templates import ReferenceCache
+import pytest
+
+np = pytest.importorskip('numpy')
+from uwg_schema.arrays import to_arrays  # noqa: E402
+from uwg_schema.consistency import check_models, check_arrays, building_table, \
+    UWG_BULK_RULES  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def models():
+    generator = ModelGenerator(seed=0, doe_buildings=0)
+    models = []
+    for _ in range(8):
+        model = generator.instance(UWG)
+        models.append(model.copy(update={
+            'grasscover': 0.2, 'treecover': 0.2, 'h_ubl1': 1000, 'h_ubl2': 80,
+            'vegstart': 4, 'vegend': 10, 'bldheight': 20, 'flr_h': None,
+            'glzr': None}))
+    return models
+
+
+def test_check_models(models):
+    result = check_models(models)
+    assert result.names == tuple(r.name for r in UWG_BULK_RULES)
+    assert result.failed.shape == (8, len(UWG_BULK_RULES))
+    assert result.ok.all()
+    assert list(result.failures()) == []
+
+
+def test_failures(models):
+    models = list(models)
+    models[1] = models[1].copy(update={'grasscover': 0.7, 'treecover': 0.5})
+    models[2] = models[2].copy(update={'h_ubl2': 2000})
+    models[3] = models[3].copy(update={'vegstart': 10, 'vegend': 4})
+    models[4] = models[4].copy(update={'bldheight': 2.0})
+    models[5] = models[5].copy(update={'flr_h': 30.0})
+    models[6] = models[6].copy(update={'glzr': 1.0})
+    result = check_models(models)
+    assert result.ok.tolist() == [True, False, False, False, False, False, True,
+                                  True]
+    assert result.rule('floor_height').nonzero()[0].tolist() == [4, 5]
+    assert [f[:2] for f in result.failures()] == [
+        (1, 'cover'), (2, 'ubl'), (3, 'vegetation'), (4, 'floor_height'),
+        (5, 'floor_height')]
+
+
+def test_building_table(models):
+    table = building_table(models)
+    custom = sum(len(m.bld) for m in models)
+    assert len(table['model']) == custom
+    assert np.all(np.diff(table['model']) >= 0)
+
+    generator = ModelGenerator(seed=1)
+    model = generator.instance(UWG)
+    bem = model.ref_bem_vector[0]
+    cache = ReferenceCache(lambda z, t, e: (
+        bem.copy(update={'bldtype': t, 'builtera': e}),
+        model.ref_sch_vector[0].copy(update={'bldtype': t, 'builtera': e})))
+    table = building_table([model], cache)
+    assert len(table['model']) == len(model.bld)
+
+
+def test_unchecked(models):
+    model = models[0].copy(update={
+        'bld': list(models[0].bld) + [('largeoffice', 'new', 0.0)]})
+    table = building_table([models[1], model])
+    assert table['model'].tolist() == [0] * len(models[1].bld) + [1] * len(model.bld)
+    assert np.isnan(table['floor_height'][-1])
+
+    result = check_models([models[1], model])
+    assert not result.failed.any()
+    assert result.unchecked.tolist() == [False, True]
+    assert result.ok.tolist() == [True, False]
+    records, _ = to_arrays([models[1], model])
+    assert not check_arrays(records).unchecked.any()
+
+
+def test_check_arrays(models):
+    records, _ = to_arrays(models)
+    assert check_arrays(records).ok.all()
+    columns = {'h_ubl1': [100, 100], 'h_ubl2': [50, 150]}
+    result = check_arrays(columns, rules=[UWG_BULK_RULES[1]])
+    assert result.failed[:, 0].tolist() == [False, True]
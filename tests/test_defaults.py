@@ -0,0 +1,60 @@
+from uwg_schema.defaults import shared_defaults, defaults_shared
+from uwg_schema.model import UWG, DEFAULT_SCHTRAFFIC, DEFAULT_BLD
+from uwg_schema.ref_bld_template import SchDef
+import threading
+
+PARAMS = dict(bldheight=10, blddensity=0.5, vertohor=0.5, grasscover=0.1,
+              treecover=0.1, zone='1A', h_mix=1)
+
+
+def test_shared_defaults():
+    copied = UWG(**PARAMS)
+    schema = UWG.schema()
+    with shared_defaults():
+        assert defaults_shared()
+        models = [UWG(**PARAMS) for _ in range(3)]
+        schtraffic = [[0.5] * 24] * 3
+        custom = UWG(schtraffic=schtraffic, **PARAMS)
+        with shared_defaults(False):
+            assert not defaults_shared()
+    assert not defaults_shared()
+    assert UWG.__fields__['schtraffic'].default is DEFAULT_SCHTRAFFIC
+    assert UWG.schema() == schema
+
+    assert models[0].schtraffic is not models[1].schtraffic
+    assert type(models[0].schtraffic) is list
+    assert type(models[0].schtraffic[0]) is list
+    assert models[0].schtraffic[0] is not models[1].schtraffic[0]
+    assert models[0].bld == DEFAULT_BLD and type(models[0].bld[0]) is tuple
+    assert custom.schtraffic == schtraffic
+    assert models[0] == copied
+    assert models[0].json() == copied.json()
+
+    models[0].schtraffic[0][0] = 0.9
+    models[0].bld.append(('hospital', 'new', 0.0))
+    assert models[1].schtraffic[0][0] == 0.2
+    assert models[1].bld == DEFAULT_BLD
+    assert UWG(**PARAMS) == copied
+
+
+def test_shared_defaults_thread():
+    seen = []
+
+    def create():
+        seen.append(defaults_shared())
+
+    with shared_defaults():
+        thread = threading.Thread(target=create)
+        thread.start()
+        thread.join()
+    assert seen == [False]
+
+
+def test_schdef_defaults():
+    week = [[0.15] * 24] * 3
+    params = dict(elec=week, light=week, occ=week, cool=week, heat=week, q_elec=1,
+                  q_light=1, n_occ=1, vent=1, bldtype='largeoffice', builtera='new')
+    with shared_defaults():
+        a, b = SchDef(**params), SchDef(**params)
+    assert a.gas is not b.gas and a.gas == b.gas
+    assert a == SchDef(**params)
@@ -0,0 +1,78 @@
+from uwg_schema.diff import diff, apply_patch
+from uwg_schema.generator import ModelGenerator
+from uwg_schema.model import UWG
+from pydantic import ValidationError
+import json
+import os
+import pytest
+
+root = os.path.dirname(os.path.dirname(__file__))
+target_folder = os.path.join(root, 'samples')
+
+
+@pytest.fixture
+def model():
+    return UWG.parse_file(os.path.join(target_folder, 'custom_uwg.json'))
+
+
+def test_diff_paths(model):
+    data = model.dict()
+    data['albroof'] = 0.3
+    data['bld'][0][2] = 0.3
+    data['bld'][1][2] = 0.6
+    data['ref_sch_vector'][1]['elec'][0][5] = 0.8
+    data['ref_bem_vector'][1]['wall']['material_lst'][0]['thermalcond'] = 0.5
+    new_model = UWG.parse_obj(data)
+
+    patch = diff(model, new_model)
+    paths = [op['path'] for op in patch]
+    assert ['albroof'] in paths
+    assert ['bld', 0, 2] in paths
+    assert ['ref_sch_vector', ['customhospital', 'new'], 'elec', 0, 5] in paths
+    assert ['ref_bem_vector', ['customhospital', 'new'], 'wall', 'material_lst', 0,
+            'thermalcond'] in paths
+    assert len(patch) == 5
+
+    patched = apply_patch(model, json.loads(json.dumps(patch)))
+    assert patched == new_model
+    assert model.albroof is None
+    # untouched sub-models are shared rather than copied
+    assert patched.ref_bem_vector[0] is model.ref_bem_vector[0]
+
+
+def test_add_remove_refs(model):
+    data = model.dict()
+    data['ref_bem_vector'].reverse()
+    removed = data['ref_bem_vector'].pop()
+    new_model = UWG.parse_obj(data)
+
+    patch = diff(model, new_model)
+    path = ['ref_bem_vector', ['largeoffice', 'new']]
+    assert patch == [{'op': 'remove', 'path': path}]
+    assert apply_patch(model, patch) == new_model
+
+    patch = diff(new_model, model)
+    assert patch[0]['op'] == 'add'
+    assert patch[0]['value'] == removed
+    patched = apply_patch(new_model, patch)
+    assert [r.bldtype for r in patched.ref_bem_vector] == \
+        ['customhospital', 'largeoffice']
+
+
+def test_invalid_patch(model):
+    with pytest.raises(ValidationError):
+        apply_patch(model, [{'op': 'replace', 'path': ['bld', 0, 2], 'value': 0.9}])
+    with pytest.raises(ValidationError):
+        apply_patch(model, [{'op': 'replace', 'path': ['albroof'], 'value': 2}])
+    path = ['ref_bem_vector', ['customhospital', 'new'], 'wall', 'layer_thickness_lst']
+    with pytest.raises(ValidationError):
+        apply_patch(model, [{'op': 'add', 'path': path + [3], 'value': 0.1}])
+    with pytest.raises(ValidationError):
+        apply_patch(model, [{'op': 'replace', 'path': ['not_a_field'], 'value': 1}])
+
+
+def test_random_round_trip():
+    generator = ModelGenerator(seed=3)
+    for _ in range(20):
+        old, new = generator.instance(UWG), generator.instance(UWG)
+        assert apply_patch(old, diff(old, new)).dict() == new.dict()
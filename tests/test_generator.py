@@ -0,0 +1,49 @@
+from uwg_schema.generator import ModelGenerator, MODELS
+from uwg_schema.model import UWG
+from pydantic import ValidationError
+import io
+import json
+import pytest
+
+
+@pytest.mark.parametrize('model', MODELS)
+def test_valid_payloads(model):
+    generator = ModelGenerator(seed=0)
+    for _ in range(50):
+        model.parse_obj(generator.payload(model))
+
+
+@pytest.mark.parametrize('model', MODELS)
+def test_invalid_payloads(model):
+    generator = ModelGenerator(seed=0)
+    for _ in range(100):
+        with pytest.raises(ValidationError):
+            model.parse_obj(generator.payload(model, valid=False))
+
+
+def test_seed():
+    assert ModelGenerator(seed=7).payload() == ModelGenerator(seed=7).payload()
+    assert ModelGenerator(seed=7).payload() != ModelGenerator(seed=8).payload()
+
+
+def test_size_parameters():
+    generator = ModelGenerator(seed=1, custom_buildings=5, doe_buildings=0, layers=4)
+    model = generator.instance(UWG)
+    assert len(model.bld) == 5
+    assert len(model.ref_bem_vector) == 5
+    assert len(model.ref_sch_vector) == 5
+    assert len(model.ref_bem_vector[0].wall.material_lst) == 4
+
+
+def test_write_jsonl():
+    fp = io.StringIO()
+    size = ModelGenerator(seed=2).write_jsonl(fp, count=10)
+    lines = fp.getvalue().splitlines()
+    assert size == len(fp.getvalue())
+    assert len(lines) == 10
+    for line in lines:
+        UWG.parse_obj(json.loads(line))
+
+    fp = io.StringIO()
+    size = ModelGenerator(seed=2).write_jsonl(fp, max_bytes=50000)
+    assert 0 < size <= 50000
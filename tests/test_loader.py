@@ -0,0 +1,57 @@
+from uwg_schema.loader import load, load_many, iter_jsonl, ModelRegistry, MODEL_REGISTRY
+from uwg_schema.ref_bld_template import Material, BEMDef
+from uwg_schema.model import UWG
+from pydantic import ValidationError
+import json
+import os
+import pytest
+
+root = os.path.dirname(os.path.dirname(__file__))
+target_folder = os.path.join(root, 'samples')
+
+
+def _sample(name):
+    with open(os.path.join(target_folder, '{}.json'.format(name))) as inf:
+        return inf.read()
+
+
+def test_load():
+    assert MODEL_REGISTRY.types == \
+        ('Material', 'Element', 'Building', 'BEMDef', 'SchDef', 'UWG')
+    assert isinstance(load(_sample('bemdef')), BEMDef)
+    assert isinstance(load(json.loads(_sample('uwg'))), UWG)
+    with pytest.raises(ValidationError) as error:
+        load({'type': 'Building2'})
+    assert error.value.errors()[0]['type'] == 'value_error.unknown_type'
+
+
+def test_load_many():
+    documents = [_sample('material'), {'name': 'wood'}, {'type': 'Material'},
+                 b'{"type":', _sample('custom_uwg')]
+    result = load_many(documents)
+    assert [type(m).__name__ for m in result.models] == \
+        ['Material', 'NoneType', 'NoneType', 'NoneType', 'UWG']
+    errors = [(e['index'], e['pointer'], e['type']) for e in result.errors]
+    assert errors[0] == (1, '/type', 'value_error.missing')
+    assert errors[1:4] == [(2, '/thermalcond', 'value_error.missing'),
+                           (2, '/volheat', 'value_error.missing'),
+                           (2, '/name', 'value_error.missing')]
+    assert errors[4] == (3, '', 'value_error.jsondecode')
+
+
+def test_iter_jsonl(tmpdir):
+    path = str(tmpdir.join('mixed.jsonl'))
+    with open(path, 'w') as outf:
+        for name in ('material', 'element', 'building', 'schdef'):
+            outf.write(json.dumps(json.loads(_sample(name))) + '\n')
+        outf.write('\n{"type": "Other"}\n')
+    results = list(iter_jsonl(path))
+    assert [i for i, _, _ in results] == [0, 1, 2, 3, 5]
+    assert [m.type for _, m, _ in results[:4]] == \
+        ['Material', 'Element', 'Building', 'SchDef']
+    assert results[4][2][0]['type'] == 'value_error.unknown_type'
+
+    registry = ModelRegistry([Material])
+    assert registry.load(_sample('material')).name == 'insulation'
+    _, model, errors = next(registry.iter_load([_sample('uwg')]))
+    assert model is None and errors[0]['pointer'] == '/type'
@@ -0,0 +1,90 @@
+from uwg_schema.memo import ValidationCache, payload_hash
+from uwg_schema.generator import ModelGenerator
+from uwg_schema.model import UWG
+from uwg_schema.ref_bld_template import BEMDef
+from pydantic import ValidationError
+import json
+import pytest
+
+
+@pytest.fixture(scope='module')
+def payload():
+    return ModelGenerator(seed=0).payload(UWG)
+
+
+def test_payload_hash():
+    assert payload_hash('{}') == payload_hash(b'{}')
+    assert len(payload_hash(b'{}')) == 16
+
+
+def test_parse_raw(payload):
+    cache = ValidationCache()
+    raw = json.dumps(payload)
+    model = cache.parse_raw(raw)
+    assert model == UWG.parse_raw(raw)
+    hit = cache.parse_raw(raw.encode('utf-8'))
+    assert hit == model and hit is not model
+    info = cache.info()
+    assert (info.payloads.hits, info.payloads.misses) == (1, 1)
+    assert info.sub_objects.misses == len(payload['ref_bem_vector']) + \
+        len(payload['ref_sch_vector'])
+
+
+def test_sub_objects(payload):
+    cache = ValidationCache()
+    first = cache.parse_raw(json.dumps(payload))
+    changed = dict(payload, bldheight=payload['bldheight'] + 1)
+    second = cache.parse_raw(json.dumps(changed, indent=2))
+    assert second.bldheight == first.bldheight + 1
+    assert second.ref_bem_vector == first.ref_bem_vector
+    info = cache.info()
+    assert info.payloads.misses == 2
+    assert info.sub_objects.hits == info.sub_objects.misses
+
+
+def test_invalid(payload):
+    cache = ValidationCache()
+    data = json.loads(json.dumps(payload))
+    data['ref_bem_vector'][0]['cooling'] = 1
+    with pytest.raises(ValidationError) as error:
+        cache.parse_raw(json.dumps(data))
+    assert error.value.errors()[0]['loc'][:2] == ('ref_bem_vector', 0)
+    assert cache.info().payloads.currsize == 0
+
+
+@pytest.mark.parametrize('sub_objects', [True, False])
+def test_mutated_hit(payload, sub_objects):
+    cache = ValidationCache(sub_objects=sub_objects)
+    raw = json.dumps(payload)
+    model = cache.parse_raw(raw)
+    expected = UWG.parse_raw(raw)
+    model.bld = [('lab', 'new', 1.0)]
+    model.ref_bem_vector[0].building.floor_height += 1
+    model.ref_sch_vector[0].elec[0][0] += 1
+    assert cache.parse_raw(raw) == expected
+    changed = dict(payload, bldheight=payload['bldheight'] + 1)
+    other = cache.parse_raw(json.dumps(changed))
+    assert other.ref_bem_vector == expected.ref_bem_vector
+    assert other.ref_sch_vector == expected.ref_sch_vector
+
+
+@pytest.mark.parametrize('sub_objects', [True, False])
+def test_invalid_json(sub_objects):
+    cache = ValidationCache(sub_objects=sub_objects)
+    with pytest.raises(ValidationError) as error:
+        cache.parse_raw('{bad')
+    assert error.value.errors()[0]['loc'] == ('__root__',)
+    assert cache.info().payloads.currsize == 0
+
+
+def test_eviction():
+    cache = ValidationCache(BEMDef, maxsize=2)
+    generator = ModelGenerator(seed=1)
+    for _ in range(3):
+        cache.parse_raw(json.dumps(generator.payload(BEMDef)))
+    info = cache.info()
+    assert info.payloads.evictions == 1
+    assert info.payloads.currsize == 2
+    assert info.sub_objects.misses == 0
+    cache.clear()
+    assert cache.info().payloads.currsize == 0
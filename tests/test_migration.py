@@ -0,0 +1,98 @@
+from uwg_schema.migration import MigrationRegistry, MIGRATIONS, compose, add_field, \
+    rename_field, remove_field, for_each, upgrade
+from uwg_schema.generator import ModelGenerator
+from uwg_schema.model import UWG
+import json
+import pytest
+
+
+def old_payload(generator, version='0.1.0'):
+    """Return a payload as it might have been stored by an older schema."""
+    data = generator.payload(UWG)
+    data['version'] = version
+    data['flr_height'] = data.pop('flr_h')
+    data['legacy'] = True
+    for item in data['ref_bem_vector']:
+        item['era'] = item.pop('builtera')
+    return data
+
+
+@pytest.fixture
+def registry():
+    registry = MigrationRegistry()
+    registry.register('0.3.0', remove_field('legacy'))
+    registry.register('0.2.0', compose(
+        rename_field('flr_height', 'flr_h'),
+        for_each('ref_bem_vector', rename_field('era', 'builtera'))))
+    return registry
+
+
+def test_registry(registry):
+    assert registry.target == '0.3.0'
+    assert [m.version for m in registry.migrations] == ['0.2.0', '0.3.0']
+    assert len(registry.plan('0.1.0')) == 2
+    assert len(registry.plan('0.2.0')) == 1
+    assert registry.plan('0.3.0') == ()
+    assert registry.plan('1.0.0') == ()
+    with pytest.raises(ValueError):
+        registry.plan('latest')
+
+
+def test_upgrade(registry):
+    generator = ModelGenerator(seed=0)
+    data = registry.upgrade(old_payload(generator))
+    assert data['version'] == '0.3.0'
+    assert registry.is_current(data)
+    UWG.parse_obj(data)
+
+    data = old_payload(generator)
+    data['legacy'] = False
+    del data['version']  # payloads without a version are at the default version
+    assert registry.upgrade(data)['version'] == '0.3.0'
+
+    data = add_field('flr_h', 3.0)({'version': '0.3.0'})
+    assert registry.upgrade(data) is data
+
+
+def test_upgrade_jsonl(registry, tmp_path):
+    generator = ModelGenerator(seed=1)
+    source = tmp_path / 'archive.jsonl'
+    current = registry.upgrade(old_payload(generator))
+    with open(str(source), 'w') as outf:
+        outf.write(json.dumps(current) + '\n')
+        for _ in range(4):
+            outf.write(json.dumps(old_payload(generator)) + '\n')
+    where = tmp_path / 'upgraded.jsonl'
+    assert registry.upgrade_jsonl(str(source), str(where)) == 4
+    with open(str(where)) as inf:
+        lines = inf.readlines()
+    assert lines[0] == json.dumps(current) + '\n'
+    for line in lines:
+        assert UWG.parse_raw(line).version == '0.3.0'
+
+
+def test_upgrade_parquet(registry, tmp_path):
+    pa = pytest.importorskip('pyarrow')
+    import pyarrow.parquet  # noqa: F401
+    from uwg_schema.arrow import read_parquet
+    generator = ModelGenerator(seed=2)
+    rows = []
+    for _ in range(6):
+        data = old_payload(generator)
+        data['bld'] = [dict(zip(('bldtype', 'builtera', 'fraction'), r))
+                       for r in data['bld']]
+        rows.append(data)
+    source = str(tmp_path / 'archive.parquet')
+    pa.parquet.write_table(pa.Table.from_pylist(rows), source)
+    where = str(tmp_path / 'upgraded.parquet')
+    assert registry.upgrade_parquet(source, where, batch_size=4) == 6
+    models = read_parquet(where)
+    assert len(models) == 6
+    assert all(m.version == '0.3.0' for m in models)
+    assert registry.upgrade_parquet(where, source) == 0
+
+
+def test_default_registry():
+    assert MIGRATIONS.target is None
+    data = {'version': '0.0.0'}
+    assert upgrade(data) is data
@@ -8,3 +8,52 @@ os.chdir(root)
 def test_gen_openapi():
     rc = os.system('python ./docs.py --version 0.0.1')
     assert rc == 0
+
+
+def test_stages():
+    from uwg_schema._openapi import get_openapi, default_stages, SetDefault, Stage
+    from uwg_schema.model import UWG
+
+    class Counter(Stage):
+        def __init__(self):
+            self.properties = 0
+
+        def visit_property(self, node, name, prop):
+            self.properties += 1
+            return prop
+
+    counter = Counter()
+    stages = default_stages() + [SetDefault('UWG', 'version', '9.9.9'), counter]
+    openapi = get_openapi([UWG], version='9.9.9', stages=stages)
+    schemas = openapi['components']['schemas']
+    uwg = schemas['UWG']['properties']
+    assert uwg['version']['default'] == '9.9.9'
+    assert uwg['type']['readOnly'] is True
+    assert uwg['bldheight']['format'] == 'double'
+    assert list(uwg)[:len(schemas['UWG']['required'])] == schemas['UWG']['required']
+    assert counter.properties == sum(
+        len(s.get('properties', ())) for s in schemas.values())
+    assert openapi['x-tagGroups'][0]['tags'] == \
+        sorted('{}_model'.format(name.lower()) for name in schemas)
+    # every call starts from a clean base document
+    assert get_openapi([UWG], version='0.0.1')['x-tagGroups'] == openapi['x-tagGroups']
+
+
+def test_shared_schemas():
+    from uwg_schema._openapi import get_openapi
+    from uwg_schema.model import UWG
+    from uwg_schema.week_matrix import EncodedWeekMatrix
+    import json
+
+    openapi = get_openapi([UWG], version='0.0.1', shared=[EncodedWeekMatrix])
+    schemas = openapi['components']['schemas']
+    ref = {'$ref': '#/components/schemas/EncodedWeekMatrix'}
+    assert schemas['SchDef']['properties']['elec']['anyOf'][1] == ref
+    assert schemas['UWG']['properties']['schtraffic']['anyOf'][1] == ref
+    assert json.dumps(openapi).count('"title": "EncodedWeekMatrix"') == 1
+    encoded = schemas['EncodedWeekMatrix']['properties']
+    assert encoded['type']['readOnly'] is True
+    assert encoded['scale']['format'] == 'double'
+    assert 'encodedweekmatrix_model' in openapi['x-tagGroups'][0]['tags']
+    # the cached schema of the model is not changed by the stages
+    assert 'readOnly' not in EncodedWeekMatrix.schema()['properties']['type']
@@ -0,0 +1,65 @@
+from uwg_schema.planner import plan_batches, map_batches, gather, setup_key, \
+    content_hash
+from uwg_schema.model import UWG
+from concurrent.futures import ThreadPoolExecutor
+import os
+import pytest
+
+root = os.path.dirname(os.path.dirname(__file__))
+target_folder = os.path.join(root, 'samples')
+
+
+@pytest.fixture(scope='module')
+def model():
+    return UWG.parse_file(os.path.join(target_folder, 'custom_uwg.json'))
+
+
+def _models(model):
+    other_bld = [list(r) for r in model.bld]
+    other_bld[0][2] = round(other_bld[0][2] + 0.1, 2)
+    other_bld[1][2] = round(other_bld[1][2] - 0.1, 2)
+    models = []
+    for i in range(10):
+        update = {'bldheight': 10 + i}
+        if i % 3 == 1:
+            update['bld'] = other_bld
+        elif i % 3 == 2:
+            update['nday'] = model.nday + 1
+        models.append(model.copy(update=update))
+    return models
+
+
+def test_setup_key(model):
+    copy = UWG.parse_obj(model.dict())
+    assert setup_key(copy) == setup_key(model)
+    assert setup_key(model.copy(update={'bldheight': 5})) == setup_key(model)
+    assert setup_key(model.copy(update={'dtsim': 600})) != setup_key(model)
+    assert content_hash(model.ref_bem_vector) == \
+        content_hash([b.dict() for b in model.ref_bem_vector])
+
+
+def test_plan_batches(model):
+    models = _models(model)
+    batches = plan_batches(models)
+    assert [b.indices for b in batches] == [(0, 3, 6, 9), (1, 4, 7), (2, 5, 8)]
+    batches = plan_batches(models, batch_size=3)
+    assert [b.indices for b in batches] == [(0, 3, 6), (9,), (1, 4, 7), (2, 5, 8)]
+    assert batches[0].key == batches[1].key
+    assert batches[0].models[1] is models[3]
+    with pytest.raises(AssertionError):
+        plan_batches(models, batch_size=0)
+
+
+def test_map_batches(model):
+    models = _models(model)
+
+    def heights(batch):
+        return [m.bldheight for m in batch.models]
+
+    expected = [m.bldheight for m in models]
+    assert map_batches(heights, models, batch_size=2) == expected
+    with ThreadPoolExecutor(2) as executor:
+        assert map_batches(heights, models, 2, executor) == expected
+    batches = plan_batches(models)
+    with pytest.raises(AssertionError):
+        gather(batches, [[1]] * len(batches))
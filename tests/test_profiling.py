@@ -0,0 +1,65 @@
+from uwg_schema.profiling import profile_models, write_profile, compare_profiles, \
+    measure_memory, OPERATIONS
+from uwg_schema.model import UWG
+from uwg_schema.samples import sample_dict, sample_custom_uwg
+import copy
+import json
+import os
+import tracemalloc
+import pytest
+
+
+def test_measure_memory():
+    result = measure_memory(lambda: [list(range(100)) for _ in range(10)], top=2)
+    assert result['peak_bytes'] >= result['retained_bytes'] > 0
+    assert result['retained_blocks'] >= 10
+    assert len(result['top_allocations']) <= 2
+    site = result['top_allocations'][0]
+    assert set(site) == {'site', 'traceback', 'bytes', 'blocks'}
+    assert site['site'].startswith('tests/test_profiling.py:')
+    assert site['traceback'][0] == site['site']
+    with pytest.raises(RuntimeError):
+        tracemalloc.start()
+        try:
+            measure_memory(list)
+        finally:
+            tracemalloc.stop()
+
+
+def test_model_sites():
+    document = sample_dict(sample_custom_uwg())
+    result = measure_memory(lambda: UWG.parse_obj(document), top=100)
+    sites = [s for a in result['top_allocations'] for s in a['traceback']]
+    assert any(s.startswith(('uwg_schema/model.py:', 'uwg_schema/ref_bld_template.py:'))
+               for s in sites)
+    assert not any(s.startswith('uwg_schema/profiling.py') for s in sites)
+
+
+def test_profile_models(tmpdir):
+    report = profile_models(['Material', 'UWG'], scales=(1, 2), top=3, repeat=1)
+    assert report['scales'] == [1, 2]
+    results = report['results']
+    assert len(results) == 2 * 2 * len(OPERATIONS)
+    for result in results:
+        assert result['seconds'] > 0 and result['peak_bytes'] > 0
+        assert len(result['top_allocations']) <= 3
+        assert len(result['top_functions']) <= 3
+    parse = [r for r in results if r['operation'] == 'parse_obj']
+    assert parse[0]['retained_bytes'] < parse[-1]['retained_bytes']
+
+    path = os.path.join(str(tmpdir), 'profile', 'report.json')
+    write_profile(path, report)
+    with open(path) as inf:
+        assert json.load(inf)['results'][0]['model'] == 'Material'
+
+
+def test_compare_profiles():
+    result = {'model': 'UWG', 'operation': 'dict', 'scale': 10, 'peak_bytes': 1000,
+              'retained_bytes': 500, 'retained_blocks': 10}
+    baseline = {'results': [result]}
+    report = copy.deepcopy(baseline)
+    assert compare_profiles(baseline, report) == []
+    report['results'][0]['peak_bytes'] = 1200
+    regressions = compare_profiles(baseline, report)
+    assert [(r['metric'], r['ratio']) for r in regressions] == [('peak_bytes', 1.2)]
+    assert compare_profiles(baseline, report, tolerance=0.5) == []
@@ -0,0 +1,56 @@
+from uwg_schema.report import json_pointer, validate, validate_many, validate_jsonl
+from uwg_schema.generator import ModelGenerator
+from uwg_schema.model import UWG
+from uwg_schema.ref_bld_template import Element
+import json
+
+
+def test_json_pointer():
+    assert json_pointer(('bld', 2, 1)) == '/bld/2/1'
+    assert json_pointer(('__root__', 'elec', 0, 3)) == '/elec/0/3'
+    assert json_pointer(('a/b', 'c~d')) == '/a~1b/c~0d'
+    assert json_pointer(('__root__',)) == ''
+
+
+def test_validate_collects_errors():
+    data = ModelGenerator(seed=0, doe_buildings=0).payload(UWG)
+    data['bld'] = [['largeoffice', 'pst80', 1.5], [3, 'old', 0.5],
+                   ['warehouse', 'new', 2]]
+    data['schtraffic'][1][4] = 'x'
+    data['zone'] = '9Z'
+    report = validate(data)
+    assert not report['valid']
+    pointers = [e['pointer'] for e in report['errors']]
+    assert '/bld/0/2' in pointers
+    assert '/bld/1/1' in pointers
+    assert '/bld/2/2' in pointers
+    assert '/schtraffic/1/4' in pointers
+    assert '/zone' in pointers
+    json.dumps(report)
+
+
+def test_element_errors():
+    data = ModelGenerator(seed=1).payload(Element)
+    data['layer_thickness_lst'] = [-0.1, 0.2, 0]
+    report = validate(json.dumps(data), Element)
+    pointers = [e['pointer'] for e in report['errors']]
+    assert pointers == ['/layer_thickness_lst/0', '/layer_thickness_lst/2']
+
+    data['layer_thickness_lst'] = [0.1]
+    report = validate(data, Element)
+    assert [e['pointer'] for e in report['errors']] == ['']
+
+
+def test_validate_many(tmp_path):
+    generator = ModelGenerator(seed=2)
+    items = [generator.payload(UWG, valid=i % 2 == 0) for i in range(6)]
+    report = validate_many(items)
+    assert (report['count'], report['valid'], report['invalid']) == (6, 3, 3)
+    assert {e['index'] for e in report['errors']} == {1, 3, 5}
+
+    source = tmp_path / 'batch.jsonl'
+    with open(str(source), 'w') as outf:
+        for item in items:
+            outf.write(json.dumps(item) + '\n\n')
+    report = validate_jsonl(str(source))
+    assert {e['index'] for e in report['errors']} == {2, 6, 10}
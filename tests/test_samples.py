@@ -0,0 +1,40 @@
+from uwg_schema.samples import build_samples, build_synthetic_set, synthetic_keys, \
+    synthetic_definitions, write_samples, SAMPLES
+from uwg_schema.model import UWG
+from uwg_schema.templates import ReferenceCache, resolve_references
+import json
+import os
+
+root = os.path.dirname(os.path.dirname(__file__))
+target_folder = os.path.join(root, 'samples')
+
+
+def test_build_samples():
+    samples = build_samples(processes=1)
+    assert list(samples) == list(SAMPLES)
+    for name, data in samples.items():
+        with open(os.path.join(target_folder, '{}.json'.format(name))) as inf:
+            assert json.loads(json.dumps(data)) == json.load(inf), name
+
+
+def test_write_samples(tmpdir):
+    paths = write_samples(str(tmpdir), ['material', 'uwg'], processes=2)
+    assert [os.path.basename(p) for p in paths] == ['material.json', 'uwg.json']
+    UWG.parse_file(paths[1])
+
+
+def test_synthetic_set():
+    keys = synthetic_keys()
+    assert len(keys) == 16 * 3 * 18 == len(set(keys))
+    fixtures = build_synthetic_set(keys[:40], processes=2, chunksize=8)
+    assert list(fixtures) == keys[:40]
+    assert fixtures == build_synthetic_set(keys[:40], processes=1)
+    bem, sch = fixtures[keys[0]]
+    assert (bem['bldtype'], bem['builtera']) == keys[0][1:]
+    old, new = synthetic_definitions('7', 'hospital', 'pre80')[0], \
+        synthetic_definitions('7', 'hospital', 'new')[0]
+    assert new.building.u_value < old.building.u_value
+
+    model = UWG.parse_file(os.path.join(target_folder, 'uwg.json'))
+    resolved = resolve_references(model, ReferenceCache(synthetic_definitions))
+    assert [r[3].bldtype for r in resolved] == ['largeoffice', 'midriseapartment']
@@ -0,0 +1,186 @@
+from uwg_schema.server import ValidationServer, ValidationClient, _version
+from uwg_schema._openapi import get_uwg_openapi
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import json
+import os
+import pytest
+import tempfile
+import threading
+
+root = os.path.dirname(os.path.dirname(__file__))
+target_folder = os.path.join(root, 'samples')
+
+
+def read_sample(name):
+    with open(os.path.join(target_folder, name), 'rb') as f:
+        return f.read()
+
+
+class BlockingExecutor(ThreadPoolExecutor):
+    """Single worker executor that holds every batch until it is released."""
+
+    def __init__(self):
+        ThreadPoolExecutor.__init__(self, 1)
+        self.release = threading.Event()
+
+    def submit(self, fn, *args):
+        return ThreadPoolExecutor.submit(self, self._run, fn, *args)
+
+    def _run(self, fn, *args):
+        self.release.wait(10)
+        return fn(*args)
+
+
+class FailingExecutor(ThreadPoolExecutor):
+    """Executor whose batches fail like a worker process that died."""
+
+    def submit(self, fn, *args):
+        return ThreadPoolExecutor.submit(self, self._fail)
+
+    def _fail(self):
+        raise RuntimeError('worker died')
+
+
+async def wait_until(condition, timeout=10):
+    """Wait until the server state meets a condition."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline, 'The server did not reach the expected state.'
+        await asyncio.sleep(0.001)
+
+
+def test_validate():
+    uwg = read_sample('custom_uwg.json')
+    schdef = read_sample('schdef.json')
+
+    async def run():
+        async with ValidationServer(workers=1) as server:
+            clients = [ValidationClient(server.address) for _ in range(8)]
+            requests = [c.validate('UWG', uwg) for c in clients[:6]]
+            requests.append(clients[6].validate('SchDef', schdef))
+            requests.append(clients[7].validate('BEMDef', schdef))
+            results = await asyncio.gather(*requests)
+            assert all(status == 200 for status, _ in results)
+            assert [r['valid'] for _, r in results] == [True] * 7 + [False]
+            assert results[-1][1]['errors']
+
+            # keep-alive connection reuse
+            status, result = await clients[0].validate('UWG', uwg)
+            assert status == 200 and result['valid']
+
+            status, openapi = await clients[0].request('GET', '/openapi')
+            assert status == 200
+            assert openapi == json.loads(json.dumps(get_uwg_openapi(_version())))
+            status, _ = await clients[0].request('GET', '/validate/Building')
+            assert status == 404
+            status, _ = await clients[0].request('GET', '/validate/UWG')
+            assert status == 405
+
+            status, metrics = await clients[0].request('GET', '/metrics')
+            assert metrics['requests'] == 9
+            assert metrics['invalid'] == 1
+            assert metrics['batches'] < metrics['requests']
+            assert metrics['latency_p50'] > 0
+            for client in clients:
+                await client.close()
+
+    asyncio.run(run())
+
+
+def test_backpressure():
+    uwg = read_sample('uwg.json')
+    executor = BlockingExecutor()
+
+    async def run():
+        server = ValidationServer(executor=executor, max_batch=1, max_pending=2,
+                                  batch_window=0)
+        async with server:
+            clients = [ValidationClient(server.address) for _ in range(5)]
+            tasks = []
+            # the first request is in the blocked worker, the second one waits for
+            # the worker and the next two fill the queue
+            for i, client in enumerate(clients[:4]):
+                tasks.append(asyncio.ensure_future(client.validate('UWG', uwg)))
+                await wait_until(lambda: server.pending == i + 1 and
+                                 server.queued == max(0, i - 1))
+            status, result = await clients[4].validate('UWG', uwg)
+            assert status == 503 and result['error']
+            assert not any(task.done() for task in tasks)
+            executor.release.set()
+            statuses = [s for s, _ in await asyncio.gather(*tasks)]
+            assert statuses == [200, 200, 200, 200]
+            assert server.metrics.rejected == 1
+            assert server.pending == 0
+            for client in clients:
+                await client.close()
+
+    asyncio.run(run())
+    executor.shutdown()
+
+
+def test_stop_waits_for_batches():
+    uwg = read_sample('uwg.json')
+    executor = BlockingExecutor()
+
+    async def run():
+        server = await ValidationServer(executor=executor, batch_window=0).start()
+        request = asyncio.ensure_future(server.validate('UWG', uwg))
+        await wait_until(lambda: server.metrics.batches == 1)
+        stopping = asyncio.ensure_future(server.stop())
+        await asyncio.sleep(0.01)
+        assert not stopping.done()
+        executor.release.set()
+        await stopping
+        assert request.done() and request.result()['valid']
+
+    asyncio.run(run())
+    executor.shutdown()
+
+
+def test_unix_socket():
+    if not hasattr(asyncio, 'start_unix_server'):
+        pytest.skip('Unix sockets are not supported on this platform.')
+    path = os.path.join(tempfile.mkdtemp(), 'uwg.sock')
+    executor = ThreadPoolExecutor(1)
+
+    async def run():
+        async with ValidationServer(path=path, executor=executor) as server:
+            client = ValidationClient(server.address)
+            status, result = await client.validate('UWG', read_sample('uwg.json'))
+            assert status == 200 and result['valid']
+            await client.close()
+
+    asyncio.run(run())
+    executor.shutdown()
+
+
+def test_errors():
+    uwg = read_sample('uwg.json')
+    executor = FailingExecutor(1)
+
+    async def send(address, head):
+        reader, writer = await asyncio.open_connection(*address)
+        writer.write(head)
+        status = int((await reader.readline()).split()[1])
+        body = (await reader.read()).split(b'\r\n\r\n', 1)[1]
+        writer.close()
+        return status, json.loads(body)
+
+    async def run():
+        async with ValidationServer(executor=executor) as server:
+            client = ValidationClient(server.address)
+            status, result = await client.validate('UWG', uwg)
+            assert status == 500 and 'worker died' in result['error']
+            await client.close()
+
+            for length in (b'abc', b'-5'):
+                status, result = await send(
+                    server.address,
+                    b'POST /validate/UWG HTTP/1.1\r\nContent-Length: ' + length +
+                    b'\r\n\r\n')
+                assert status == 400 and 'Content-Length' in result['error']
+
+    asyncio.run(run())
+    executor.shutdown()
@@ -0,0 +1,101 @@
+from uwg_schema.session import ValidationSession, Rule, UWG_RULES
+from uwg_schema.model import UWG
+from uwg_schema.ref_bld_template import Material
+from pydantic import ValidationError
+import os
+import pytest
+
+root = os.path.dirname(os.path.dirname(__file__))
+target_folder = os.path.join(root, 'samples')
+
+
+@pytest.fixture
+def session():
+    model = UWG.parse_file(os.path.join(target_folder, 'custom_uwg.json'))
+    return ValidationSession(model, UWG_RULES)
+
+
+def test_assignment(session):
+    model = session.model
+    session.bldheight = 25
+    assert session.last_checked == ('bldheight',)
+    assert session.bldheight == 25
+    assert session.model.bldheight == 25
+    assert model.bldheight == 10
+
+    session.treecover = 0.3
+    assert session.last_checked == ('treecover', 'cover')
+
+    with pytest.raises(ValidationError):
+        session.bldheight = -1
+    with pytest.raises(ValidationError):
+        session.treecover = 0.95
+    assert session.bldheight == 25
+    assert session.treecover == 0.3
+    with pytest.raises(AttributeError):
+        session.not_a_field = 1
+
+
+def test_transaction(session):
+    with session.transaction():
+        session.grasscover = 0.6
+        session.treecover = 0.4
+        assert session.grasscover == 0.6
+        assert session.model.grasscover == 0.1
+    assert session.last_checked == ('grasscover', 'treecover', 'cover')
+    assert session.model.grasscover == 0.6
+
+    bld = [['largeoffice', 'new', 0.5], ['hospital', 'new', 0.5]]
+    with pytest.raises(ValidationError):
+        with session.transaction():
+            session.bld = bld
+            session.grasscover = 0.8
+    assert session.grasscover == 0.6
+    assert session.model.bld[2][0] == 'customhospital'
+
+    session.update(bld=bld, grasscover=0.5)
+    assert session.model.bld == bld
+    assert 'bld_refs' in session.last_checked
+
+
+def test_bld_refs(session):
+    with pytest.raises(ValidationError):
+        session.ref_bem_vector = None
+    session.bld = [['largeoffice', 'new', 1]]
+    session.ref_bem_vector = None
+    assert session.model.ref_bem_vector is None
+
+
+def test_bld_refs_mixed_case():
+    model = UWG.parse_file(os.path.join(target_folder, 'custom_uwg.json'))
+    bld = [['LargeOffice', 'New', 0.4], ['Hospital', 'NEW', 0.5],
+           ['CustomHospital', 'New', 0.1]]
+    session = ValidationSession(UWG.parse_obj(dict(model.dict(), bld=bld)), UWG_RULES)
+    session.bldheight = 20
+    with pytest.raises(ValidationError):
+        session.ref_sch_vector = session.ref_sch_vector[:1]
+
+
+def test_default_rules():
+    model = UWG.parse_file(os.path.join(target_folder, 'custom_uwg.json'))
+    model = UWG.parse_obj(dict(model.dict(), grasscover=0.6, treecover=0.6,
+                               ref_bem_vector=None))
+    with pytest.raises(ValidationError):
+        ValidationSession(model, UWG_RULES)
+    session = ValidationSession(model)
+    session.treecover = 0.7
+    assert session.last_checked == ('treecover',)
+    assert session.model.treecover == 0.7
+
+
+def test_custom_rules():
+    def check_name(values):
+        assert values['name'] != 'bad', 'Name must not be bad.'
+
+    rules = [Rule('name', ['name'], check_name)]
+    session = ValidationSession(
+        Material(thermalcond=1, volheat=1, name='wood'), rules)
+    session.thermalcond = 2
+    assert session.last_checked == ('thermalcond',)
+    with pytest.raises(ValidationError):
+        session.name = 'bad'
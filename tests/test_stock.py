@@ -0,0 +1,46 @@
+from uwg_schema.generator import ModelGenerator
+from uwg_schema.model import UWG
+import pytest
+
+np = pytest.importorskip('numpy')
+from uwg_schema.stock import stock_averages, BEM_PROPERTIES, SCHEDULES  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def models():
+    generator = ModelGenerator(seed=0, doe_buildings=0)
+    return [generator.instance(UWG).copy(update={'flr_h': None, 'glzr': None})
+            for _ in range(6)]
+
+
+def _expected(model, get):
+    bems = {(r.bldtype, r.builtera): r for r in model.ref_bem_vector}
+    return sum(frac * get(bems[(t, e)]) for t, e, frac in model.bld)
+
+
+def test_stock_averages(models):
+    averages = stock_averages(models)
+    assert len(averages) == 6
+    assert set(averages.bem) == set(BEM_PROPERTIES)
+    assert averages.schedules['occ'].shape == (6, 3, 24)
+    for i, model in enumerate(models):
+        assert averages.bem['u_value'][i] == \
+            pytest.approx(_expected(model, lambda b: b.building.u_value))
+        assert averages.bem['wall_thickness'][i] == \
+            pytest.approx(_expected(model, lambda b: sum(b.wall.layer_thickness_lst)))
+    chunked = stock_averages(models, chunk_size=4)
+    for name in SCHEDULES:
+        assert np.allclose(chunked.schedules[name], averages.schedules[name])
+
+
+def test_stock_average(models):
+    model = models[0]
+    schs = {(r.bldtype, r.builtera): r for r in model.ref_sch_vector}
+    average = model.stock_average()
+    expected = sum(frac * schs[(t, e)].occ[1][12] for t, e, frac in model.bld)
+    assert average['schedules']['occ'][1][12] == pytest.approx(expected)
+    assert isinstance(average['loads']['q_elec'], float)
+
+    average = model.copy(update={'glzr': 0.3, 'flr_h': 3.5}).stock_average()
+    assert average['bem']['glazing_ratio'] == 0.3
+    assert average['bem']['floor_height'] == 3.5
@@ -0,0 +1,78 @@
+from uwg_schema.generator import ModelGenerator
+from uwg_schema.model import UWG
+from uwg_schema.ref_bld_template import BEMDef, SchDef
+from uwg_schema.templates import ReferenceCache, REFERENCE_CACHE, resolve_references, \
+    set_reference_builder, get_reference
+import os
+import pytest
+
+root = os.path.dirname(os.path.dirname(__file__))
+target_folder = os.path.join(root, 'samples')
+
+
+class Builder(object):
+    """Reference builder that counts its calls."""
+
+    def __init__(self):
+        self.calls = 0
+        self.generator = ModelGenerator(seed=0)
+
+    def __call__(self, zone, bldtype, builtera):
+        self.calls += 1
+        bemdef = self.generator.payload(BEMDef)
+        schdef = self.generator.payload(SchDef)
+        for ref in (bemdef, schdef):
+            ref['bldtype'], ref['builtera'] = bldtype, builtera
+        return bemdef, schdef
+
+
+def test_cache():
+    builder = Builder()
+    cache = ReferenceCache(builder, maxsize=2)
+    bemdef, schdef = cache.get('1A', 'largeoffice', 'new')
+    assert isinstance(bemdef, BEMDef) and isinstance(schdef, SchDef)
+    assert cache.get('1A', 'largeoffice', 'new')[0] is bemdef
+    cache.get('2B', 'largeoffice', 'new')
+    cache.get('3A', 'hospital', 'pre80')
+    assert builder.calls == 3
+    info = cache.info()
+    assert (info.hits, info.misses, info.evictions, info.currsize) == (1, 3, 1, 2)
+
+    with pytest.raises(AssertionError):
+        cache.get('9Z', 'largeoffice', 'new')
+    with pytest.raises(LookupError):
+        ReferenceCache().get('1A', 'largeoffice', 'new')
+
+
+def test_resolve_references():
+    builder = Builder()
+    set_reference_builder(builder)
+    try:
+        model = UWG.parse_file(os.path.join(target_folder, 'custom_uwg.json'))
+        resolved = resolve_references(model)
+        assert [r[:3] for r in resolved] == [tuple(row) for row in model.bld]
+        # custom definitions override the cached ones
+        assert resolved[0][3] is model.ref_bem_vector[0]
+        assert resolved[2][4] is model.ref_sch_vector[1]
+        assert resolved[1][3] is get_reference('1A', 'hospital', 'new')[0]
+        for _ in range(10):
+            resolve_references(model.copy())
+        assert builder.calls == 1
+        assert REFERENCE_CACHE.info().hits == 11
+    finally:
+        set_reference_builder(None)
+
+
+def test_resolve_mixed_case():
+    builder = Builder()
+    cache = ReferenceCache(builder)
+    model = UWG.parse_file(os.path.join(target_folder, 'custom_uwg.json'))
+    bld = [('LargeOffice', 'New', 0.4), ('Hospital', 'NEW', 0.5),
+           ('CustomHospital', 'New', 0.1)]
+    model = UWG.parse_obj(dict(model.dict(), bld=bld))
+    resolved = resolve_references(model, cache)
+    assert [r[:3] for r in resolved] == [tuple(row) for row in model.bld]
+    assert resolved[0][3] is model.ref_bem_vector[0]
+    assert resolved[2][4] is model.ref_sch_vector[1]
+    assert resolved[1][3] is cache.get('1A', 'hospital', 'new')[0]
+    assert builder.calls == 1
@@ -0,0 +1,82 @@
+from uwg_schema.transport import pack, dumps, loads, SharedModels, PackedModel
+from uwg_schema.generator import ModelGenerator, MODELS
+from uwg_schema.model import UWG
+from functools import partial
+from multiprocessing import Pool
+import os
+import pickle
+import sys
+import pytest
+
+root = os.path.dirname(os.path.dirname(__file__))
+target_folder = os.path.join(root, 'samples')
+
+py38 = pytest.mark.skipif(sys.version_info < (3, 8), reason='requires Python 3.8')
+
+
+def fingerprint(model):
+    """Worker function that checks it received a model."""
+    assert isinstance(model, UWG)
+    return model.json()
+
+
+@pytest.mark.parametrize('model', MODELS)
+def test_pack(model):
+    generator = ModelGenerator(seed=0)
+    for _ in range(5):
+        instance = generator.instance(model)
+        packed = pack(instance)
+        assert isinstance(packed, PackedModel)
+        assert packed.unpack() == instance
+        for protocol in (2, pickle.HIGHEST_PROTOCOL):
+            new = pickle.loads(pickle.dumps(packed, protocol=protocol))
+            assert type(new) is model
+            assert new == instance
+            assert new.__fields_set__ == instance.__fields_set__
+
+
+def test_pack_floats():
+    model = UWG.parse_file(os.path.join(target_folder, 'custom_uwg.json'))
+    packed = pack(model)
+    # the schedules are moved out of the pickled state into the float buffer
+    assert len(packed.data) > 24 * 3
+    assert len(pickle.dumps(packed.state)) < len(pickle.dumps(model)) / 2
+
+
+@py38
+def test_out_of_band():
+    generator = ModelGenerator(seed=1)
+    models = [generator.instance(UWG) for _ in range(5)]
+    payload, buffers = dumps(models)
+    assert len(buffers) == 5
+    assert loads(payload, buffers) == models
+
+
+@py38
+def test_shared_models():
+    generator = ModelGenerator(seed=2)
+    models = [generator.instance(UWG) for _ in range(6)]
+    with SharedModels(models) as shared:
+        assert [ref.load() for ref in shared.refs] == models
+        assert pickle.loads(pickle.dumps(shared.refs)) == models
+        with Pool(2) as pool:
+            results = pool.map(fingerprint, shared.refs)
+    assert results == [m.json() for m in models]
+
+
+def attached_blocks(name, model):
+    """Worker function that counts the shared memory maps left by loading a model."""
+    assert isinstance(model, UWG)
+    with open('/proc/self/maps') as inf:
+        return sum(name.lstrip('/') in line for line in inf)
+
+
+@py38
+@pytest.mark.skipif(not os.path.exists('/proc/self/maps'), reason='requires Linux')
+def test_shared_models_detached():
+    generator = ModelGenerator(seed=3)
+    models = [generator.instance(UWG) for _ in range(4)]
+    # the pool is started first so that the workers do not inherit the mapping
+    with Pool(1) as pool, SharedModels(models) as shared:
+        counts = pool.map(partial(attached_blocks, shared.block.name), shared.refs)
+    assert counts == [0, 0, 0, 0]
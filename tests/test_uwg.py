@@ -1,6 +1,8 @@
 from uwg_schema.model import UWG
 from uwg_schema.ref_bld_template import Material, Element, Building, BEMDef, SchDef
+from pydantic import ValidationError
 import os
+import pytest
 
 # target folder where all of the samples live
 root = os.path.dirname(os.path.dirname(__file__))
@@ -40,3 +42,16 @@ def test_uwg():
 def test_custom_uwg():
     file_path = os.path.join(target_folder, 'custom_uwg.json')
     UWG.parse_file(file_path)
+
+
+def test_type_tag():
+    file_path = os.path.join(target_folder, 'bemdef.json')
+    bemdef = BEMDef.parse_file(file_path).dict()
+    bemdef['wall']['material_lst'][1]['type'] = 'Materials'
+    with pytest.raises(ValidationError) as error:
+        BEMDef.parse_obj(bemdef)
+    assert error.value.errors() == [{
+        'loc': ('wall', 'material_lst', 1, 'type'),
+        'msg': 'string does not match regex "^Material$"',
+        'type': 'value_error.str.regex', 'ctx': {'pattern': '^Material$'}}]
+    assert Material.schema()['properties']['type']['pattern'] == '^Material$'
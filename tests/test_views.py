@@ -0,0 +1,53 @@
+from uwg_schema.views import to_view, from_view, ElementView, UWGView
+from uwg_schema.generator import ModelGenerator, MODELS
+from uwg_schema.model import UWG
+from uwg_schema.ref_bld_template import Element
+import os
+import pickle
+import pytest
+
+root = os.path.dirname(os.path.dirname(__file__))
+target_folder = os.path.join(root, 'samples')
+
+
+def test_element_view():
+    element = Element.parse_file(os.path.join(target_folder, 'element.json'))
+    view = to_view(element)
+    assert isinstance(view, ElementView)
+    assert view.albedo == element.albedo
+    assert view.layer_thickness_lst == (0.01, 0.01, 0.0127)
+    assert view.material_lst[1].name == element.material_lst[1].name
+    assert not hasattr(view, '__dict__')
+    with pytest.raises(AttributeError):
+        view.albedo = 0.5
+    assert hash(view) == hash(to_view(element.copy(deep=True)))
+    assert pickle.loads(pickle.dumps(view)) == view
+    assert from_view(view) == element
+
+
+def test_uwg_view():
+    model = UWG.parse_file(os.path.join(target_folder, 'custom_uwg.json'))
+    view = to_view(model)
+    assert isinstance(view, UWGView)
+    assert view.ref_bem_vector[0].building.floor_height == 3.0
+    assert view.bld[2] == ('customhospital', 'new', 0.1)
+    assert view.shgc is None
+    hash(view)
+    assert from_view(view) == model
+
+
+@pytest.mark.parametrize('model', MODELS)
+def test_round_trip(model):
+    generator = ModelGenerator(seed=0)
+    for _ in range(10):
+        instance = generator.instance(model)
+        view = pickle.loads(pickle.dumps(to_view(instance)))
+        assert from_view(view) == instance
+
+
+def test_unknown_view():
+    with pytest.raises(TypeError) as error:
+        from_view((1, 2))
+    assert 'tuple' in str(error.value)
+    with pytest.raises(TypeError):
+        to_view(object())
@@ -0,0 +1,121 @@
+from uwg_schema.week_matrix import encode, decode, compact_dict, compact_json, \
+    EncodedWeekMatrix, RunLengthMatrix, run_length_matrices
+from uwg_schema.ref_bld_template import SchDef
+from uwg_schema.model import UWG
+from uwg_schema.report import validate
+import json
+import os
+import pickle
+import pytest
+
+root = os.path.dirname(os.path.dirname(__file__))
+target_folder = os.path.join(root, 'samples')
+
+
+def test_encode_decode():
+    matrix = [[0.15] * 6 + [0.5] * 18, [round(0.05 * i, 2) for i in range(24)],
+              [1.0] * 24]
+    encoded = encode(matrix)
+    assert encoded['encoding'] == 'uint8'
+    assert decode(encoded) == [[float(v) for v in row] for row in matrix]
+    EncodedWeekMatrix.parse_obj(encoded)
+
+    matrix = [[21.1 + i / 7 for i in range(24)]] * 3
+    assert encode(matrix)['encoding'] == 'float64'
+    assert decode(encode(matrix)) == matrix
+    assert decode(encode(matrix, 'float64')) == matrix
+    quantized = decode(encode(matrix, 'uint8'))
+    assert all(abs(a - b) <= 3.3 / 255 for a, b in zip(quantized[0], matrix[0]))
+
+    matrix = [[0.5, 0.25] * 12] * 3
+    assert decode(encode(matrix, 'float32')) == matrix
+
+
+def test_decode_errors():
+    encoded = encode([[0.5] * 24] * 3)
+    with pytest.raises(ValueError):
+        decode(dict(encoded, data=encoded['data'][:-4]))
+    with pytest.raises(ValueError):
+        decode(dict(encoded, data='not base64!'))
+    with pytest.raises(ValueError):
+        decode(dict(encoded, encoding='int16'))
+    with pytest.raises(ValueError):
+        decode(dict(encoded, extra=1))
+    with pytest.raises(ValueError):
+        encode([[0.5] * 24] * 2)
+
+
+def test_compact_schdef():
+    schdef = SchDef.parse_file(os.path.join(target_folder, 'schdef.json'))
+    text = compact_json(schdef)
+    assert len(text) * 2 < len(schdef.json())
+    assert SchDef.parse_raw(text) == schdef
+    data = compact_dict(schdef, 'float64')
+    assert data['elec']['encoding'] == 'float64'
+    assert SchDef.parse_obj(data) == schdef
+
+
+def test_compact_uwg():
+    model = UWG.parse_file(os.path.join(target_folder, 'custom_uwg.json'))
+    data = compact_dict(model)
+    assert data['schtraffic']['type'] == 'EncodedWeekMatrix'
+    assert data['ref_sch_vector'][0]['elec']['type'] == 'EncodedWeekMatrix'
+    assert UWG.parse_obj(data) == model
+
+    text = compact_json(model, exclude={'ref_bem_vector': ..., 'ref_sch_vector': {0}},
+                        indent=2)
+    data = json.loads(text)
+    assert 'ref_bem_vector' not in data and '\n' in text
+    assert len(data['ref_sch_vector']) == len(model.ref_sch_vector) - 1
+    assert data['ref_sch_vector'][0]['elec']['type'] == 'EncodedWeekMatrix'
+    assert compact_dict(model, exclude={'schtraffic'}).keys() == \
+        json.loads(compact_json(model, exclude={'schtraffic'})).keys()
+
+    data['ref_sch_vector'][0]['heat']['data'] = 'AAAA'
+    report = validate(json.dumps(data))
+    assert [e['pointer'] for e in report['errors']] == ['/ref_sch_vector/0/heat']
+
+
+def test_schema():
+    prop = SchDef.schema()['properties']['elec']
+    assert prop['anyOf'][0]['type'] == 'array'
+    assert prop['anyOf'][1]['title'] == 'EncodedWeekMatrix'
+    assert 'anyOf' in UWG.schema()['properties']['schtraffic']
+
+
+def test_run_length_matrix():
+    matrix = [[0.2] * 5 + [0.9] * 19, [0.9] * 24, [0.5] * 23 + [0.2]]
+    runs = RunLengthMatrix.from_matrix(matrix)
+    assert runs.values == (0.2, 0.9, 0.5, 0.2)
+    assert runs.ends == (5, 48, 71, 72)
+    assert runs.value(0, 4) == 0.2 and runs.value(1, 3) == 0.9
+    assert runs[2][23] == 0.2 and runs[-1] == matrix[2]
+    assert runs.tolist() == matrix and runs == matrix and matrix == runs
+    same = RunLengthMatrix((0.2, 0.9, 0.5, 0.2), (5, 48, 71, 72))
+    assert runs == same and hash(runs) == hash(same)
+    assert runs != RunLengthMatrix.from_matrix([[0.2] * 24] * 3)
+    assert pickle.loads(pickle.dumps(runs)) == runs
+
+
+def test_run_length_models():
+    with open(os.path.join(target_folder, 'custom_uwg.json')) as inf:
+        raw = inf.read()
+    model = UWG.parse_raw(raw)
+    with run_length_matrices():
+        runs = UWG.parse_raw(raw)
+        again = UWG.parse_obj(runs.dict())
+        with run_length_matrices(False):
+            assert isinstance(UWG.parse_raw(raw).schtraffic, list)
+    assert isinstance(runs.schtraffic, RunLengthMatrix)
+    assert isinstance(runs.ref_sch_vector[0].occ, RunLengthMatrix)
+    assert runs.ref_sch_vector[0].occ.values == (0.15,)
+    assert runs == model and again == runs
+    assert json.loads(runs.json()) == json.loads(model.json())
+    assert compact_json(runs) == compact_json(model)
+    assert isinstance(UWG.parse_obj(runs.dict()).schtraffic, list)
+
+    data = runs.dict()
+    assert type(data['schtraffic']) is list
+    assert type(data['ref_sch_vector'][0]['occ']) is list
+    assert json.loads(json.dumps(data)) == json.loads(model.json())
+    assert isinstance(runs.copy().schtraffic, RunLengthMatrix)
@@ -0,0 +1,123 @@
+from uwg_schema.window import open_epw, plan_window, window_key, EPWReader, \
+    SimulationWindow
+from uwg_schema import window as window_module
+from uwg_schema.model import UWG
+import os
+import pytest
+
+root = os.path.dirname(os.path.dirname(__file__))
+epw_path = os.path.join(root, 'tests', 'epw', 'SGP_Singapore.486980_IWEC.epw')
+target_folder = os.path.join(root, 'samples')
+
+
+@pytest.fixture(scope='module')
+def model():
+    return UWG.parse_file(os.path.join(target_folder, 'custom_uwg.json'))
+
+
+def test_epw_reader():
+    epw = open_epw(epw_path)
+    assert open_epw(epw_path) is epw
+    assert len(epw) == 8760 and not epw.leap_year
+    assert epw.first_weekday == 6  # Sunday
+    row = epw.row(0)
+    assert row[:4] == ['1989', '1', '1', '1']
+    temps = epw.columns(['dry_bulb_temperature'], 0, 3)['dry_bulb_temperature']
+    assert temps.tolist()[0] == 24.7
+
+
+def test_plan_window(model):
+    model = model.copy(update={'month': 2, 'day': 27, 'nday': 4, 'dtsim': 300,
+                               'dtweather': 3600, 'vegstart': 3, 'vegend': 10})
+    window = plan_window(model, epw_path)
+    assert plan_window(model, first_weekday=6) is window
+    assert len(window) == 4 * 288
+    assert window.steps_per_weather == 12
+    assert window.first_row == (31 + 26) * 24
+    assert window.stop_row == (31 + 30) * 24
+    assert window.weather_row[0] == window.first_row
+    assert window.weather_row[12] == window.first_row + 1
+    assert window.weather_row[-1] == window.stop_row - 1
+    assert window.hour[0] == 0 and window.hour[287] == 23
+    # Feb 27 1989 is a Monday when Jan 1 is a Sunday
+    assert window.day_type[0] == 0
+    assert window.veg_active[0] == 0
+    assert window.veg_active[-1] == 1  # March 2
+    weather = window.weather(epw_path, ('dry_bulb_temperature',))
+    assert len(weather['dry_bulb_temperature']) == 4 * 24
+
+
+def test_day_types(model):
+    model = model.copy(update={'month': 1, 'day': 1, 'nday': 7, 'dtsim': 3600})
+    window = plan_window(model, first_weekday=0)
+    assert window.day_type[::24].tolist() == [0, 0, 0, 0, 0, 1, 2]
+
+
+def test_invalid_window(model):
+    key = window_key(model)
+    with pytest.raises(ValueError):
+        SimulationWindow((2, 30) + key[2:], 0)
+    with pytest.raises(ValueError):
+        SimulationWindow((12, 31, 2) + key[3:], 0)
+    with pytest.raises(ValueError):
+        SimulationWindow(key[:3] + (7, 3600) + key[5:], 0)
+    with pytest.raises(ValueError):
+        plan_window(model)
+    assert isinstance(open_epw(epw_path), EPWReader)
+
+
+def _write_epw(path, days=365, temperature=24.7):
+    with open(epw_path) as inf:
+        lines = inf.readlines()
+    header, rows = lines[:8], lines[8:]
+    if days == 366:
+        # repeat Feb 28 as Feb 29
+        feb_28 = rows[58 * 24:59 * 24]
+        rows[59 * 24:59 * 24] = [r.replace(',2,28,', ',2,29,', 1) for r in feb_28]
+    first = rows[0].split(',')
+    first[6] = str(temperature)
+    rows[0] = ','.join(first)
+    with open(str(path), 'w') as outf:
+        outf.writelines(header + rows)
+    return str(path)
+
+
+def test_modified_epw(tmp_path):
+    path = _write_epw(tmp_path / 'weather.epw')
+    epw = open_epw(path)
+    assert epw.row(0)[6] == '24.7'
+    # an open memory map prevents writing to the file on Windows
+    epw.close()
+    reopened = open_epw(path)
+    assert reopened is not epw and not reopened.closed
+    reopened.close()
+    _write_epw(path, temperature=-5.25)
+    with open_epw(path) as new_epw:
+        assert new_epw.row(0)[6] == '-5.25'
+
+
+def test_evicted_epw(tmp_path):
+    readers = [open_epw(_write_epw(tmp_path / '{}.epw'.format(i)))
+               for i in range(window_module._readers.maxsize + 1)]
+    assert window_module._readers.info().evictions >= 1
+    assert all(not r.closed for r in readers)
+    assert readers[0].row(0)[6] == '24.7'
+    for reader in readers:
+        reader.close()
+
+
+def test_leap_year(tmp_path, model):
+    epw = open_epw(_write_epw(tmp_path / 'leap.epw', days=366))
+    assert len(epw) == 8784 and epw.leap_year
+    model = model.copy(update={'month': 2, 'day': 29, 'nday': 2, 'dtsim': 3600,
+                               'dtweather': 3600, 'vegstart': 3, 'vegend': 10})
+    window = plan_window(model, epw)
+    assert window.leap_year
+    assert window.first_row == (31 + 28) * 24
+    assert window.veg_active[0] == 0 and window.veg_active[-1] == 1
+    assert epw.row(window.first_row)[1:4] == ['2', '29', '1']
+    with pytest.raises(ValueError):
+        plan_window(model, first_weekday=6)
+    end = model.copy(update={'month': 12, 'day': 31, 'nday': 1})
+    assert plan_window(end, epw).stop_row == len(epw)
+    epw.close()
@@ -1,5 +1,7 @@
 """Base class for all objects requiring a valid names for all engines."""
 from pydantic import BaseModel, Field, Extra
+from pydantic.errors import StrRegexError
+from pydantic.validators import str_validator
 
 
 class NoExtraBaseModel(BaseModel):
@@ -10,3 +12,36 @@ class NoExtraBaseModel(BaseModel):
 
     class Config:
         extra = Extra.forbid
+
+
+class TypeTag(str):
+    """Text that must exactly match the tag of a class created with type_tag.
+
+    The value is checked with a string comparison in place of the regex of a
+    constr(regex='^Tag$') field. The errors and the schema, including its pattern,
+    are the same as for the constr field.
+    """
+    tag = ''
+    pattern = '^$'
+
+    @classmethod
+    def __get_validators__(cls):
+        yield cls.validate
+
+    @classmethod
+    def __modify_schema__(cls, field_schema):
+        field_schema['pattern'] = cls.pattern
+
+    @classmethod
+    def validate(cls, value):
+        if value.__class__ is str and value == cls.tag:
+            return value  # fast path for the tags of regular payloads
+        value = str_validator(value)
+        if value != cls.tag:
+            raise StrRegexError(pattern=cls.pattern)
+        return value
+
+
+def type_tag(tag):
+    """Return a TypeTag class for the type field of a model."""
+    return type('TypeTagValue', (TypeTag,), {'tag': tag, 'pattern': '^{}$'.format(tag)})
@@ -0,0 +1,75 @@
+"""Size-bounded least recently used cache with hit, miss and eviction counters."""
+import threading
+from collections import OrderedDict, namedtuple
+
+CacheInfo = namedtuple(
+    'CacheInfo', 'hits misses evictions currsize maxsize currbytes maxbytes')
+
+
+class LRUCache(object):
+    """Thread-safe least recently used cache.
+
+    Args:
+        maxsize: Maximum number of items. None for no limit. (Default: 128).
+        maxbytes: Optional maximum total size of the items. Item sizes are given
+            when they are added to the cache.
+    """
+
+    def __init__(self, maxsize=128, maxbytes=None):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """Return the item for key and mark it as recently used."""
+        with self._lock:
+            try:
+                value, size = self._items[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, size=0):
+        """Add an item, evicting the least recently used items to stay in bounds.
+
+        Items larger than maxbytes are not cached.
+        """
+        with self._lock:
+            if key in self._items:
+                self._bytes -= self._items.pop(key)[1]
+            if self.maxbytes is not None and size > self.maxbytes:
+                return
+            self._items[key] = (value, size)
+            self._bytes += size
+            while (self.maxsize is not None and len(self._items) > self.maxsize) or \
+                    (self.maxbytes is not None and self._bytes > self.maxbytes):
+                _, (_, old_size) = self._items.popitem(last=False)
+                self._bytes -= old_size
+                self.evictions += 1
+
+    def info(self):
+        """Return a CacheInfo with the counters and the current size of the cache."""
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.evictions, len(self._items),
+                             self.maxsize, self._bytes, self.maxbytes)
+
+    def clear(self):
+        """Remove every item and reset the counters."""
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def __len__(self):
+        return len(self._items)
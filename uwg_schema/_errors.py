@@ -0,0 +1,31 @@
+"""Collect every error found by a validator before raising them together."""
+from pydantic import ValidationError
+from pydantic.error_wrappers import ErrorWrapper
+
+
+class ErrorCollector(object):
+    """Collect validation errors with their location inside the validated value.
+
+    Raising the collected errors from a validator reports each of them with its own
+    location, for example ('bld', 2, 1), instead of stopping at the first one.
+
+    Args:
+        model: The model class that is being validated.
+    """
+    __slots__ = ('model', 'errors')
+
+    def __init__(self, model):
+        self.model = model
+        self.errors = []
+
+    def add(self, message, *loc):
+        """Add an error at a location inside the validated value."""
+        self.errors.append(ErrorWrapper(AssertionError(message), loc=loc))
+
+    def raise_errors(self):
+        """Raise a ValidationError with every collected error, if any."""
+        if self.errors:
+            raise ValidationError(self.errors, self.model)
+
+    def __bool__(self):
+        return bool(self.errors)
@@ -1,8 +1,59 @@
+"""Generate an OpenAPI document from pydantic models.
+
+The schemas that pydantic generates are post-processed by a pipeline of stages in a
+single pass. For each schema, in the order of the sorted schema names, get_openapi
+calls the enter method of every stage, then the visit_property method of every stage
+for each property of the schema and then the leave method of every stage. The finish
+method of every stage is called once at the end with the whole document.
+
+Models whose schemas are only added inline, such as the EncodedWeekMatrix
+alternative of the week matrices, can be shared as a component schema so that every
+copy becomes a $ref and the stages process the schema like any other component.
+
+.. code-block:: python
+
+    stages = default_stages() + [SetDefault('UWG', 'version', '1.2.3')]
+    open_api = get_openapi([UWG], version='1.2.3', stages=stages,
+                           shared=[EncodedWeekMatrix])
+
+get_uwg_openapi returns the published document of the UWG model, which docs.py
+writes and the validation server returns.
+"""
 from pydantic.utils import get_model
 from pydantic.schema import schema, get_flat_models_from_model, get_model_name_map
 from typing import Dict, List, Any
+import copy
 import enum
 
+from .model import UWG
+from .week_matrix import EncodedWeekMatrix
+
+# info of the published UWG document. get_uwg_openapi sets the version
+UWG_INFO = {
+    "description": "",
+    "version": None,
+    "title": "",
+    "contact": {
+        "name": "Ladybug Tools",
+        "email": "info@ladybug.tools",
+        "url": "https://github.com/ladybug-tools/uwg-schema"
+    },
+    "x-logo": {
+        "url": "https://github.com/ladybug-tools/artwork/raw/master/"
+        "icons_components/dragonfly/png/uwg.png",
+        "altText": "UWG logo"
+    },
+    "license": {
+        "name": "MIT",
+        "url": "https://github.com/ladybug-tools/uwg-schema/blob/master/LICENSE"
+    }
+}
+
+UWG_EXTERNAL_DOCS = {
+    "description": "OpenAPI Specification",
+    "url": "./uwg.json"
+}
+
 # base open api dictionary for all schemas
 _base_open_api = {
     "openapi": "3.0.2",
@@ -21,6 +72,215 @@ _base_open_api = {
 }
 
 
+class SchemaNode(object):
+    """A schema of the document with its properties and required names resolved.
+
+    Schemas of models that inherit from another model keep their properties in the
+    second item of allOf. Enum schemas have no properties.
+
+    Args:
+        name: The name of the schema.
+        schema: The schema dictionary.
+    """
+    __slots__ = ('name', 'schema', 'properties', 'required')
+
+    def __init__(self, name, schema):
+        self.name = name
+        self.schema = schema
+        if 'properties' in schema:
+            self.properties = schema['properties']
+        elif 'enum' in schema:
+            self.properties = None
+        else:
+            self.properties = schema['allOf'][1]['properties']
+        if 'required' in schema:
+            self.required = schema['required']
+        elif 'allOf' in schema:
+            self.required = schema['allOf'][1].get('required')
+        else:
+            self.required = None
+
+    def set_properties(self, properties):
+        """Replace the properties dictionary of the schema."""
+        if 'properties' in self.schema:
+            self.schema['properties'] = properties
+        else:
+            self.schema['allOf'][1]['properties'] = properties
+        self.properties = properties
+
+
+class Stage(object):
+    """Base class of the transforms of the OpenAPI post-processing pipeline.
+
+    Subclasses override the methods that they need. Stages can keep state between
+    the calls of a single get_openapi call, so each call needs new stage objects.
+    """
+
+    def enter(self, node):
+        """Process a SchemaNode before its properties are visited."""
+
+    def visit_property(self, node, name, prop):
+        """Return the processed schema of a property of a SchemaNode."""
+        return prop
+
+    def leave(self, node):
+        """Process a SchemaNode after its properties are visited."""
+
+    def finish(self, open_api):
+        """Process the whole document after every schema is visited."""
+
+
+class Tags(Stage):
+    """Add a tag and an x-tagGroups entry for each schema."""
+
+    def __init__(self):
+        # goes to tags
+        self.tags = []
+        # goes to x-tagGroups['tags']
+        self.tag_names = []
+
+    def enter(self, node):
+        model_name, tag = create_tag(node.name)
+        self.tag_names.append(model_name)
+        self.tags.append(tag)
+
+    def finish(self, open_api):
+        open_api['tags'] = self.tags
+        open_api['x-tagGroups'][0]['tags'] = sorted(self.tag_names)
+
+
+class ReadOnlyType(Stage):
+    """Make the type property of every object readOnly, adding it if needed."""
+
+    def enter(self, node):
+        properties = node.properties
+        if properties is None:
+            return
+        try:
+            properties['type']['readOnly'] = True
+        except KeyError:
+            # no type has been set in properties for this object
+            properties['type'] = {
+                'title': 'Type', 'default': f'{node.name}', 'type': 'string',
+                'pattern': f'^{node.name}$', 'readOnly': True,
+            }
+
+
+class NumberFormats(Stage):
+    """Add formats to numbers and integers. This is helpful for C# generators."""
+
+    def visit_property(self, node, name, prop):
+        try:
+            return set_format(prop)
+        except KeyError:
+            # referenced object
+            if 'anyOf' in prop:
+                prop['anyOf'] = [set_format(item) for item in prop['anyOf']]
+            return prop
+
+
+class RequiredFirst(Stage):
+    """Sort the properties of each schema to keep the required ones on top."""
+
+    def leave(self, node):
+        if node.properties is None or node.required is None:
+            return
+        required = set(node.required)
+        sorted_props = {}
+        optional = {}
+        for prop, value in node.properties.items():
+            if prop in required:
+                sorted_props[prop] = value
+            else:
+                optional[prop] = value
+        sorted_props.update(optional)
+        node.set_properties(sorted_props)
+
+
+class SetDefault(Stage):
+    """Set the default value of a property of a schema.
+
+    Args:
+        schema_name: The name of the schema.
+        name: The name of the property.
+        value: The new default value.
+    """
+
+    def __init__(self, schema_name, name, value):
+        self.schema_name = schema_name
+        self.name = name
+        self.value = value
+
+    def enter(self, node):
+        if node.name == self.schema_name:
+            node.properties[self.name]['default'] = self.value
+
+
+def default_stages():
+    """Return new instances of the default post-processing stages."""
+    return [Tags(), ReadOnlyType(), NumberFormats(), RequiredFirst()]
+
+
+def run_stages(open_api, schemas, stages):
+    """Post-process schemas with a pipeline of stages in a single pass.
+
+    Args:
+        open_api: The OpenAPI document dictionary.
+        schemas: The dictionary of schema definitions. It is changed in place.
+        stages: A list of Stage objects.
+    """
+    visitors = [s for s in stages if type(s).visit_property is not Stage.visit_property]
+    for name in sorted(schemas):
+        node = SchemaNode(name, schemas[name])
+        for stage in stages:
+            stage.enter(node)
+        properties = node.properties
+        if properties is not None and visitors:
+            for prop_name, prop in properties.items():
+                for stage in visitors:
+                    prop = stage.visit_property(node, prop_name, prop)
+                properties[prop_name] = prop
+        for stage in stages:
+            stage.leave(node)
+    for stage in stages:
+        stage.finish(open_api)
+
+
+def share_schemas(schemas, models, ref_prefix='#/components/schemas/'):
+    """Replace the inline schemas of models with references to shared schemas.
+
+    The schema of each model and of its sub-models are added to schemas if at least
+    one inline copy of it was replaced.
+
+    Args:
+        schemas: The dictionary of schema definitions. It is changed in place.
+        models: A list of pydantic model classes.
+        ref_prefix: The prefix of the references. (Default: #/components/schemas/).
+    """
+    for model in models:
+        name = model.__name__
+        inline = model.schema()
+        ref = {'$ref': ref_prefix + name}
+        replaced = []
+
+        def replace(value):
+            if value == inline:
+                replaced.append(True)
+                return dict(ref)
+            if isinstance(value, dict):
+                return {k: replace(v) for k, v in value.items()}
+            if isinstance(value, list):
+                return [replace(v) for v in value]
+            return value
+
+        for key in list(schemas):
+            schemas[key] = replace(schemas[key])
+        if replaced:
+            definitions = schema([model], ref_prefix=ref_prefix)['definitions']
+            for key, value in definitions.items():
+                schemas.setdefault(key, value)
+
+
 def get_openapi(
     base_object: List[Any],
     title: str = None,
@@ -28,10 +288,19 @@ def get_openapi(
     openapi_version: str = "3.0.2",
     description: str = None,
     info: dict = None,
-    external_docs: dict = None
+    external_docs: dict = None,
+    stages: List[Stage] = None,
+    shared: List[Any] = None
         ) -> Dict:
-    """Return UWG Schema as an openapi compatible dictionary."""
-    open_api = dict(_base_open_api)
+    """Return UWG Schema as an openapi compatible dictionary.
+
+    Args:
+        stages: Optional list of post-processing Stage objects. Defaults to
+            default_stages().
+        shared: Optional list of model classes whose inline schemas are replaced
+            with references to a shared component schema (see share_schemas).
+    """
+    open_api = copy.deepcopy(_base_open_api)
 
     open_api['openapi'] = openapi_version
 
@@ -56,90 +325,29 @@ def get_openapi(
         open_api['externalDocs'] = external_docs
 
     schemas = schema(base_object, ref_prefix='#/components/schemas/')['definitions']
+    if shared:
+        share_schemas(schemas, shared)
+    run_stages(open_api, schemas, default_stages() if stages is None else stages)
+    open_api['components']['schemas'] = schemas
 
-    # goes to tags
-    tags = []
-    # goes to x-tagGroups['tags']
-    tag_names = []
-
-    schema_names = list(schemas.keys())
-    schema_names.sort()
-
-    for name in schema_names:
-        model_name, tag = create_tag(name)
-        tag_names.append(model_name)
-        tags.append(tag)
-
-        # sort properties order: put required parameters at begining of the list
-        s = schemas[name]
-
-        if 'properties' in s:
-            properties = s['properties']
-        elif 'enum' in s:
-            # enum
-            continue
-        else:
-            properties = s['allOf'][1]['properties']
-
-        # make all types readOnly
-        try:
-            properties['type']['readOnly'] = True
-        except KeyError:
-            # no type has been set in properties for this object
-            typ = {
-                'title': 'Type', 'default': f'{name}', 'type': 'string',
-                'pattern': f'^{name}$', 'readOnly': True,
-            }
-            properties['type'] = typ
-        # add format to numbers and integers
-        # this is helpful for C# generators
-        for prop in properties:
-            try:
-                properties[prop] = set_format(properties[prop])
-            except KeyError:
-                # referenced object
-                if 'anyOf' in properties[prop]:
-                    new_any_of = []
-                    for item in properties[prop]['anyOf']:
-                        new_any_of.append(set_format(item))
-                    properties[prop]['anyOf'] = new_any_of
-                else:
-                    continue
-
-        # sort fields to keep required ones on top
-        if 'required' in s:
-            required = s['required']
-        elif 'allOf' in s:
-            try:
-                required = s['allOf'][1]['required']
-            except KeyError:
-                # no required field
-                continue
-        else:
-            continue
-
-        sorted_props = {}
-        optional = {}
-        for prop, value in properties.items():
-            if prop in required:
-                sorted_props[prop] = value
-            else:
-                optional[prop] = value
-
-        sorted_props.update(optional)
-
-        if 'properties' in s:
-            s['properties'] = sorted_props
-        else:
-            s['allOf'][1]['properties'] = sorted_props
+    return open_api
 
-    tag_names.sort()
-    open_api['tags'] = tags
-    open_api['x-tagGroups'][0]['tags'] = tag_names
 
-    open_api['components']['schemas'] = schemas
+def get_uwg_openapi(version):
+    """Return the published OpenAPI document of the UWG model.
 
-    return open_api
+    The version is set in the info of the document and as the default of the
+    version property of the UWG schema. The week matrix properties share one
+    EncodedWeekMatrix component schema.
+    """
+    return get_openapi(
+        [UWG],
+        title='UWG Model Schema',
+        description='This is the documentation for UWG model schema.',
+        version=version, info=dict(copy.deepcopy(UWG_INFO), version=version),
+        external_docs=copy.deepcopy(UWG_EXTERNAL_DOCS),
+        stages=default_stages() + [SetDefault('UWG', 'version', version)],
+        shared=[EncodedWeekMatrix])
 
 
 def create_tag(name):
@@ -165,3 +373,4 @@ def set_format(p):
     elif p['type'] == 'array':
         p['items'] = set_format(p['items'])
     return p
+
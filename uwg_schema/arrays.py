@@ -0,0 +1,221 @@
+"""Convert batches of UWG models to and from NumPy structured arrays.
+
+NumPy is an optional dependency of uwg-schema and is only imported when one of these
+functions is called.
+"""
+from operator import attrgetter
+
+from pydantic import ValidationError
+from pydantic.error_wrappers import ErrorWrapper
+from pydantic.errors import MissingError
+from pydantic.fields import SHAPE_SINGLETON
+
+from .model import UWG, REF_ZONETYPE
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError(
+            'numpy must be installed to convert UWG models to arrays. '
+            'Install it with "pip install numpy".')
+    return numpy
+
+
+def _scalar_fields():
+    """Return a list of (name, dtype) for every scalar UWG field except type.
+
+    Text fields other than zone get a width of 32 characters. to_arrays widens them
+    to the longest value of a batch.
+    """
+    fields = []
+    for name, field in UWG.__fields__.items():
+        if name == 'type' or field.shape != SHAPE_SINGLETON:
+            continue
+        if field.type_ is bool:
+            fields.append((name, '?'))
+        elif issubclass(field.type_, int):
+            fields.append((name, 'i8'))
+        elif issubclass(field.type_, float):
+            fields.append((name, 'f8'))
+        elif name == 'zone':
+            fields.append((name, 'U%d' % max(len(z) for z in REF_ZONETYPE)))
+        elif issubclass(field.type_, str):
+            fields.append((name, 'U32'))
+    return fields
+
+
+SCALAR_FIELDS = _scalar_fields()
+SCALAR_NAMES = tuple(name for name, _ in SCALAR_FIELDS)
+
+
+def scalar_dtype(widths=None):
+    """Return the NumPy structured dtype with one column per scalar UWG field.
+
+    Optional float fields such as shgc use NaN in place of None.
+
+    Args:
+        widths: Optional dictionary with the number of characters of text columns
+            that must be wider than in SCALAR_FIELDS, such as version.
+    """
+    if not widths:
+        return _numpy().dtype(SCALAR_FIELDS)
+    return _numpy().dtype([(name, 'U%d' % max(widths[name], int(dtype[1:])))
+                           if name in widths else (name, dtype)
+                           for name, dtype in SCALAR_FIELDS])
+
+
+def to_arrays(models):
+    """Export a sequence of UWG models to NumPy arrays.
+
+    The arrays have no columns for the bld, ref_bem_vector and ref_sch_vector of
+    the models. The bld can be passed back to from_arrays separately but the
+    reference vectors are not exported and are lost on a round trip.
+
+    Args:
+        models: A sequence of validated UWG models.
+
+    Returns:
+        A tuple with two items.
+
+        -   records: A structured array of shape (N,) with one column per scalar
+            field, in the order of scalar_dtype().
+
+        -   schtraffic: A float array of shape (N, 3, 24) with the traffic schedules.
+    """
+    records = to_records(models)
+    schtraffic = _numpy().array([m.schtraffic for m in models], dtype='f8') \
+        .reshape(len(records), 3, 24)
+    return records, schtraffic
+
+
+def to_records(models):
+    """Export the scalar fields of a sequence of UWG models to a structured array.
+
+    This is the records array of to_arrays without the traffic schedules.
+    """
+    getter = attrgetter(*SCALAR_NAMES)
+    rows = [getter(m) for m in models]
+    # text columns are widened so that long values are not truncated
+    widths = {name: max(len(row[i]) for row in rows)
+              for i, (name, dtype) in enumerate(SCALAR_FIELDS)
+              if dtype.startswith('U') and rows}
+    return _numpy().array(rows, dtype=scalar_dtype(widths))
+
+
+def from_arrays(records, schtraffic=None, bld=None, validate=True):
+    """Create UWG models from NumPy arrays produced by to_arrays.
+
+    Field constraints are checked column by column over the whole batch, after which
+    the models are constructed without running the per-instance pydantic validation.
+
+    Args:
+        records: A structured array with a column for every required scalar UWG
+            field. Missing optional columns take their default values.
+        schtraffic: Optional float array of shape (N, 3, 24). If None, the default
+            traffic schedule is used for every model. NaN values are invalid.
+        bld: Optional sequence of N bld arrays. If None, the default bld is used.
+        validate: Set to False to skip the value checks for arrays that are
+            known to come from validated models. The required columns are
+            checked in any case. (Default: True).
+
+    Returns:
+        A list of UWG models. The ref_bem_vector and ref_sch_vector of the models
+        are None.
+
+    Raises:
+        ValidationError: If a required column is missing or any value breaks a
+            field constraint. The error lists every failure in the batch, located
+            by (row, field).
+    """
+    np = _numpy()
+    count = len(records)
+    names = [n for n in SCALAR_NAMES if n in records.dtype.names]
+    if schtraffic is not None:
+        schtraffic = np.asarray(schtraffic, dtype='f8')
+        assert schtraffic.shape == (count, 3, 24), 'schtraffic must have a shape ' \
+            'of ({}, 3, 24). Got: {}.'.format(count, schtraffic.shape)
+    if bld is not None:
+        assert len(bld) == count, 'bld must have one item per record. ' \
+            'Got {} and {}.'.format(len(bld), count)
+
+    errors = [ErrorWrapper(MissingError(), loc=(name,))
+              for name, field in UWG.__fields__.items()
+              if field.required and field.shape == SHAPE_SINGLETON
+              and name not in names]
+    if validate:
+        errors.extend(_check_columns(np, records, names))
+        if schtraffic is not None:
+            for i, day, hour in np.argwhere(np.isnan(schtraffic)).tolist():
+                errors.append(ErrorWrapper(
+                    ValueError('invalid value for schtraffic: nan'),
+                    loc=(i, 'schtraffic', day, hour)))
+    if bld is not None:
+        field = UWG.__fields__['bld']
+        validated = []
+        for i, value in enumerate(bld):
+            value, error = field.validate(value, {}, loc=(i, 'bld'), cls=UWG)
+            if error:
+                errors.append(error)
+            validated.append(value)
+        bld = validated
+    if errors:
+        raise ValidationError(errors, UWG)
+
+    # optional floats are stored as NaN
+    nulls = {}
+    for name in names:
+        field = UWG.__fields__[name]
+        if field.allow_none and records.dtype[name].kind == 'f':
+            rows = np.flatnonzero(np.isnan(records[name]))
+            if len(rows):
+                nulls[name] = rows
+
+    rows = [dict(zip(names, row)) for row in records[names].tolist()]
+    for name, indices in nulls.items():
+        for i in indices.tolist():
+            rows[i][name] = None
+    if schtraffic is not None:
+        for row, matrix in zip(rows, schtraffic.tolist()):
+            row['schtraffic'] = matrix
+    if bld is not None:
+        for row, value in zip(rows, bld):
+            row['bld'] = value
+    return [UWG.construct(**row) for row in rows]
+
+
+def _check_columns(np, records, names):
+    """Yield an ErrorWrapper for every cell that breaks a field constraint."""
+    for name in names:
+        field = UWG.__fields__[name]
+        info = field.field_info
+        column = records[name]
+        bad = np.zeros(len(column), dtype=bool)
+        if column.dtype.kind == 'f':
+            nan = np.isnan(column)
+            if not field.allow_none:
+                bad |= nan
+            checks = [(info.ge, np.less), (info.gt, np.less_equal),
+                      (info.le, np.greater), (info.lt, np.greater_equal)]
+            for limit, op in checks:
+                if limit is not None:
+                    bad |= ~nan & op(column, limit)
+        elif column.dtype.kind == 'i':
+            checks = [(info.ge, np.less), (info.gt, np.less_equal),
+                      (info.le, np.greater), (info.lt, np.greater_equal)]
+            for limit, op in checks:
+                if limit is not None:
+                    bad |= op(column, limit)
+        elif name == 'zone':
+            bad |= ~np.isin(column, REF_ZONETYPE)
+        elif name == 'version':
+            versions = UWG.__fields__['version']
+            invalid = [v for v in np.unique(column).tolist()
+                       if versions.validate(v, {}, loc=name, cls=UWG)[1]]
+            bad |= np.isin(column, invalid)
+        for i in np.flatnonzero(bad).tolist():
+            value = column[i].item()
+            yield ErrorWrapper(
+                ValueError('invalid value for {}: {}'.format(name, value)),
+                loc=(i, name))
@@ -0,0 +1,191 @@
+"""Read and write collections of UWG models as Apache Parquet or Arrow IPC files.
+
+The Arrow schema is derived from the pydantic models so that the two stay in sync.
+Nested objects become struct columns, lists of objects become list columns, every
+WEEK_MATRIX becomes a 3 x 24 fixed-size list and each bld row becomes a struct of
+bldtype, builtera and fraction.
+
+pyarrow is an optional dependency of uwg-schema and is only imported when one of
+these functions is called.
+"""
+from pydantic import BaseModel
+from pydantic.fields import SHAPE_LIST
+
+from .model import UWG
+from .ref_bld_template import WEEK_MATRIX
+
+BLD_KEYS = ('bldtype', 'builtera', 'fraction')
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.dataset
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError(
+            'pyarrow must be installed to read and write UWG models as Arrow or '
+            'Parquet files. Install it with "pip install pyarrow".')
+    return pyarrow
+
+
+def arrow_type(field):
+    """Return the Arrow data type for a pydantic model field."""
+    pa = _pyarrow()
+    if field.outer_type_ is WEEK_MATRIX:
+        return pa.list_(pa.list_(pa.float64(), 24), 3)
+    if field.name == 'bld':
+        return pa.list_(pa.struct([
+            pa.field('bldtype', pa.string(), nullable=False),
+            pa.field('builtera', pa.string(), nullable=False),
+            pa.field('fraction', pa.float64(), nullable=False)
+        ]))
+    if isinstance(field.type_, type) and issubclass(field.type_, BaseModel):
+        item = pa.struct(arrow_schema(field.type_))
+    elif field.type_ is bool:
+        item = pa.bool_()
+    elif issubclass(field.type_, int):
+        item = pa.int64()
+    elif issubclass(field.type_, float):
+        item = pa.float64()
+    elif issubclass(field.type_, str):  # also covers str enumerations
+        item = pa.string()
+    else:
+        raise TypeError(
+            'No Arrow type is defined for field {} of type {}.'.format(
+                field.name, field.outer_type_))
+    return pa.list_(item) if field.shape == SHAPE_LIST else item
+
+
+def arrow_schema(model=UWG):
+    """Return the Arrow schema for a pydantic model class."""
+    pa = _pyarrow()
+    return pa.schema([
+        pa.field(name, arrow_type(field), nullable=field.allow_none)
+        for name, field in model.__fields__.items()
+    ])
+
+
+def to_table(models):
+    """Return an Arrow table for a sequence of UWG models."""
+    pa = _pyarrow()
+    rows = []
+    for model in models:
+        row = model.dict()
+        row['bld'] = [dict(zip(BLD_KEYS, bld_row)) for bld_row in row['bld']]
+        rows.append(row)
+    return pa.Table.from_pylist(rows, schema=arrow_schema(UWG))
+
+
+def from_table(table):
+    """Validate every row of an Arrow table or record batch into UWG models."""
+    models = []
+    for row in table.to_pylist():
+        row['bld'] = [[r[k] for k in BLD_KEYS] for r in row['bld']]
+        models.append(UWG.parse_obj(row))
+    return models
+
+
+def write_parquet(models, where, batch_size=10000, compression='zstd'):
+    """Write UWG models to a Parquet file.
+
+    Args:
+        models: An iterable of UWG models. Models are converted batch by batch so
+            the iterable can be a generator over a collection larger than memory.
+        where: Path to the output file.
+        batch_size: Number of models in each row group. Smaller row groups let
+            filtered reads skip more data. (Default: 10000).
+        compression: Parquet compression codec. (Default: zstd).
+    """
+    pa = _pyarrow()
+    schema = arrow_schema(UWG)
+    with pa.parquet.ParquetWriter(where, schema, compression=compression) as writer:
+        for batch in _chunks(models, batch_size):
+            writer.write_table(to_table(batch), row_group_size=batch_size)
+
+
+def write_ipc(models, where, batch_size=10000):
+    """Write UWG models to an Arrow IPC (Feather V2) file.
+
+    Args:
+        models: An iterable of UWG models.
+        where: Path to the output file.
+        batch_size: Number of models in each record batch. (Default: 10000).
+    """
+    pa = _pyarrow()
+    with pa.ipc.new_file(where, arrow_schema(UWG)) as writer:
+        for batch in _chunks(models, batch_size):
+            writer.write_table(to_table(batch))
+
+
+def iter_batches(source, filters=None, batch_size=10000, format='parquet'):
+    """Yield lists of validated UWG models from a Parquet or Arrow IPC file.
+
+    Args:
+        source: Path to a file or directory written by write_parquet or write_ipc.
+        filters: Optional filter on scalar fields. This can be a
+            pyarrow.compute.Expression or a list of (field, op, value) tuples that
+            must all be true, for example [('zone', '=', '1A'),
+            ('bldheight', '>', 10)]. Row groups whose statistics cannot match the
+            filter are skipped without being read.
+        batch_size: Maximum number of models validated and yielded at a time.
+            (Default: 10000).
+        format: Either 'parquet' or 'ipc'. (Default: parquet).
+    """
+    pa = _pyarrow()
+    dataset = pa.dataset.dataset(source, schema=arrow_schema(UWG), format=format)
+    expression = _expression(pa, filters)
+    for batch in dataset.to_batches(filter=expression, batch_size=batch_size):
+        if batch.num_rows:
+            yield from_table(batch)
+
+
+def read_parquet(source, filters=None, batch_size=10000):
+    """Return a list of validated UWG models from a Parquet file."""
+    return [m for batch in iter_batches(source, filters, batch_size, 'parquet')
+            for m in batch]
+
+
+def read_ipc(source, filters=None, batch_size=10000):
+    """Return a list of validated UWG models from an Arrow IPC file."""
+    return [m for batch in iter_batches(source, filters, batch_size, 'ipc')
+            for m in batch]
+
+
+def _expression(pa, filters):
+    if filters is None or isinstance(filters, pa.compute.Expression):
+        return filters
+    expression = None
+    for name, op, value in filters:
+        field = pa.dataset.field(name)
+        if op in ('=', '=='):
+            item = field == value
+        elif op == '!=':
+            item = field != value
+        elif op == '<':
+            item = field < value
+        elif op == '<=':
+            item = field <= value
+        elif op == '>':
+            item = field > value
+        elif op == '>=':
+            item = field >= value
+        elif op == 'in':
+            item = field.isin(list(value))
+        else:
+            raise ValueError('Unsupported filter operator: {}'.format(op))
+        expression = item if expression is None else expression & item
+    return expression
+
+
+def _chunks(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
@@ -0,0 +1,148 @@
+"""Registry of the building types and built eras of the bld array.
+
+The bldtype of a BEMDef, a SchDef or a bld row is either one of the 16 DOE reference
+building types of the UWG or a custom building type. A BuildingTypeRegistry keeps
+both in one place so that membership checks and definition lookups are dictionary
+lookups shared by every module:
+
+.. code-block:: python
+
+    BUILDING_TYPES.is_reference('largeoffice')  # True
+    BUILDING_TYPES.register_definitions(bemdef, schdef)  # a custom 'lab' type
+    'lab' in BUILDING_TYPES  # True
+    bemdef, schdef = BUILDING_TYPES.definitions('lab', 'new')
+
+The models intern their bldtype and builtera with the registry, so that equal
+identifiers of registered types are the same string object and compare by identity.
+Unregistered identifiers are returned unchanged and are not kept by the registry.
+Registered definitions are used by templates.resolve_references for the bld rows
+that have no definitions in the reference vectors of a model.
+"""
+import sys
+
+REF_BUILTERA = ('pre80', 'pst80', 'new')
+REF_BUILTERA_SET = {'pre80', 'pst80', 'new'}
+REF_BLDTYPE = ('fullservicerestaurant', 'hospital', 'largehotel', 'largeoffice',
+               'mediumoffice', 'midriseapartment', 'outpatient', 'primaryschool',
+               'quickservicerestaurant', 'secondaryschool', 'smallhotel', 'smalloffice',
+               'standaloneretail', 'stripmall', 'supermarket', 'warehouse')
+
+
+class BuildingTypeRegistry(object):
+    """Building types and built eras with the definitions of custom building types.
+
+    Like UWG.check_bld, membership checks and definition lookups match the bldtype
+    and the builtera in any case. Interning only returns the registered string
+    object for an identifier with the same case.
+
+    Args:
+        bldtypes: An iterable of reference building type identifiers.
+            (Default: REF_BLDTYPE).
+        builteras: An iterable of built era identifiers. (Default: REF_BUILTERA).
+    """
+
+    def __init__(self, bldtypes=REF_BLDTYPE, builteras=REF_BUILTERA):
+        bldtypes = [sys.intern(b) for b in bldtypes]
+        self._reference = frozenset(b.lower() for b in bldtypes)
+        # lower case identifier -> interned identifier, in the order of registration
+        self._types = {b.lower(): b for b in bldtypes}
+        self._builteras = {e.lower(): e for e in (sys.intern(e) for e in builteras)}
+        # lower case (bldtype, builtera) -> (BEMDef, SchDef) of custom building types
+        self._definitions = {}
+
+    @property
+    def types(self):
+        """Tuple of the reference and custom building types."""
+        return tuple(self._types.values())
+
+    @property
+    def custom_types(self):
+        """Tuple of the registered custom building types."""
+        return tuple(b for k, b in self._types.items() if k not in self._reference)
+
+    @property
+    def builteras(self):
+        """Tuple of the built eras."""
+        return tuple(self._builteras.values())
+
+    def __contains__(self, bldtype):
+        return bldtype.lower() in self._types
+
+    def __len__(self):
+        return len(self._types)
+
+    def is_reference(self, bldtype):
+        """Return True if a bldtype is one of the reference building types."""
+        return bldtype.lower() in self._reference
+
+    def is_builtera(self, builtera):
+        """Return True if a builtera is one of the built eras."""
+        return builtera.lower() in self._builteras
+
+    def intern(self, bldtype):
+        """Return the registered string object of a bldtype or the bldtype itself."""
+        registered = self._types.get(bldtype.lower())
+        return registered if registered == bldtype else bldtype
+
+    def intern_builtera(self, builtera):
+        """Return the registered string object of a builtera or the builtera itself."""
+        registered = self._builteras.get(builtera.lower())
+        return registered if registered == builtera else builtera
+
+    def register(self, bldtype):
+        """Register a custom building type and return its interned identifier.
+
+        A bldtype that is already registered in another case is not registered
+        again and the identifier of the first registration is returned.
+        """
+        assert isinstance(bldtype, str) and bldtype, \
+            'The bldtype must be a non-empty text. Got: {}.'.format(bldtype)
+        try:
+            return self._types[bldtype.lower()]
+        except KeyError:
+            bldtype = sys.intern(bldtype)
+            self._types[bldtype.lower()] = bldtype
+            return bldtype
+
+    def register_definitions(self, bemdef, schdef):
+        """Register the BEMDef and SchDef of a custom building type and built era.
+
+        The building type is registered if it is not registered yet. Definitions
+        that are already registered for the same bldtype and builtera are replaced.
+        """
+        key = _key(bemdef.bldtype, bemdef.builtera)
+        assert key == _key(schdef.bldtype, schdef.builtera), 'The BEMDef {} and ' \
+            'the SchDef {} must have the same bldtype and builtera.'.format(
+                [bemdef.bldtype, bemdef.builtera], [schdef.bldtype, schdef.builtera])
+        assert not self.is_reference(key[0]), 'The definitions of the reference ' \
+            'building type {} depend on the zone and come from the reference ' \
+            'builder of the templates module.'.format(bemdef.bldtype)
+        assert self.is_builtera(key[1]), 'The builtera must be one of {}. ' \
+            'Got: {}.'.format(self.builteras, bemdef.builtera)
+        self.register(bemdef.bldtype)
+        self._definitions[key] = (bemdef, schdef)
+
+    def unregister(self, bldtype):
+        """Remove a custom building type and all of its definitions."""
+        assert not self.is_reference(bldtype), \
+            'The reference building type {} cannot be removed.'.format(bldtype)
+        bldtype = bldtype.lower()
+        del self._types[bldtype]
+        for key in [k for k in self._definitions if k[0] == bldtype]:
+            del self._definitions[key]
+
+    def definitions(self, bldtype, builtera):
+        """Return the registered (BEMDef, SchDef) of a custom type or None."""
+        return self._definitions.get(_key(bldtype, builtera))
+
+    def has_definitions(self, bldtype, builtera):
+        """Return True if definitions are registered for a bldtype and builtera."""
+        return _key(bldtype, builtera) in self._definitions
+
+
+def _key(bldtype, builtera):
+    return bldtype.lower(), builtera.lower()
+
+
+# registry shared by every model in the process
+BUILDING_TYPES = BuildingTypeRegistry()
@@ -0,0 +1,219 @@
+"""Vectorized physical consistency checks over batches of UWG models.
+
+The field constraints of the schema only check each value on its own. The rules in
+this module combine several fields, including the override fields of the UWG model
+and the building definitions that the bld array refers to, and evaluate each rule
+over a whole batch at once with NumPy.
+
+.. code-block:: python
+
+    result = check_models(models)
+    runnable = [m for m, ok in zip(models, result.ok) if ok]
+    for row, rule, message in result.failures():
+        print(row, rule, message)
+
+DOE reference buildings are only checked when a reference builder is registered
+(see templates). Otherwise result.unchecked is True for the models that use them and
+these models are not in result.ok.
+
+NumPy is an optional dependency of uwg-schema and is only imported when one of these
+functions is called.
+"""
+from .arrays import _numpy, to_records
+from .bldtypes import BUILDING_TYPES
+from .templates import REFERENCE_CACHE, reference_key, resolve_references
+
+# columns of the building table
+BUILDING_COLUMNS = ('model', 'floor_height')
+
+
+class BulkRule(object):
+    """A consistency rule evaluated over every model of a batch at once.
+
+    Args:
+        name: Text to identify the rule.
+        fields: A tuple of the scalar UWG fields that the rule reads.
+        check: A function that takes the NumPy module, a dictionary of UWG columns
+            and a dictionary of building table columns and returns a boolean array
+            that is True for every model that breaks the rule.
+        message: Text that explains the rule to the submitter.
+    """
+    __slots__ = ('name', 'fields', 'check', 'message')
+
+    def __init__(self, name, fields, check, message):
+        self.name = name
+        self.fields = tuple(fields)
+        self.check = check
+        self.message = message
+
+    def __repr__(self):
+        return 'BulkRule({}, {})'.format(self.name, self.fields)
+
+
+def _cover(np, columns, buildings):
+    return columns['grasscover'] + columns['treecover'] > 1 + 1e-10
+
+
+def _ubl(np, columns, buildings):
+    return columns['h_ubl2'] > columns['h_ubl1']
+
+
+def _vegetation(np, columns, buildings):
+    return columns['vegstart'] >= columns['vegend']
+
+
+def _floor_height(np, columns, buildings):
+    bldheight = columns['bldheight']
+    flr_h = columns['flr_h']
+    # the flr_h override replaces the floor height of every building
+    failed = ~np.isnan(flr_h) & (bldheight < flr_h)
+    index = buildings['model']
+    if len(index):
+        low = np.isnan(flr_h[index]) & \
+            (bldheight[index] < buildings['floor_height'])
+        failed |= np.bincount(index[low], minlength=len(bldheight)) > 0
+    return failed
+
+
+UWG_BULK_RULES = (
+    BulkRule('cover', ('grasscover', 'treecover'), _cover,
+             'The sum of grasscover and treecover must not be greater than one.'),
+    BulkRule('ubl', ('h_ubl1', 'h_ubl2'), _ubl,
+             'The nighttime boundary layer height h_ubl2 must not be greater than '
+             'the daytime boundary layer height h_ubl1.'),
+    BulkRule('vegetation', ('vegstart', 'vegend'), _vegetation,
+             'The vegetation season must start before it ends (vegstart < vegend).'),
+    BulkRule('floor_height', ('bldheight', 'flr_h'), _floor_height,
+             'The average building height bldheight must be at least one floor '
+             'height (flr_h or the floor_height of each referenced building).'),
+)
+
+
+class ConsistencyResult(object):
+    """Boolean results of a batch of consistency rules.
+
+    Args:
+        rules: The tuple of rules that were evaluated.
+        failed: A boolean array of shape (N, R) that is True where model N breaks
+            rule R.
+        unchecked: Optional boolean array of shape (N,) that is True for the models
+            with buildings that are not in the building table. Defaults to False
+            for every model.
+    """
+    __slots__ = ('rules', 'failed', 'unchecked')
+
+    def __init__(self, rules, failed, unchecked=None):
+        self.rules = rules
+        self.failed = failed
+        self.unchecked = _numpy().zeros(len(failed), dtype=bool) \
+            if unchecked is None else unchecked
+
+    @property
+    def names(self):
+        """Tuple of rule names in the column order of failed."""
+        return tuple(rule.name for rule in self.rules)
+
+    @property
+    def ok(self):
+        """Boolean array that is True for every checked model that passes every rule.
+
+        Models with unchecked buildings are not ok, even if they pass every rule.
+        """
+        return ~self.failed.any(axis=1) & ~self.unchecked
+
+    def rule(self, name):
+        """Return the boolean array of the models that break a rule."""
+        return self.failed[:, self.names.index(name)]
+
+    def failures(self):
+        """Yield a (row, rule name, message) tuple for every broken rule."""
+        rows, cols = self.failed.nonzero()
+        for row, col in zip(rows.tolist(), cols.tolist()):
+            rule = self.rules[col]
+            yield row, rule.name, rule.message
+
+
+def building_table(models, cache=None):
+    """Return the building table with one row per bld row of each model.
+
+    Custom buildings are taken from ref_bem_vector or from the definitions that are
+    registered in BUILDING_TYPES. DOE reference buildings need a reference builder
+    (see templates). Without one, their rows have a NaN floor_height, which the
+    rules do not check and check_arrays reports as unchecked.
+
+    Args:
+        models: A sequence of validated UWG models.
+        cache: Optional ReferenceCache. Defaults to the shared REFERENCE_CACHE.
+
+    Returns:
+        A dictionary of NumPy arrays with the index of the model and the
+        floor_height of each building.
+    """
+    np = _numpy()
+    cache = REFERENCE_CACHE if cache is None else cache
+    rows = []
+    for i, model in enumerate(models):
+        if cache.builder is not None:
+            for ref in resolve_references(model, cache):
+                rows.append((i, ref[3].building.floor_height))
+            continue
+        bems = {reference_key(r.bldtype, r.builtera): r
+                for r in model.ref_bem_vector or ()}
+        for bldtype, builtera, _ in model.bld:
+            key = reference_key(bldtype, builtera)
+            bem = bems.get(key)
+            if bem is None and BUILDING_TYPES.has_definitions(*key):
+                bem = BUILDING_TYPES.definitions(*key)[0]
+            rows.append((i, bem.building.floor_height if bem else float('nan')))
+    table = np.array(rows, dtype='f8').reshape(len(rows), 2)
+    return {
+        'model': table[:, 0].astype('i8'),
+        'floor_height': table[:, 1]
+    }
+
+
+def check_arrays(records, buildings=None, rules=UWG_BULK_RULES):
+    """Evaluate consistency rules over arrays of UWG fields.
+
+    Args:
+        records: A structured array from arrays.to_records or a dictionary of
+            equal length column arrays for the fields that the rules read.
+        buildings: Optional building table from building_table. If None, rules
+            only check the UWG fields. Models with a NaN floor_height in the
+            table are reported as unchecked.
+        rules: A sequence of BulkRule objects. (Default: UWG_BULK_RULES).
+
+    Returns:
+        A ConsistencyResult.
+    """
+    np = _numpy()
+    rules = tuple(rules)
+    if hasattr(records, 'dtype'):
+        columns = {name: records[name] for name in records.dtype.names}
+    else:
+        columns = {name: np.asarray(value) for name, value in records.items()}
+    count = len(next(iter(columns.values()))) if columns else 0
+    if buildings is None:
+        buildings = {name: np.zeros(0, dtype='i8' if name == 'model' else 'f8')
+                     for name in BUILDING_COLUMNS}
+    failed = np.zeros((count, len(rules)), dtype=bool)
+    for j, rule in enumerate(rules):
+        failed[:, j] = rule.check(np, columns, buildings)
+    missing = buildings['model'][np.isnan(buildings['floor_height'])]
+    unchecked = np.bincount(missing, minlength=count) > 0
+    return ConsistencyResult(rules, failed, unchecked)
+
+
+def check_models(models, rules=UWG_BULK_RULES, cache=None):
+    """Evaluate consistency rules over a batch of validated UWG models.
+
+    Args:
+        models: A sequence of validated UWG models.
+        rules: A sequence of BulkRule objects. (Default: UWG_BULK_RULES).
+        cache: Optional ReferenceCache for the DOE reference buildings.
+
+    Returns:
+        A ConsistencyResult.
+    """
+    records = to_records(models)
+    return check_arrays(records, building_table(models, cache), rules)
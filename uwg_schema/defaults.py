@@ -0,0 +1,84 @@
+"""Cheap copies of default container values for new model instances.
+
+By default pydantic gives every model instance its own deep copy of list defaults
+such as DEFAULT_BLD, DEFAULT_SCHTRAFFIC and the SchDef gas and swh schedules, and
+copy.deepcopy is the most expensive step of creating a model that uses them. Inside
+a shared_defaults block only the lists of these defaults are copied, while the
+numbers, text and tuples inside them are shared, which is many times faster than
+a deep copy.
+
+.. code-block:: python
+
+    with shared_defaults():
+        models = [UWG(**params) for params in batch]
+    models[0].bld.append(('hospital', 'new', 0.0))  # a private list of this model
+
+Every instance still gets its own regular lists, so the models behave exactly like
+models that are created outside the block. The block only affects the current
+thread or asyncio task.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from pydantic.utils import smart_deepcopy
+
+from .model import UWG
+from .ref_bld_template import Material, Element, Building, BEMDef, SchDef
+
+MODELS = (Material, Element, Building, BEMDef, SchDef, UWG)
+
+_shared = ContextVar('shared_defaults', default=False)
+
+
+def _copy(value):
+    """Return a copy of a list default with new lists and shared items.
+
+    The numbers, text and tuples of the defaults are immutable, so sharing them
+    gives the same models as the deep copy of pydantic.
+    """
+    if any(type(v) is list for v in value):
+        return [_copy(v) if type(v) is list else v for v in value]
+    return value[:]
+
+
+def _default_factory(default):
+    """Return a default_factory that copies a list default like pydantic does."""
+    def factory():
+        return _copy(default) if _shared.get() else smart_deepcopy(default)
+    return factory
+
+
+def _install():
+    """Give every list default a factory that checks for a shared_defaults block.
+
+    The factories are installed once when this module is imported. Outside of a
+    shared_defaults block they return the same deep copy as pydantic, and the
+    field defaults of the schemas are not changed.
+    """
+    for model in MODELS:
+        for field in model.__fields__.values():
+            if isinstance(field.default, list) and field.default_factory is None:
+                field.default_factory = _default_factory(field.default)
+
+
+_install()
+
+
+def defaults_shared():
+    """Return True inside a shared_defaults block."""
+    return _shared.get()
+
+
+@contextmanager
+def shared_defaults(enabled=True):
+    """Context manager that makes cheap copies of the list defaults in a block.
+
+    Args:
+        enabled: Set to False to use the deep copies of pydantic inside a block
+            of an outer shared_defaults block. (Default: True).
+    """
+    token = _shared.set(enabled)
+    try:
+        yield
+    finally:
+        _shared.reset(token)
@@ -0,0 +1,249 @@
+"""Structural diff and patch for UWG models and their sub-models.
+
+A patch is a list of JSON-serializable operations similar to JSON Patch::
+
+    {'op': 'replace', 'path': ['bld', 1, 2], 'value': 0.6}
+    {'op': 'replace', 'path': ['ref_sch_vector', ['largeoffice', 'new'], 'elec', 0, 5],
+     'value': 0.8}
+    {'op': 'add', 'path': ['ref_bem_vector', ['customhospital', 'new']],
+     'value': {...}}
+    {'op': 'remove', 'path': ['ref_bem_vector', ['customhospital', 'new']]}
+
+Path items are field names, list indexes, or a [bldtype, builtera] key that matches
+an entry of ref_bem_vector or ref_sch_vector regardless of its position in the list.
+Applying a patch re-validates only the fields and sub-models that the patch touches.
+"""
+from pydantic import BaseModel, ValidationError
+from pydantic.error_wrappers import ErrorWrapper
+from pydantic.fields import SHAPE_SINGLETON
+
+from .week_matrix import RunLengthMatrix
+
+REF_VECTORS = ('ref_bem_vector', 'ref_sch_vector')
+
+
+def diff(old, new):
+    """Return the list of patch operations that turns the old model into the new one.
+
+    Args:
+        old: A validated model.
+        new: A validated model of the same class as old.
+    """
+    assert type(old) is type(new), 'Cannot diff a {} with a {}.'.format(
+        type(old).__name__, type(new).__name__)
+    ops = []
+    _diff_model(old, new, [], ops)
+    return ops
+
+
+def apply_patch(model, patch):
+    """Return a new model with a list of patch operations applied.
+
+    The input model is not changed. Unchanged fields and sub-models are shared with
+    the input model rather than copied, and only the touched fields and the root
+    validators of the touched models are validated again.
+
+    Args:
+        model: A validated model.
+        patch: A list of patch operations, as returned by diff.
+
+    Raises:
+        ValidationError: If the patched values are invalid. Every error is
+            located by its path in the model.
+    """
+    ops = [(list(op['path']), op) for op in patch]
+    errors = []
+    new_model = _apply(model, ops, (), errors)
+    if errors:
+        raise ValidationError(errors, type(model))
+    return new_model
+
+
+# diff
+
+def _diff_model(old, new, path, ops):
+    for name in old.__fields__:
+        a, b = getattr(old, name), getattr(new, name)
+        if a == b:
+            continue
+        _diff_value(a, b, path + [name], ops, name in REF_VECTORS)
+
+
+def _diff_value(a, b, path, ops, keyed=False):
+    # the field values of models validated with run_length_matrices
+    if isinstance(a, RunLengthMatrix):
+        a = a.tolist()
+    if isinstance(b, RunLengthMatrix):
+        b = b.tolist()
+    if isinstance(a, BaseModel) and type(a) is type(b):
+        _diff_model(a, b, path, ops)
+    elif keyed and _unique_keys(a) and _unique_keys(b):
+        old_refs = {_key(ref): ref for ref in a}
+        new_refs = {_key(ref): ref for ref in b}
+        for key, ref in old_refs.items():
+            if key not in new_refs:
+                ops.append({'op': 'remove', 'path': path + [list(key)]})
+            elif ref != new_refs[key]:
+                _diff_model(ref, new_refs[key], path + [list(key)], ops)
+        for key, ref in new_refs.items():
+            if key not in old_refs:
+                ops.append({'op': 'add', 'path': path + [list(key)],
+                            'value': ref.dict()})
+    elif isinstance(a, list) and isinstance(b, list) and len(a) == len(b):
+        for i, (item_a, item_b) in enumerate(zip(a, b)):
+            if item_a != item_b:
+                _diff_value(item_a, item_b, path + [i], ops)
+    else:
+        ops.append({'op': 'replace', 'path': path, 'value': _plain(b)})
+
+
+def _unique_keys(refs):
+    return refs is not None and len({_key(ref) for ref in refs}) == len(refs)
+
+
+def _key(ref):
+    return ref.bldtype, ref.builtera
+
+
+def _plain(value):
+    if isinstance(value, BaseModel):
+        return value.dict()
+    if isinstance(value, list):
+        return [_plain(v) for v in value]
+    return value
+
+
+# patch
+
+def _apply(model, ops, loc, errors):
+    """Apply operations with paths relative to model and return the new model."""
+    cls = type(model)
+    values = dict(model.__dict__)
+    grouped = {}
+    for path, op in ops:
+        if not path:
+            raise ValueError('A patch operation must have a non-empty path.')
+        grouped.setdefault(path[0], []).append((path[1:], op))
+
+    touched = False
+    for name, field_ops in grouped.items():
+        if name not in cls.__fields__:
+            errors.append(ErrorWrapper(
+                ValueError('{} has no field {}.'.format(cls.__name__, name)),
+                loc + (name,)))
+            continue
+        field = cls.__fields__[name]
+        current = values[name]
+        field_loc = loc + (name,)
+        if isinstance(current, BaseModel) and all(rest for rest, _ in field_ops):
+            # the sub-model validates itself and is already of the field type
+            values[name] = _apply(current, field_ops, field_loc, errors)
+        elif name in REF_VECTORS and current is not None \
+                and all(rest and isinstance(rest[0], (list, tuple))
+                        for rest, _ in field_ops):
+            values[name] = _apply_refs(field, current, field_ops, field_loc, errors)
+        elif field.shape != SHAPE_SINGLETON and current is not None and \
+                _is_model_list(current) and \
+                all(len(rest) > 1 and isinstance(rest[0], int) for rest, _ in field_ops):
+            values[name] = _apply_items(current, field_ops, field_loc, errors)
+        else:
+            value = current
+            for rest, op in field_ops:
+                value = _set(value, rest, op, field)
+            value, error = field.validate(value, values, loc=field_loc, cls=cls)
+            if error:
+                errors.append(error)
+                continue
+            values[name] = value
+            touched = True
+
+    if touched:
+        # root validators may combine any of the fields of this model
+        try:
+            for skip_on_failure, validator in cls.__post_root_validators__:
+                values = validator(cls, values)
+        except (ValueError, TypeError, AssertionError) as exc:
+            errors.append(ErrorWrapper(exc, loc or ('__root__',)))
+    fields_set = model.__fields_set__ | set(grouped)
+    return cls.construct(_fields_set=fields_set, **values)
+
+
+def _apply_refs(field, refs, ops, loc, errors):
+    """Apply operations addressed by (bldtype, builtera) to a reference vector."""
+    refs = list(refs)
+    index = {_key(ref): i for i, ref in enumerate(refs)}
+    grouped = {}
+    for rest, op in ops:
+        grouped.setdefault(tuple(rest[0]), []).append((rest[1:], op))
+
+    removed = set()
+    for key, key_ops in grouped.items():
+        item_loc = loc + (':'.join(key),)
+        nested = [(rest, op) for rest, op in key_ops if rest]
+        for rest, op in key_ops:
+            if rest:
+                continue
+            if op['op'] == 'remove':
+                if key in index:
+                    removed.add(index[key])
+                continue
+            try:
+                ref = field.type_.parse_obj(op['value'])
+            except ValidationError as error:
+                errors.append(ErrorWrapper(error, item_loc))
+                continue
+            if _key(ref) != key:
+                errors.append(ErrorWrapper(ValueError(
+                    'The bldtype and builtera of the value must match the path '
+                    'key {}.'.format(list(key))), item_loc))
+                continue
+            if key in index:
+                refs[index[key]] = ref
+            else:
+                index[key] = len(refs)
+                refs.append(ref)
+        if nested:
+            if key not in index:
+                errors.append(ErrorWrapper(KeyError(
+                    'No {} matches the key {}.'.format(
+                        field.type_.__name__, list(key))), item_loc))
+                continue
+            refs[index[key]] = _apply(refs[index[key]], nested, item_loc, errors)
+    return [ref for i, ref in enumerate(refs) if i not in removed]
+
+
+def _apply_items(items, ops, loc, errors):
+    """Apply operations addressed by index to a list of sub-models."""
+    items = list(items)
+    grouped = {}
+    for rest, op in ops:
+        grouped.setdefault(rest[0], []).append((rest[1:], op))
+    for i, item_ops in grouped.items():
+        items[i] = _apply(items[i], item_ops, loc + (i,), errors)
+    return items
+
+
+def _is_model_list(value):
+    return isinstance(value, list) and all(isinstance(v, BaseModel) for v in value)
+
+
+def _set(value, path, op, field):
+    """Return a copy of value with the operation applied at path.
+
+    Only the containers along the path are copied.
+    """
+    if not path:
+        if op['op'] == 'remove':
+            return field.get_default()
+        return op['value']
+    container = list(value)
+    index = path[0]
+    if len(path) == 1 and op['op'] == 'remove':
+        del container[index]
+    elif len(path) == 1 and op['op'] == 'add' and index == len(container):
+        container.append(op['value'])
+    else:
+        item = container[index]
+        container[index] = _set(
+            item.dict() if isinstance(item, BaseModel) else item, path[1:], op, field)
+    return container
@@ -0,0 +1,378 @@
+"""Seedable generator of random UWG schema payloads for fuzzing and load tests.
+
+The generator reads the ``Field`` constraints of each model so that valid payloads
+stay in sync with the schema. Invalid payloads are produced by applying a single
+mutation that breaks one constraint to an otherwise valid payload.
+"""
+import json
+import random
+
+from pydantic import BaseModel
+from pydantic.fields import SHAPE_LIST
+
+from .model import UWG, REF_ZONETYPE
+from .ref_bld_template import Material, Element, Building, BEMDef, SchDef, \
+    WEEK_MATRIX, REF_BUILTERA, REF_BLDTYPE
+
+# realistic sampling ranges for fields that are only bounded from below in the schema
+FIELD_RANGES = {
+    'UWG.bldheight': (5, 60),
+    'UWG.vertohor': (0.1, 2.5),
+    'UWG.nday': (1, 365),
+    'UWG.sensocc': (50, 150),
+    'UWG.charlength': (100, 5000),
+    'UWG.droad': (0.1, 1),
+    'UWG.croad': (1000000, 2500000),
+    'UWG.sensanth': (0, 40),
+    'UWG.h_ubl1': (500, 2000),
+    'UWG.h_ubl2': (50, 200),
+    'UWG.h_ref': (50, 300),
+    'UWG.h_temp': (1, 3),
+    'UWG.h_wind': (5, 20),
+    'UWG.c_circ': (0.5, 2),
+    'UWG.c_exch': (0.5, 2),
+    'UWG.maxday': (50, 300),
+    'UWG.maxnight': (5, 50),
+    'UWG.windmin': (0.1, 3),
+    'UWG.h_obs': (0.05, 2),
+    'UWG.flr_h': (2.5, 5),
+    'Material.thermalcond': (0.02, 2.5),
+    'Material.volheat': (100000, 3000000),
+    'Element.t_init': (283, 303),
+    'Element.layer_thickness_lst': (0.005, 0.3),
+    'Building.floor_height': (2.5, 5),
+    'Building.int_heat_night': (0, 20),
+    'Building.int_heat_day': (0, 20),
+    'Building.infil': (0.1, 2),
+    'Building.vent': (0.0001, 0.002),
+    'Building.u_value': (0.5, 6),
+    'Building.cop': (2, 6),
+    'Building.coolcap': (20, 300),
+    'Building.initial_temp': (288, 298),
+    'SchDef.q_elec': (0, 50),
+    'SchDef.q_gas': (0, 20),
+    'SchDef.q_light': (0, 30),
+    'SchDef.n_occ': (0, 0.5),
+    'SchDef.vent': (0, 0.01),
+    'SchDef.v_swh': (0, 1),
+    'SchDef.cool': (22, 28),
+    'SchDef.heat': (15, 21),
+}
+
+# simulation time steps in seconds that evenly divide the hourly weather time step
+DTSIM_CHOICES = (60, 120, 150, 300, 600)
+
+MODELS = (Material, Element, Building, BEMDef, SchDef, UWG)
+
+
+class ModelGenerator(object):
+    """Generate random but valid (or deliberately invalid) schema payloads.
+
+    Args:
+        seed: Optional seed for the random number generator. Two generators with
+            the same seed and arguments produce identical payloads.
+        custom_buildings: Number of custom BEMDef/SchDef pairs added to each UWG
+            ref_bem_vector and ref_sch_vector. (Default: 2).
+        doe_buildings: Maximum number of DOE reference buildings referenced in each
+            UWG bld array in addition to the custom ones. (Default: 2).
+        layers: Number of Material layers in each Element. (Default: 3).
+        optional_ratio: Probability that an optional UWG override field such as
+            shgc or flr_h is set instead of being left as None. (Default: 0.5).
+    """
+
+    def __init__(self, seed=None, custom_buildings=2, doe_buildings=2, layers=3,
+                 optional_ratio=0.5):
+        assert custom_buildings >= 0, 'custom_buildings must be zero or greater.'
+        assert doe_buildings >= 0, 'doe_buildings must be zero or greater.'
+        assert custom_buildings + doe_buildings > 0, 'A UWG needs at least one ' \
+            'building in the bld array.'
+        assert layers >= 1, 'layers must be greater than zero.'
+        self.random = random.Random(seed)
+        self.custom_buildings = custom_buildings
+        self.doe_buildings = doe_buildings
+        self.layers = layers
+        self.optional_ratio = optional_ratio
+        self._count = 0
+
+    def payload(self, model=UWG, valid=True):
+        """Return a random payload dictionary for a model class.
+
+        Args:
+            model: One of the schema model classes. (Default: UWG).
+            valid: Set to False to return a payload that fails validation because
+                a single constraint somewhere in the payload is broken.
+        """
+        data = self._model_payload(model)
+        if not valid:
+            self._mutate(data, model)
+        return data
+
+    def instance(self, model=UWG):
+        """Return a random validated model instance."""
+        return model.parse_obj(self._model_payload(model))
+
+    def iter_payloads(self, count=None, model=UWG, invalid_ratio=0.0):
+        """Yield random payloads.
+
+        Args:
+            count: Number of payloads. Set to None to yield payloads forever.
+            model: One of the schema model classes. (Default: UWG).
+            invalid_ratio: Probability that each payload is invalid. (Default: 0).
+        """
+        i = 0
+        while count is None or i < count:
+            yield self.payload(model, self.random.random() >= invalid_ratio)
+            i += 1
+
+    def iter_jsonl(self, count=None, model=UWG, invalid_ratio=0.0, max_bytes=None):
+        """Yield compact JSON lines, stopping at count lines or at max_bytes."""
+        size = 0
+        for data in self.iter_payloads(count, model, invalid_ratio):
+            line = json.dumps(data, separators=(',', ':')) + '\n'
+            size += len(line)
+            if max_bytes is not None and size > max_bytes:
+                return
+            yield line
+
+    def write_jsonl(self, fp, count=None, model=UWG, invalid_ratio=0.0,
+                    max_bytes=None):
+        """Stream a JSONL corpus to a writable text file and return its size in bytes.
+
+        At least one of count or max_bytes must be set. Lines are written as they are
+        generated so memory use does not grow with the size of the corpus.
+        """
+        assert count is not None or max_bytes is not None, \
+            'Either count or max_bytes must be set to limit the corpus size.'
+        size = 0
+        for line in self.iter_jsonl(count, model, invalid_ratio, max_bytes):
+            fp.write(line)
+            size += len(line)
+        return size
+
+    # valid payloads
+
+    def _model_payload(self, model, **values):
+        if model is UWG:
+            return self._uwg()
+        if model is Element:
+            return self._element()
+        data = {}
+        for name, field in model.__fields__.items():
+            data[name] = values[name] if name in values \
+                else self._field_value(model, field)
+        return data
+
+    def _uwg(self):
+        data = {}
+        for name, field in UWG.__fields__.items():
+            if name in ('bld', 'ref_bem_vector', 'ref_sch_vector'):
+                continue
+            if not field.required and field.default is None \
+                    and self.random.random() >= self.optional_ratio:
+                data[name] = None
+                continue
+            data[name] = self._field_value(UWG, field)
+
+        # keep the cross-field relationships physically sensible
+        data['h_ubl2'] = min(data['h_ubl2'], data['h_ubl1'])
+        cover = data['grasscover'] + data['treecover']
+        if cover > 1:
+            data['grasscover'] = round(data['grasscover'] / cover, 4)
+            data['treecover'] = round(1 - data['grasscover'], 4)
+        data['vegstart'], data['vegend'] = \
+            sorted(self.random.sample(range(1, 13), 2))
+        data['dtweather'] = 3600
+        data['dtsim'] = self.random.choice(DTSIM_CHOICES)
+
+        # reference buildings
+        refs = []
+        for i in range(self.custom_buildings):
+            refs.append(('custom_{}'.format(self._next()),
+                         self.random.choice(REF_BUILTERA)))
+        doe = [(bldtype, builtera) for bldtype in REF_BLDTYPE
+               for builtera in REF_BUILTERA]
+        doe_count = self.random.randint(0 if refs else 1, self.doe_buildings)
+        refs.extend(self.random.sample(doe, doe_count))
+
+        weights = _split(self.random, 10000, len(refs))
+        data['bld'] = [[bldtype, builtera, weight / 10000.0]
+                       for (bldtype, builtera), weight in zip(refs, weights)]
+        custom = refs[:self.custom_buildings]
+        data['ref_bem_vector'] = [
+            self._model_payload(BEMDef, bldtype=bldtype, builtera=builtera)
+            for bldtype, builtera in custom] or None
+        data['ref_sch_vector'] = [
+            self._model_payload(SchDef, bldtype=bldtype, builtera=builtera)
+            for bldtype, builtera in custom] or None
+        return data
+
+    def _element(self):
+        data = {}
+        for name, field in Element.__fields__.items():
+            if name == 'layer_thickness_lst':
+                low, high = FIELD_RANGES['Element.layer_thickness_lst']
+                data[name] = [round(self.random.uniform(low, high), 4)
+                              for _ in range(self.layers)]
+            elif name == 'material_lst':
+                data[name] = [self._model_payload(Material)
+                              for _ in range(self.layers)]
+            else:
+                data[name] = self._field_value(Element, field)
+        return data
+
+    def _field_value(self, model, field):
+        name = field.name
+        key = '{}.{}'.format(model.__name__, name)
+        if name == 'type':
+            return model.__name__
+        if name == 'version':
+            return '{}.{}.{}'.format(*(self.random.randint(0, 20) for _ in range(3)))
+        if name == 'zone':
+            return self.random.choice(REF_ZONETYPE)
+        if name == 'builtera':
+            return self.random.choice(REF_BUILTERA)
+        if name == 'bldtype':
+            return self.random.choice(REF_BLDTYPE)
+        if name == 'name':
+            return '{}_{}'.format(model.__name__.lower(), self._next())
+        if name == 'month':
+            return self.random.randint(1, 12)
+        if name == 'day':
+            return self.random.randint(1, 28)
+        if field.outer_type_ is WEEK_MATRIX:
+            low, high = FIELD_RANGES.get(key, (0, 1))
+            return [self._schedule_row(low, high) for _ in range(3)]
+        if isinstance(field.type_, type) and issubclass(field.type_, BaseModel):
+            if field.shape == SHAPE_LIST:
+                return [self._model_payload(field.type_)]
+            return self._model_payload(field.type_)
+        if field.type_ is bool:
+            return self.random.random() < 0.5
+        if hasattr(field.type_, '__members__'):  # enum
+            return self.random.choice(list(field.type_)).value
+        low, high = self._bounds(key, field)
+        if issubclass(field.type_, int):
+            return self.random.randint(int(low), int(high))
+        return round(self.random.uniform(low, high), 4)
+
+    def _bounds(self, key, field):
+        info = field.field_info
+        low = info.ge if info.ge is not None else info.gt
+        high = info.le if info.le is not None else info.lt
+        if key in FIELD_RANGES:
+            low, high = FIELD_RANGES[key]
+        elif high is None:
+            high = (low or 0) + 100
+        if info.gt is not None and low <= info.gt:
+            # keep rounded values strictly above an exclusive lower bound
+            low = info.gt + 0.0001
+        return low, high
+
+    def _schedule_row(self, low, high):
+        """Return a piecewise-constant 24 hour schedule like the DOE schedules."""
+        breaks = sorted(self.random.sample(range(1, 24), self.random.randint(1, 5)))
+        row = []
+        start = 0
+        for stop in breaks + [24]:
+            value = round(self.random.uniform(low, high), 2)
+            row.extend([value] * (stop - start))
+            start = stop
+        return row
+
+    def _next(self):
+        self._count += 1
+        return self._count
+
+    # invalid payloads
+
+    def _mutate(self, data, model):
+        """Break a single constraint in a random (possibly nested) object of data."""
+        targets = list(_iter_objects(data, model))
+        obj, obj_model = self.random.choice(targets)
+        mutations = [self._mutate_type, self._mutate_extra, self._mutate_required]
+        if _bounded_fields(obj_model):
+            mutations.append(self._mutate_range)
+        if any(f.outer_type_ is WEEK_MATRIX for f in obj_model.__fields__.values()):
+            mutations.append(self._mutate_matrix)
+        if obj_model is UWG:
+            mutations.extend([self._mutate_zone, self._mutate_bld])
+        elif obj_model in (BEMDef, SchDef):
+            mutations.append(self._mutate_builtera)
+        elif obj_model is Element:
+            mutations.append(self._mutate_layers)
+        self.random.choice(mutations)(obj, obj_model)
+
+    def _mutate_type(self, obj, model):
+        obj['type'] = 'Not{}'.format(model.__name__)
+
+    def _mutate_extra(self, obj, model):
+        obj['unexpected_key'] = self.random.random()
+
+    def _mutate_required(self, obj, model):
+        required = [n for n, f in model.__fields__.items() if f.required]
+        del obj[self.random.choice(required)]
+
+    def _mutate_range(self, obj, model):
+        field = self.random.choice(_bounded_fields(model))
+        info = field.field_info
+        high = info.le if info.le is not None else info.lt
+        low = info.ge if info.ge is not None else info.gt
+        if high is not None and (low is None or self.random.random() < 0.5):
+            obj[field.name] = high + self.random.randint(1, 10)
+        else:
+            obj[field.name] = low - self.random.randint(1, 10)
+
+    def _mutate_matrix(self, obj, model):
+        names = [n for n, f in model.__fields__.items() if f.outer_type_ is WEEK_MATRIX]
+        name = self.random.choice(names)
+        matrix = [list(row) for row in obj.get(name) or [[0] * 24] * 3]
+        matrix[self.random.randrange(3)].pop()
+        obj[name] = matrix
+
+    def _mutate_zone(self, obj, model):
+        obj['zone'] = self.random.choice(('0A', '9', '3D', '1a'))
+
+    def _mutate_bld(self, obj, model):
+        row = list(obj['bld'][0])
+        row[2] = row[2] + self.random.choice((0.25, 0.5, 1.5))
+        obj['bld'] = [row] + obj['bld'][1:]
+
+    def _mutate_builtera(self, obj, model):
+        obj['builtera'] = self.random.choice(('pre1980', 'post80', 'newer', 'old'))
+
+    def _mutate_layers(self, obj, model):
+        obj['layer_thickness_lst'] = obj['layer_thickness_lst'] + [0.1]
+
+
+def _split(rand, total, count):
+    """Split an integer total into count random positive integer parts."""
+    if count == 1:
+        return [total]
+    cuts = sorted(rand.sample(range(1, total), count - 1))
+    return [b - a for a, b in zip([0] + cuts, cuts + [total])]
+
+
+def _bounded_fields(model):
+    """Return the numeric fields of a model that have a range constraint."""
+    return [
+        f for f in model.__fields__.values()
+        if f.shape != SHAPE_LIST and isinstance(f.type_, type)
+        and issubclass(f.type_, (int, float)) and f.type_ is not bool
+        and any(v is not None for v in (f.field_info.ge, f.field_info.gt,
+                                        f.field_info.le, f.field_info.lt))
+    ]
+
+
+def _iter_objects(data, model):
+    """Yield every (dictionary, model class) pair nested in a payload."""
+    yield data, model
+    for name, field in model.__fields__.items():
+        if not (isinstance(field.type_, type) and issubclass(field.type_, BaseModel)):
+            continue
+        value = data.get(name)
+        if value is None:
+            continue
+        values = value if field.shape == SHAPE_LIST else [value]
+        for item in values:
+            for obj in _iter_objects(item, field.type_):
+                yield obj
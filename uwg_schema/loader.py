@@ -0,0 +1,180 @@
+"""Load JSON documents of any model of the schema by their type field.
+
+Every model has a type field with the name of its class. A ModelRegistry maps these
+names to the model classes so that each document is validated once against the
+right class instead of being tried against several candidates:
+
+.. code-block:: python
+
+    model = load({'type': 'Material', 'name': 'wood', ...})  # a Material
+    result = load_many(documents)  # LoadResult(models, errors)
+    for index, model, errors in iter_jsonl('mixed.jsonl'):
+        ...
+
+Errors have the same pointer, loc, msg and type keys as the errors of report. A
+document without a type is reported with a value_error.missing error and a document
+with an unknown type with a value_error.unknown_type error, both at /type.
+"""
+import json
+from collections import OrderedDict, namedtuple
+
+from pydantic import ValidationError
+from pydantic.error_wrappers import ErrorWrapper
+from pydantic.errors import DictError, MissingError, PydanticValueError
+
+from ._base import NoExtraBaseModel
+from .model import UWG
+from .ref_bld_template import Material, Element, Building, BEMDef, SchDef
+from .report import ROOT_KEY, error_list
+
+MODELS = (Material, Element, Building, BEMDef, SchDef, UWG)
+
+LoadResult = namedtuple('LoadResult', 'models errors')
+LoadResult.__doc__ = """Models and errors of a batch of documents.
+
+Attributes:
+    models: A list with the model of each document or None if it is not valid.
+    errors: A list of error dictionaries, each with the index of its document.
+"""
+
+
+class UnknownTypeError(PydanticValueError):
+    code = 'unknown_type'
+    msg_template = 'unknown type "{type}", expected one of: {expected}'
+
+
+class Document(NoExtraBaseModel):
+    """A JSON document of one of the models of a ModelRegistry."""
+
+    type: str
+
+
+class ModelRegistry(object):
+    """Map the type names of documents to model classes.
+
+    Args:
+        models: An iterable of model classes with a type field. (Default: MODELS).
+    """
+
+    def __init__(self, models=MODELS):
+        self._models = OrderedDict()
+        for model in models:
+            self.register(model)
+
+    @property
+    def types(self):
+        """Tuple of the registered type names."""
+        return tuple(self._models)
+
+    def register(self, model):
+        """Register a model class under the default value of its type field.
+
+        The model is returned so that this method can be used as a class decorator.
+        """
+        field = model.__fields__.get('type')
+        assert field is not None and isinstance(field.default, str), \
+            'The model {} must have a type field with a default value.'.format(
+                model.__name__)
+        self._models[field.default] = model
+        return model
+
+    def model_for(self, data):
+        """Return the model class for the type of a document dictionary.
+
+        Raises:
+            ValidationError: If the document is not a dictionary or its type is
+                missing or unknown.
+        """
+        if not isinstance(data, dict):
+            raise ValidationError([ErrorWrapper(DictError(), loc=ROOT_KEY)], Document)
+        tag = data.get('type')
+        model = self._models.get(tag) if isinstance(tag, str) else None
+        if model is None:
+            if 'type' not in data:
+                error = MissingError()
+            else:
+                error = UnknownTypeError(type=tag, expected=', '.join(self._models))
+            raise ValidationError([ErrorWrapper(error, loc=('type',))], Document)
+        return model
+
+    def load(self, data):
+        """Validate a document with the model class of its type.
+
+        Args:
+            data: A document dictionary or the raw JSON text or bytes of a document.
+
+        Raises:
+            ValidationError: If the JSON is not valid, the type is missing or
+                unknown, or the document is not valid for its model.
+        """
+        if isinstance(data, (str, bytes, bytearray)):
+            try:
+                data = json.loads(data)
+            except (ValueError, TypeError, UnicodeDecodeError) as error:
+                raise ValidationError([ErrorWrapper(error, loc=ROOT_KEY)], Document)
+        return self.model_for(data).parse_obj(data)
+
+    def iter_load(self, items):
+        """Load documents one at a time.
+
+        Args:
+            items: An iterable of document dictionaries or raw JSON documents.
+
+        Yields:
+            An (index, model, errors) tuple for each document. The model is None and
+            errors is a list of error dictionaries if the document is not valid.
+        """
+        for index, data in enumerate(items):
+            yield self._load_item(index, data)
+
+    def load_many(self, items):
+        """Load a batch of documents and return a LoadResult."""
+        models, errors = [], []
+        for _, model, item_errors in self.iter_load(items):
+            models.append(model)
+            errors.extend(item_errors)
+        return LoadResult(models, errors)
+
+    def iter_jsonl(self, source):
+        """Load the documents of a JSONL file line by line.
+
+        The index of each document is its zero-based line number. Blank lines are
+        skipped.
+        """
+        with open(source, 'rb') as inf:
+            for index, line in enumerate(inf):
+                if line.strip():
+                    yield self._load_item(index, line)
+
+    def _load_item(self, index, data):
+        try:
+            return index, self.load(data), []
+        except ValidationError as error:
+            errors = error_list(error)
+            for e in errors:
+                e['index'] = index
+            return index, None, errors
+
+
+# registry of every model of the schema
+MODEL_REGISTRY = ModelRegistry()
+
+
+def load(data):
+    """Validate a document of any model of the schema. See ModelRegistry.load."""
+    return MODEL_REGISTRY.load(data)
+
+
+def load_many(items):
+    """Load a batch of documents of any model and return a LoadResult."""
+    return MODEL_REGISTRY.load_many(items)
+
+
+def iter_load(items):
+    """Yield an (index, model, errors) tuple for each document of any model."""
+    return MODEL_REGISTRY.iter_load(items)
+
+
+def iter_jsonl(source):
+    """Yield an (index, model, errors) tuple for each line of a JSONL file."""
+    return MODEL_REGISTRY.iter_jsonl(source)
@@ -0,0 +1,128 @@
+"""Opt-in cache of validated models keyed by a hash of the raw payload.
+
+Gateways often receive the same payload more than once, for example on retries or
+when many submissions are made from one template. A ValidationCache validates each
+distinct payload once and returns the cached model afterwards. The BEMDef and SchDef
+items of ref_bem_vector and ref_sch_vector are also cached on their own so that
+payloads that only differ in the top-level scalars do not validate the reference
+definitions again.
+
+.. code-block:: python
+
+    cache = ValidationCache(UWG, maxbytes=64 * 1024 ** 2)
+    model = cache.parse_raw(request_body)
+    cache.info()  # hits, misses and evictions of the payload and sub-object caches
+
+Every call returns a deep copy of the cached model, so callers can change the models
+that they get without changing the cache. A deep copy is still much faster than
+validating the payload again.
+"""
+import hashlib
+import json
+from collections import namedtuple
+
+from pydantic import BaseModel, ValidationError
+from pydantic.error_wrappers import ErrorWrapper
+from pydantic.fields import SHAPE_LIST
+
+from ._cache import LRUCache
+from .model import UWG
+from .report import ROOT_KEY
+
+ValidationCacheInfo = namedtuple('ValidationCacheInfo', 'payloads sub_objects')
+
+
+def payload_hash(raw):
+    """Return a 16 byte BLAKE2b digest of raw JSON text or bytes."""
+    if isinstance(raw, str):
+        raw = raw.encode('utf-8')
+    return hashlib.blake2b(raw, digest_size=16).digest()
+
+
+class ValidationCache(object):
+    """Least recently used cache of models validated from raw JSON payloads.
+
+    Args:
+        model: The model class of the payloads. (Default: UWG).
+        maxsize: Maximum number of cached payloads. (Default: 1024).
+        maxbytes: Optional maximum total length of the raw cached payloads.
+        sub_objects: Boolean to also cache the validated items of every list field
+            of nested models, such as the BEMDef items of ref_bem_vector. Items are
+            keyed by their canonical JSON so that key order and whitespace do not
+            matter. (Default: True).
+        sub_maxsize: Maximum number of cached sub-objects. (Default: 4096).
+        sub_maxbytes: Optional maximum total length of the cached sub-objects.
+    """
+
+    def __init__(self, model=UWG, maxsize=1024, maxbytes=None, sub_objects=True,
+                 sub_maxsize=4096, sub_maxbytes=None):
+        self.model = model
+        self._payloads = LRUCache(maxsize, maxbytes)
+        self._sub_objects = LRUCache(sub_maxsize, sub_maxbytes)
+        self._sub_fields = {}
+        if sub_objects:
+            for name, field in model.__fields__.items():
+                if field.shape == SHAPE_LIST and isinstance(field.type_, type) \
+                        and issubclass(field.type_, BaseModel):
+                    self._sub_fields[name] = field.type_
+
+    def parse_raw(self, raw):
+        """Return the validated model for a raw JSON payload.
+
+        The model is a deep copy of the cached model. Raises a pydantic
+        ValidationError for invalid JSON and invalid payloads, like the parse_raw
+        method of the model. Invalid payloads are not cached.
+        """
+        key = payload_hash(raw)
+        model = self._payloads.get(key)
+        if model is None:
+            if self._sub_fields:
+                try:
+                    data = json.loads(raw)
+                except (ValueError, TypeError, UnicodeDecodeError) as error:
+                    raise ValidationError(
+                        [ErrorWrapper(error, loc=ROOT_KEY)], self.model)
+                model = self.parse_obj(data)
+            else:
+                model = self.model.parse_raw(raw)
+            self._payloads.put(key, model, len(raw))
+        return model.copy(deep=True)
+
+    def parse_obj(self, data):
+        """Return a model validated from a dictionary using the sub-object cache.
+
+        Only the sub-objects are looked up in the cache because hashing the whole
+        dictionary would cost about as much as validating its scalars. The model
+        gets deep copies of the cached sub-objects.
+        """
+        if isinstance(data, dict):
+            for name, cls in self._sub_fields.items():
+                items = data.get(name)
+                if isinstance(items, list):
+                    data = dict(data)
+                    data[name] = [self._sub_object(cls, item) for item in items]
+        return self.model.parse_obj(data)
+
+    def info(self):
+        """Return the CacheInfo counters of the payload and sub-object caches."""
+        return ValidationCacheInfo(self._payloads.info(), self._sub_objects.info())
+
+    def clear(self):
+        """Remove every cached model and reset the counters."""
+        self._payloads.clear()
+        self._sub_objects.clear()
+
+    def _sub_object(self, cls, item):
+        if not isinstance(item, dict):
+            return item
+        text = json.dumps(item, sort_keys=True, separators=(',', ':'))
+        key = (cls.__name__, payload_hash(text))
+        model = self._sub_objects.get(key)
+        if model is None:
+            try:
+                model = cls.parse_obj(item)
+            except ValueError:
+                # keep the raw item so that the parent reports the error location
+                return item
+            self._sub_objects.put(key, model, len(text))
+        return model.copy(deep=True)
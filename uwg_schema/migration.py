@@ -0,0 +1,285 @@
+"""Upgrade stored UWG payloads from older versions of the schema.
+
+A MigrationRegistry holds transforms that take the raw dictionary of a UWG payload
+at one schema version and return it at the next. Transforms are plain functions so
+that they can be composed from the small helpers in this module.
+
+.. code-block:: python
+
+    registry = MigrationRegistry()
+    registry.register('0.1.0', rename_field('shgc_ref', 'shgc'))
+    registry.register('0.2.0', compose(
+        add_field('flr_h', None), remove_field('nbld')))
+
+    data = registry.upgrade(data)  # now at version 0.2.0
+    registry.upgrade_jsonl('archive.jsonl', 'archive_0.2.0.jsonl')
+
+Payloads that are already at the target version are returned or copied without
+being changed. The version of a payload is a dictionary lookup, and each distinct
+older version is planned only once.
+"""
+import json
+from collections import namedtuple
+
+from .model import UWG
+
+Migration = namedtuple('Migration', 'version transform description')
+
+# version of payloads that do not have a version key
+DEFAULT_VERSION = UWG.__fields__['version'].default
+
+
+def version_key(version):
+    """Return a tuple of integers that sorts semantic version strings."""
+    try:
+        return tuple(int(part) for part in version.split('.')[:3])
+    except (AttributeError, ValueError):
+        raise ValueError('Invalid schema version: {}'.format(version))
+
+
+# composable transforms
+
+
+def compose(*transforms):
+    """Return a transform that applies several transforms in order."""
+    def transform(data):
+        for func in transforms:
+            data = func(data)
+        return data
+    return transform
+
+
+def add_field(name, value):
+    """Return a transform that sets a field if the payload does not have it."""
+    def transform(data):
+        data.setdefault(name, value)
+        return data
+    return transform
+
+
+def rename_field(old, new):
+    """Return a transform that renames a field if the payload has it."""
+    def transform(data):
+        if old in data:
+            data[new] = data.pop(old)
+        return data
+    return transform
+
+
+def remove_field(name):
+    """Return a transform that removes a field if the payload has it."""
+    def transform(data):
+        data.pop(name, None)
+        return data
+    return transform
+
+
+def for_each(name, transform):
+    """Return a transform that applies a transform to each item of a list field.
+
+    This is used to migrate nested objects such as the BEMDef items of
+    ref_bem_vector. Missing and None fields are left unchanged.
+    """
+    def each(data):
+        items = data.get(name)
+        if items:
+            data[name] = [transform(item) for item in items]
+        return data
+    return each
+
+
+class MigrationRegistry(object):
+    """Ordered collection of schema migrations.
+
+    Args:
+        target: Optional version that payloads are upgraded to. Defaults to the
+            latest registered version. Payloads at later versions are left as is.
+    """
+
+    def __init__(self, target=None):
+        self._target = target
+        self._migrations = []
+        self._plans = {}
+
+    @property
+    def migrations(self):
+        """Tuple of registered Migration items sorted by version."""
+        return tuple(self._migrations)
+
+    @property
+    def target(self):
+        """Version that payloads are upgraded to or None without migrations."""
+        if self._target is not None:
+            return self._target
+        return self._migrations[-1].version if self._migrations else None
+
+    def register(self, version, transform=None, description=''):
+        """Register a transform that upgrades payloads to a version.
+
+        The transform takes a payload dictionary from the previous registered
+        version, may change it in place and returns the upgraded dictionary. It
+        does not need to set the version key. Several transforms registered for the
+        same version run in the order they were registered. This method can also be
+        used as a decorator.
+
+        Args:
+            version: The schema version that the transform upgrades to.
+            transform: A function that takes and returns a payload dictionary.
+            description: Optional text describing the change.
+        """
+        if transform is None:
+            def decorator(func):
+                self.register(version, func, description)
+                return func
+            return decorator
+        key = version_key(version)
+        index = len(self._migrations)
+        while index and version_key(self._migrations[index - 1].version) > key:
+            index -= 1
+        self._migrations.insert(index, Migration(version, transform, description))
+        self._plans.clear()
+        return transform
+
+    def plan(self, version):
+        """Return the tuple of migrations that upgrade a payload from a version."""
+        try:
+            return self._plans[version]
+        except KeyError:
+            pass
+        key = version_key(version)
+        target = self.target
+        target_key = version_key(target) if target is not None else key
+        plan = tuple(m for m in self._migrations
+                     if key < version_key(m.version) <= target_key)
+        self._plans[version] = plan
+        return plan
+
+    def is_current(self, data):
+        """Return True if a payload dictionary does not need to be upgraded."""
+        version = data.get('version') or DEFAULT_VERSION
+        return version == self.target or not self.plan(version)
+
+    def upgrade(self, data):
+        """Upgrade a payload dictionary to the target version.
+
+        The dictionary may be changed in place. Current payloads are returned as is.
+        """
+        version = data.get('version') or DEFAULT_VERSION
+        if version == self.target:
+            return data
+        plan = self.plan(version)
+        if not plan:
+            return data
+        for migration in plan:
+            data = migration.transform(data)
+        data['version'] = plan[-1].version
+        return data
+
+    def upgrade_many(self, items):
+        """Yield upgraded payload dictionaries for an iterable of dictionaries."""
+        upgrade = self.upgrade
+        for data in items:
+            yield upgrade(data)
+
+    def upgrade_lines(self, lines):
+        """Yield upgraded JSON lines for an iterable of JSON lines.
+
+        Lines of payloads that are already current are yielded unchanged without
+        being parsed when the version key can be found in the text.
+        """
+        for line, _ in self._upgrade_lines(lines):
+            yield line
+
+    def upgrade_jsonl(self, source, where):
+        """Upgrade a JSONL file line by line and return the number of upgraded lines.
+
+        Args:
+            source: Path to a JSONL file with one UWG payload per line.
+            where: Path to the output JSONL file.
+        """
+        count = 0
+        with open(source) as inf, open(where, 'w') as outf:
+            for line, upgraded in self._upgrade_lines(inf):
+                outf.write(line)
+                count += upgraded
+        return count
+
+    def upgrade_parquet(self, source, where, batch_size=10000, compression='zstd'):
+        """Upgrade a Parquet file batch by batch and return the number of upgraded rows.
+
+        The output file uses the current Arrow schema of the UWG model. Batches
+        where every row is already at the target version are not converted to
+        Python objects.
+
+        Args:
+            source: Path to a Parquet file of UWG payloads.
+            where: Path to the output Parquet file.
+            batch_size: Number of rows read and written at a time. (Default: 10000).
+            compression: Parquet compression codec. (Default: zstd).
+        """
+        from .arrow import _pyarrow, arrow_schema, BLD_KEYS
+        pa = _pyarrow()
+        schema = arrow_schema(UWG)
+        count = 0
+        parquet_file = pa.parquet.ParquetFile(source)
+        with pa.parquet.ParquetWriter(where, schema, compression=compression) as writer:
+            for batch in parquet_file.iter_batches(batch_size=batch_size):
+                if self._batch_is_current(pa, batch) and batch.schema.equals(schema):
+                    writer.write_table(pa.Table.from_batches([batch]))
+                    continue
+                rows = []
+                for row in batch.to_pylist():
+                    if not self.is_current(row):
+                        bld = row.get('bld')
+                        if bld:
+                            row['bld'] = [[r[k] for k in BLD_KEYS] for r in bld]
+                        row = self.upgrade(row)
+                        bld = row.get('bld')
+                        if bld:
+                            row['bld'] = [dict(zip(BLD_KEYS, r)) for r in bld]
+                        count += 1
+                    rows.append(row)
+                writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+        return count
+
+    def _batch_is_current(self, pa, batch):
+        target = self.target
+        if target is None:
+            return True
+        if 'version' not in batch.schema.names:
+            return False
+        column = batch.column('version')
+        return column.null_count == 0 and \
+            pa.compute.all(pa.compute.equal(column, target)).as_py()
+
+    def _upgrade_lines(self, lines):
+        markers = self._markers()
+        for line in lines:
+            if not line.strip():
+                continue
+            if not line.endswith('\n'):
+                line += '\n'
+            if markers and any(m in line for m in markers):
+                yield line, False
+                continue
+            data = json.loads(line)
+            if self.is_current(data):
+                yield line, False
+            else:
+                data = self.upgrade(data)
+                yield json.dumps(data, separators=(',', ':')) + '\n', True
+
+    def _markers(self):
+        target = self.target
+        if target is None:
+            return ()
+        return tuple('"version"{}"{}"'.format(sep, target) for sep in (':', ': '))
+
+
+# registry of the migrations between released versions of uwg-schema
+MIGRATIONS = MigrationRegistry()
+
+
+def upgrade(data):
+    """Upgrade a UWG payload dictionary with the registered MIGRATIONS."""
+    return MIGRATIONS.upgrade(data)
@@ -1,17 +1,19 @@
 """UWG Model schema."""
-from pydantic import Field, validator, constr, conlist
+from pydantic import Field, validator, conlist
 from typing import List, Union
 
-from ._base import NoExtraBaseModel
+from ._base import type_tag
+from ._errors import ErrorCollector
+from .bldtypes import BUILDING_TYPES, REF_BUILTERA
 from .ref_bld_template import BEMDef, SchDef, WEEK_MATRIX
+from .week_matrix import WeekMatrixModel, decode_week_matrix, \
+    run_length_week_matrix, schema_extra
 
 # references
 REF_ZONETYPE = ('1A', '1B', '2A', '2B', '3A', '3B-CA', '3B', '3C', '4A', '4B', '4C',
                 '5A', '5B', '5C', '6A', '6B', '7', '8')
 REF_ZONETYPE_SET = {'1A', '1B', '2A', '2B', '3A', '3B-CA', '3B', '3C', '4A', '4B', '4C',
                     '5A', '5B', '5C', '6A', '6B', '7', '8'}
-REF_BUILTERA = ('pre80', 'pst80', 'new')
-REF_BUILTERA_SET = {'pre80', 'pst80', 'new'}
 
 # defaults
 DEFAULT_BLD = [('largeoffice', 'pst80', 0.4),
@@ -25,10 +27,13 @@ DEFAULT_SCHTRAFFIC = [
         0.4, 0.4, 0.4, 0.4, 0.3, 0.3, 0.2, 0.2]]  # Sunday
 
 
-class UWG(NoExtraBaseModel):
+class UWG(WeekMatrixModel):
     """Urban Weather Generator (UWG) class."""
 
-    type: constr(regex='^UWG$') = 'UWG'
+    class Config:
+        schema_extra = schema_extra
+
+    type: type_tag('UWG') = 'UWG'
 
     version: str = Field(
         default='0.0.0',
@@ -87,6 +92,7 @@ class UWG(NoExtraBaseModel):
         assert value in REF_ZONETYPE_SET, \
             'The zone must be one of {}.Got: {}.'.format(
                 REF_ZONETYPE, value.lower())
+        return value
 
     month: int = Field(
         1,
@@ -139,29 +145,32 @@ class UWG(NoExtraBaseModel):
         'ref_bem_vector and ref_sch_vector arrays. The fractions should sum to one.'
     )
 
-    @ validator('bld')
+    @validator('bld')
     def check_bld(cls, value):
         """Ensure bld arrays have correct order of types."""
+        errors = ErrorCollector(cls)
         total_frac = 0.0
-        for bld_row in value:
+        for i, bld_row in enumerate(value):
             bldtype, builtera, frac = bld_row[0], bld_row[1], bld_row[2]
-            assert isinstance(bldtype, str), 'The first item in the '
-            'bld array must be text defining the reference building '
-            'type. Got: {}.'.format(bldtype)
-            assert isinstance(builtera, str) and builtera.lower() in REF_BUILTERA_SET, \
-                'The second item in the bld array must be text defining the built '
-            'era as one of {}. Got: {}.'.format(
-                REF_BUILTERA, builtera.lower())
-            assert 0.0 <= frac <= 1.0, 'The third item in the bld array '
-            'must be a value between 0 and 1, inclusive, defining the '
-            'fraction of total built stock. Got: {}.'.format(frac)
-            total_frac += frac
-
-        assert abs(total_frac - 1.0) < 1e-10, 'The sum of reference building '
-        'fractions defined in bld must equal one. Got: {}.'.format(
-            total_frac)
-
+            if not isinstance(bldtype, str):
+                errors.add('The first item in the bld array must be text defining the '
+                           'reference building type. Got: {}.'.format(bldtype), i, 0)
+            if not (isinstance(builtera, str) and BUILDING_TYPES.is_builtera(builtera)):
+                errors.add('The second item in the bld array must be text defining the '
+                           'built era as one of {}. Got: {}.'.format(
+                               REF_BUILTERA, builtera), i, 1)
+            if isinstance(frac, (float, int)) and 0.0 <= frac <= 1.0:
+                total_frac += frac
+            else:
+                errors.add('The third item in the bld array must be a value between 0 '
+                           'and 1, inclusive, defining the fraction of total built '
+                           'stock. Got: {}.'.format(frac), i, 2)
+        if not errors and abs(total_frac - 1.0) >= 1e-10:
+            errors.add('The sum of reference building fractions defined in bld must '
+                       'equal one. Got: {}.'.format(total_frac))
+        errors.raise_errors()
         return value
+
     autosize: bool = Field(
         False,
         description='Boolean to set HVAC autosize.'
@@ -308,14 +317,25 @@ class UWG(NoExtraBaseModel):
         'the day.'
     )
 
+    _decode_schtraffic = validator(
+        'schtraffic', pre=True, allow_reuse=True)(decode_week_matrix)
+
     @validator('schtraffic')
     def check_schtraffic(cls, values):
         """Ensure datatype of schtraffic values."""
-        _values = [hr for day in values for hr in day]
-        assert all(isinstance(v, (float, int)) for v in _values), \
-            'Every item in schtraffic must be a number.'
+        if all(isinstance(hr, (float, int)) for day in values for hr in day):
+            return values
+        errors = ErrorCollector(cls)
+        for i, day in enumerate(values):
+            for j, hr in enumerate(day):
+                if not isinstance(hr, (float, int)):
+                    errors.add('Every item in schtraffic must be a number.', i, j)
+        errors.raise_errors()
         return values
 
+    _run_length_schtraffic = validator(
+        'schtraffic', allow_reuse=True)(run_length_week_matrix)
+
     h_ubl1: float = Field(
         1000,
         ge=0,
@@ -447,3 +467,11 @@ class UWG(NoExtraBaseModel):
         'If value is None, all SchDef objects are referenced from the DOE typologies '
         'defined by default in the refSch matrix.'
     )
+
+    def stock_average(self, cache=None):
+        """Return the fraction-weighted averages of the buildings in bld.
+
+        See stock.stock_average. NumPy must be installed.
+        """
+        from .stock import stock_average  # stock imports this module
+        return stock_average(self, cache)
@@ -0,0 +1,149 @@
+"""Group UWG jobs by their shared setup and run them in batches.
+
+Models in a parametric study often share their zone, their bld mix, their reference
+vectors and their simulation window and only differ in the urban geometry scalars.
+plan_batches partitions models by content hashes of these parts so that setup that
+depends on them, such as resolving the reference buildings or reading the weather
+rows, is done once per batch.
+
+.. code-block:: python
+
+    def simulate(batch):
+        setup = prepare(batch.models[0])  # shared by every model in the batch
+        return [run(setup, model) for model in batch.models]
+
+    results = map_batches(simulate, models, batch_size=500, executor=pool)
+    # results[i] is the result for models[i]
+"""
+import hashlib
+import json
+from collections import OrderedDict, namedtuple
+
+from .window import window_key
+
+JobBatch = namedtuple('JobBatch', 'key indices models')
+JobBatch.__doc__ = """Models that share a setup key.
+
+Attributes:
+    key: The setup key of every model in the batch.
+    indices: Tuple with the position of each model in the planned collection.
+    models: Tuple of the models in the batch.
+"""
+
+
+def content_hash(value):
+    """Return a hex digest of the canonical JSON of a value or of models in it."""
+    text = json.dumps(_plain(value), sort_keys=True, separators=(',', ':'))
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _plain(value):
+    if hasattr(value, 'dict'):
+        return value.dict()
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    return value
+
+
+class _Hasher(object):
+    """Content hashes that are computed once per distinct object."""
+
+    def __init__(self):
+        self._hashes = {}
+
+    def __call__(self, value):
+        if value is None:
+            return None
+        try:
+            return self._hashes[id(value)][1]
+        except KeyError:
+            digest = content_hash(value)
+            # keep the value so that its id is not reused while the hasher is alive
+            self._hashes[id(value)] = (value, digest)
+            return digest
+
+
+def setup_key(model, hasher=content_hash):
+    """Return the key of the setup that a UWG model shares with other models.
+
+    The key combines the zone, content hashes of bld, ref_bem_vector and
+    ref_sch_vector, and the window_key of the model.
+    """
+    return (model.zone, hasher(model.bld), hasher(model.ref_bem_vector),
+            hasher(model.ref_sch_vector), window_key(model))
+
+
+def plan_batches(models, batch_size=None, key=None):
+    """Partition models into batches of models with the same setup key.
+
+    Args:
+        models: An iterable of validated UWG models.
+        batch_size: Optional maximum number of models per batch. Larger groups are
+            split into several batches with the same key.
+        key: Optional function that takes a model and returns its setup key.
+            Defaults to setup_key, with each distinct bld list and reference vector
+            object hashed only once.
+
+    Returns:
+        A list of JobBatch. Groups are in the order in which their first model
+        appears and models keep their relative order inside each group.
+    """
+    assert batch_size is None or batch_size > 0, 'batch_size must be greater than 0.'
+    if key is None:
+        hasher = _Hasher()
+
+        def key(model):
+            return setup_key(model, hasher)
+
+    groups = OrderedDict()
+    for i, model in enumerate(models):
+        groups.setdefault(key(model), []).append((i, model))
+    batches = []
+    for group_key, items in groups.items():
+        size = batch_size or len(items)
+        for start in range(0, len(items), size):
+            chunk = items[start:start + size]
+            batches.append(JobBatch(group_key, tuple(i for i, _ in chunk),
+                                    tuple(m for _, m in chunk)))
+    return batches
+
+
+def gather(batches, batch_results):
+    """Return per-model results in the original order of the models.
+
+    Args:
+        batches: The list of JobBatch returned by plan_batches.
+        batch_results: An iterable with a sequence of results for each batch, in the
+            order of the models of the batch.
+    """
+    count = sum(len(batch.indices) for batch in batches)
+    results = [None] * count
+    for batch, values in zip(batches, batch_results):
+        values = list(values)
+        assert len(values) == len(batch.indices), 'Expected {} results for a batch. ' \
+            'Got: {}.'.format(len(batch.indices), len(values))
+        for i, value in zip(batch.indices, values):
+            results[i] = value
+    return results
+
+
+def map_batches(func, models, batch_size=None, executor=None):
+    """Run a function over batches of models with a shared setup.
+
+    Args:
+        func: A function that takes a JobBatch and returns a list with one result
+            per model of the batch. It must be picklable to use a process pool.
+        models: An iterable of validated UWG models.
+        batch_size: Optional maximum number of models per batch.
+        executor: Optional concurrent.futures executor to run the batches in
+            parallel. The batches run one after the other if None.
+
+    Returns:
+        A list with the result of each model in the order of models.
+    """
+    batches = plan_batches(models, batch_size)
+    if executor is None:
+        batch_results = map(func, batches)
+    else:
+        batch_results = executor.map(func, batches)
+    return gather(batches, batch_results)
@@ -0,0 +1,265 @@
+"""Measure the time and memory of the lifecycle operations of the models.
+
+profile_models runs parse_obj, dict, copy and json on batches of sample documents
+of each model and reports, for each model, operation and batch size, the best time,
+the peak traced memory, the memory and blocks that are still allocated by the result
+and the top allocation sites from tracemalloc, and the top functions by cumulative
+time from cProfile:
+
+.. code-block:: python
+
+    report = profile_models(scales=(1, 100))
+    write_profile('profile.json', report)
+    regressions = compare_profiles(baseline, report)  # [] if nothing grew
+
+The report is a JSON-compatible dictionary so that reports of different releases
+can be stored and compared. Time and memory are measured in separate runs because
+tracing slows every allocation down.
+"""
+import cProfile
+import copy
+import gc
+import json
+import os
+import platform
+import pstats
+import time
+import tracemalloc
+from collections import OrderedDict
+
+import pydantic
+
+from .model import UWG
+from .ref_bld_template import Material, Element, Building, BEMDef, SchDef
+from .samples import sample_dict, sample_material, sample_element, \
+    sample_building, sample_schdef, sample_bemdef, sample_custom_uwg
+
+# model class and the function that builds its sample document
+MODELS = OrderedDict((
+    ('Material', (Material, sample_material)),
+    ('Element', (Element, sample_element)),
+    ('Building', (Building, sample_building)),
+    ('SchDef', (SchDef, sample_schdef)),
+    ('BEMDef', (BEMDef, sample_bemdef)),
+    ('UWG', (UWG, sample_custom_uwg))
+))
+# functions that take a model class, a list of documents and a list of models
+OPERATIONS = OrderedDict((
+    ('parse_obj', lambda cls, docs, models: [cls.parse_obj(d) for d in docs]),
+    ('dict', lambda cls, docs, models: [m.dict() for m in models]),
+    ('copy', lambda cls, docs, models: [m.copy() for m in models]),
+    ('copy_deep', lambda cls, docs, models: [m.copy(deep=True) for m in models]),
+    ('json', lambda cls, docs, models: [m.json() for m in models])
+))
+# metrics that compare_profiles checks by default
+METRICS = ('peak_bytes', 'retained_bytes', 'retained_blocks')
+# site of the allocations of compiled code that is called by this module
+COMPILED_SITE = '<compiled>'
+
+
+def _site(filename, lineno):
+    """Return a file:line text that does not depend on the install location."""
+    parts = filename.replace('\\', '/').split('/')
+    for anchor in ('site-packages', 'uwg_schema', 'lib'):
+        if anchor in parts:
+            i = len(parts) - 1 - parts[::-1].index(anchor)
+            parts = parts[i + 1:] if anchor != 'uwg_schema' else parts[i:]
+            break
+    else:
+        parts = parts[-2:]
+    return '{}:{}'.format('/'.join(parts), lineno)
+
+
+def measure_time(func, repeat=3):
+    """Return the best time of a function call in seconds."""
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def _allocation_sites(traceback):
+    """Return the sites of a traceback from the innermost frame to this module."""
+    sites = []
+    for frame in reversed(traceback):
+        if frame.filename == __file__:
+            break
+        sites.append(_site(frame.filename, frame.lineno))
+    return tuple(sites)
+
+
+def measure_memory(func, top=10, frames=25):
+    """Trace the memory that a function call allocates.
+
+    The allocations are grouped by the innermost frame of their traceback below
+    the frames of this module. Compiled code such as a compiled pydantic has no
+    frames, so its allocations are charged to the Python function that it runs,
+    for instance a validator of model.py, or to COMPILED_SITE if it is called by
+    this module.
+
+    Args:
+        func: A function without arguments.
+        top: Number of allocation sites to report. (Default: 10).
+        frames: Number of frames of each traceback that tracemalloc keeps. It
+            must be large enough to reach the frames outside of this module.
+            (Default: 25).
+
+    Returns:
+        A dictionary with the peak_bytes of the call, the retained_bytes and
+        retained_blocks that are still allocated by its result, and a
+        top_allocations list with the site, traceback, bytes and blocks of the
+        allocation sites of the retained memory. The traceback lists the frames
+        of the largest allocations of a site from the innermost frame up to this
+        module.
+    """
+    if tracemalloc.is_tracing():
+        raise RuntimeError(
+            'tracemalloc is already tracing. Memory can only be measured without it.')
+    gc.collect()
+    tracemalloc.start(frames)
+    try:
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    del result
+    snapshot = snapshot.filter_traces(
+        (tracemalloc.Filter(False, tracemalloc.__file__),))
+    sites = OrderedDict()
+    # the statistics are sorted by size, so the first traceback of a site is kept
+    for stat in snapshot.statistics('traceback'):
+        traceback = _allocation_sites(stat.traceback)
+        site = traceback[0] if traceback else COMPILED_SITE
+        if site not in sites:
+            sites[site] = {'site': site, 'traceback': list(traceback),
+                           'bytes': 0, 'blocks': 0}
+        sites[site]['bytes'] += stat.size
+        sites[site]['blocks'] += stat.count
+    ranked = sorted(sites.values(), key=lambda s: s['bytes'], reverse=True)
+    return {
+        'peak_bytes': peak,
+        'retained_bytes': sum(s['bytes'] for s in ranked),
+        'retained_blocks': sum(s['blocks'] for s in ranked),
+        'top_allocations': ranked[:top]
+    }
+
+
+def profile_functions(func, top=10):
+    """Return the top functions of a call by cumulative time with cProfile.
+
+    The functions of this module, which only wrap the profiled operation, are left
+    out.
+
+    Returns:
+        A list of dictionaries with the function, calls, tottime and cumtime of
+        each function.
+    """
+    profiler = cProfile.Profile()
+    profiler.runcall(func)
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, lineno, name), values in stats.stats.items():
+        calls, tottime, cumtime = values[1], values[2], values[3]
+        if filename == __file__:
+            continue
+        if filename == '~':
+            # built-in functions
+            function = name
+        else:
+            function = '{}({})'.format(_site(filename, lineno), name)
+        rows.append({'function': function, 'calls': calls,
+                     'tottime': tottime, 'cumtime': cumtime})
+    rows.sort(key=lambda r: r['cumtime'], reverse=True)
+    return rows[:top]
+
+
+def profile_models(models=None, operations=None, scales=(1, 10, 100), top=10,
+                   repeat=3):
+    """Profile the lifecycle operations of the models at several batch sizes.
+
+    Args:
+        models: Optional list of MODELS names. Defaults to all of them.
+        operations: Optional list of OPERATIONS names. Defaults to all of them.
+        scales: Numbers of documents in a batch. (Default: (1, 10, 100)).
+        top: Number of allocation sites and functions to report. (Default: 10).
+        repeat: Number of timed runs of each operation. (Default: 3).
+
+    Returns:
+        A dictionary with the environment of the run and a results list with a
+        dictionary for each model, operation and scale.
+    """
+    models = list(MODELS) if models is None else list(models)
+    operations = list(OPERATIONS) if operations is None else list(operations)
+    results = []
+    for name in models:
+        cls, sample = MODELS[name]
+        document = sample_dict(sample())
+        for scale in scales:
+            docs = [copy.deepcopy(document) for _ in range(scale)]
+            instances = [cls.parse_obj(d) for d in docs]
+            for operation in operations:
+                op = OPERATIONS[operation]
+
+                def func():
+                    return op(cls, docs, instances)
+
+                result = OrderedDict((
+                    ('model', name), ('operation', operation), ('scale', scale),
+                    ('seconds', measure_time(func, repeat))
+                ))
+                result.update(measure_memory(func, top))
+                result['top_functions'] = profile_functions(func, top)
+                results.append(result)
+    return OrderedDict((
+        ('python', platform.python_version()),
+        ('implementation', platform.python_implementation()),
+        ('pydantic', str(pydantic.VERSION)),
+        ('platform', platform.platform()),
+        ('scales', list(scales)),
+        ('results', results)
+    ))
+
+
+def write_profile(path, report):
+    """Write a report of profile_models to a JSON file."""
+    directory = os.path.dirname(path)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory)
+    with open(path, 'w') as fp:
+        json.dump(report, fp, indent=2)
+
+
+def compare_profiles(baseline, report, metrics=METRICS, tolerance=0.1):
+    """Return the results of a report that grew compared to a baseline report.
+
+    Args:
+        baseline: A report of profile_models, for instance of a previous release.
+        report: A report of profile_models.
+        metrics: Names of the result values to compare. (Default: METRICS).
+        tolerance: Relative growth that is not reported. (Default: 0.1).
+
+    Returns:
+        A list with a dictionary for each model, operation, scale and metric that
+        is more than tolerance greater than in the baseline. Results that are
+        only in one of the reports are not compared.
+    """
+    previous = {(r['model'], r['operation'], r['scale']): r
+                for r in baseline['results']}
+    regressions = []
+    for result in report['results']:
+        key = (result['model'], result['operation'], result['scale'])
+        if key not in previous:
+            continue
+        for metric in metrics:
+            old, new = previous[key][metric], result[metric]
+            if new > old * (1 + tolerance):
+                regressions.append(OrderedDict((
+                    ('model', key[0]), ('operation', key[1]), ('scale', key[2]),
+                    ('metric', metric), ('baseline', old), ('current', new),
+                    ('ratio', new / old if old else None)
+                )))
+    return regressions
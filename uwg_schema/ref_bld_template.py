@@ -1,20 +1,18 @@
-from pydantic import Field, validator, root_validator, constr, conlist
+from pydantic import Field, validator, root_validator
 from typing import List
 from enum import Enum
 
-from ._base import NoExtraBaseModel
-
-WEEK_MATRIX = \
-    conlist(conlist(float, min_items=24, max_items=24),
-            min_items=3, max_items=3)
-REF_BUILTERA = ('pre80', 'pst80', 'new')
-REF_BUILTERA_SET = {'pre80', 'pst80', 'new'}
+from ._base import NoExtraBaseModel, type_tag
+from ._errors import ErrorCollector
+from .bldtypes import BUILDING_TYPES, REF_BLDTYPE, REF_BUILTERA
+from .week_matrix import WEEK_MATRIX, WeekMatrixModel, decode_week_matrix, \
+    run_length_week_matrix, schema_extra
 
 
 class Material(NoExtraBaseModel):
     """Material class."""
 
-    type: constr(regex='^Material$') = 'Material'
+    type: type_tag('Material') = 'Material'
 
     thermalcond: float = Field(
         ...,
@@ -37,7 +35,7 @@ class Material(NoExtraBaseModel):
 class Element(NoExtraBaseModel):
     """Element object defines constructions."""
 
-    type: constr(regex='^Element$') = 'Element'
+    type: type_tag('Element') = 'Element'
 
     albedo: float = Field(
         ...,
@@ -97,23 +95,32 @@ class Element(NoExtraBaseModel):
         """Ensure material and thickness list lengths."""
         thickness_lst = values.get('layer_thickness_lst')
         material_lst = values.get('material_lst')
+        if thickness_lst is None or material_lst is None:
+            return values  # one of the lists failed and was already reported
         assert len(thickness_lst) == len(material_lst), 'The material_lst must ' \
             'have the same length as the layer_thickness_lst. Got lengths {} and {}, ' \
-            'respectively.'
+            'respectively.'.format(len(material_lst), len(thickness_lst))
         return values
 
     @validator('layer_thickness_lst')
     def check_layer_thickness_lst(cls, values):
         """Ensure every list value is greater than 0."""
-        assert all(v > 0 for v in values), \
-            'Every value in layer_thickness_lst must be greater than 0.'
+        errors = ErrorCollector(cls)
+        for i, v in enumerate(values):
+            if not v > 0:
+                errors.add('Every value in layer_thickness_lst must be greater '
+                           'than 0. Got: {}.'.format(v), i)
+        errors.raise_errors()
         return values
 
     @validator('material_lst')
     def check_material_lst(cls, values):
         """Ensure every list item is a Material object."""
-        assert all(isinstance(v, Material) for v in values), \
-            'Every item in material_lst must be a Material object.'
+        errors = ErrorCollector(cls)
+        for i, v in enumerate(values):
+            if not isinstance(v, Material):
+                errors.add('Every item in material_lst must be a Material object.', i)
+        errors.raise_errors()
         return values
 
 
@@ -126,7 +133,7 @@ class CondType(str, Enum):
 class Building(NoExtraBaseModel):
     """Building object specifies building characteristics."""
 
-    type: constr(regex='^Building$') = 'Building'
+    type: type_tag('Building') = 'Building'
 
     floor_height: float = Field(
         ...,
@@ -226,7 +233,7 @@ class Building(NoExtraBaseModel):
 
 class BEMDef(NoExtraBaseModel):
     """Building Energy Model (BEM) definition."""
-    type: constr(regex='^BEMDef$') = 'BEMDef'
+    type: type_tag('BEMDef') = 'BEMDef'
 
     bldtype: str = Field(
         ...,
@@ -251,11 +258,15 @@ class BEMDef(NoExtraBaseModel):
         'building occupies in the UWG simulation.'
     )
 
+    @validator('bldtype')
+    def intern_bldtype(cls, value):
+        return BUILDING_TYPES.intern(value)
+
     @validator('builtera')
     def check_builtera(cls, value):
-        assert value in REF_BUILTERA_SET, \
-            'The builtera must be one of {}.Got: {}.'.format(
-                REF_BUILTERA, value.lower())
+        assert BUILDING_TYPES.is_builtera(value), \
+            'The builtera must be one of {}. Got: {}.'.format(REF_BUILTERA, value)
+        return BUILDING_TYPES.intern_builtera(value)
 
     building: Building = Field(
         ...,
@@ -278,10 +289,13 @@ class BEMDef(NoExtraBaseModel):
     )
 
 
-class SchDef(NoExtraBaseModel):
+class SchDef(WeekMatrixModel):
     """Schedule definition class."""
 
-    type: constr(regex='^SchDef$') = 'SchDef'
+    class Config:
+        schema_extra = schema_extra
+
+    type: type_tag('SchDef') = 'SchDef'
 
     bldtype: str = Field(
         ...,
@@ -306,11 +320,15 @@ class SchDef(NoExtraBaseModel):
         'building occupies in the UWG simulation.'
     )
 
+    @validator('bldtype')
+    def intern_bldtype(cls, value):
+        return BUILDING_TYPES.intern(value)
+
     @validator('builtera')
     def check_builtera(cls, value):
-        assert value in REF_BUILTERA_SET, \
-            'The builtera must be one of {}.Got: {}.'.format(
-                REF_BUILTERA, value.lower())
+        assert BUILDING_TYPES.is_builtera(value), \
+            'The builtera must be one of {}. Got: {}.'.format(REF_BUILTERA, value)
+        return BUILDING_TYPES.intern_builtera(value)
 
     elec: WEEK_MATRIX = Field(
         ...,
@@ -347,6 +365,14 @@ class SchDef(NoExtraBaseModel):
         description='Matrix of numbers for weekly hot water schedule.'
     )
 
+    _decode_week_matrix = validator(
+        'elec', 'gas', 'light', 'occ', 'cool', 'heat', 'swh', pre=True,
+        allow_reuse=True)(decode_week_matrix)
+
+    _run_length_week_matrix = validator(
+        'elec', 'gas', 'light', 'occ', 'cool', 'heat', 'swh',
+        allow_reuse=True)(run_length_week_matrix)
+
     q_elec: float = Field(
         ...,
         ge=0,
@@ -388,12 +414,19 @@ class SchDef(NoExtraBaseModel):
 
     @root_validator
     def check_week_matrix_values(cls, values):
-
+        """Ensure every item of every schedule is a number."""
+        errors = ErrorCollector(cls)
         schstrlst = ['elec', 'gas', 'light', 'occ', 'cool', 'heat', 'swh']
-        schlst = [values.get(schstr) for schstr in schstrlst]
-
-        for sch in schlst:
-            _sch = [hr for day in sch for hr in day]
-            assert all(isinstance(v, (float, int)) for v in _sch), \
-                'Every item in {} must be a number.'
+        for schstr in schstrlst:
+            sch = values.get(schstr)
+            if sch is None:
+                continue  # the schedule failed and was already reported
+            if all(isinstance(hr, (float, int)) for day in sch for hr in day):
+                continue
+            for i, day in enumerate(sch):
+                for j, hr in enumerate(day):
+                    if not isinstance(hr, (float, int)):
+                        errors.add('Every item in {} must be a number.'.format(schstr),
+                                   schstr, i, j)
+        errors.raise_errors()
         return values
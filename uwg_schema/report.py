@@ -0,0 +1,106 @@
+"""Machine-readable validation reports with every error of a payload.
+
+Validation does not stop at the first error: every field is validated and the
+validators of the schema report each bad item of a list or matrix separately. The
+functions in this module turn the errors into plain dictionaries that locate each
+error with a JSON pointer (RFC 6901) into the submitted payload, so that all of the
+corrections can be made at once.
+
+.. code-block:: python
+
+    report = validate(payload)
+    # {'valid': False, 'errors': [
+    #     {'pointer': '/bld/1/2', 'loc': ['bld', 1, 2], 'msg': '...',
+    #      'type': 'assertion_error'}, ...]}
+
+    report = validate_many(payloads)  # errors also have the index of the payload
+"""
+from pydantic import ValidationError
+
+from .model import UWG
+
+ROOT_KEY = '__root__'
+
+
+def json_pointer(loc):
+    """Return the JSON pointer for the location of a pydantic error.
+
+    The __root__ keys of root validator errors are left out so that the pointer
+    refers to the object that the root validator checked.
+    """
+    parts = []
+    for key in loc:
+        if key == ROOT_KEY:
+            continue
+        parts.append(str(key).replace('~', '~0').replace('/', '~1'))
+    return ''.join('/' + part for part in parts)
+
+
+def error_list(error):
+    """Return the errors of a ValidationError as dictionaries with JSON pointers."""
+    return [
+        {'pointer': json_pointer(e['loc']), 'loc': list(e['loc']),
+         'msg': e['msg'], 'type': e['type']}
+        for e in error.errors()
+    ]
+
+
+def validate(data, model=UWG):
+    """Validate a payload and return a report with every error.
+
+    Args:
+        data: A payload dictionary or the raw JSON text or bytes of a payload.
+        model: The model class of the payload. (Default: UWG).
+
+    Returns:
+        A dictionary with a valid boolean and an errors list. Each error has a
+        pointer, a loc, a msg and a type.
+    """
+    try:
+        if isinstance(data, (str, bytes)):
+            model.parse_raw(data)
+        else:
+            model.parse_obj(data)
+    except ValidationError as error:
+        return {'valid': False, 'errors': error_list(error)}
+    return {'valid': True, 'errors': []}
+
+
+def validate_many(items, model=UWG):
+    """Validate a batch of payloads and return one report for the whole batch.
+
+    Args:
+        items: An iterable of payload dictionaries or raw JSON payloads.
+        model: The model class of the payloads. (Default: UWG).
+
+    Returns:
+        A dictionary with the count of payloads, the count of valid and invalid
+        payloads and an errors list. Each error has the index of its payload in
+        addition to the keys of the errors returned by validate.
+    """
+    return _batch_report(enumerate(items), model)
+
+
+def validate_jsonl(source, model=UWG):
+    """Validate a JSONL file line by line and return a batch report.
+
+    The index of each error is the zero-based line number. Blank lines are skipped.
+    """
+    with open(source) as inf:
+        return _batch_report(
+            ((i, line) for i, line in enumerate(inf) if line.strip()), model)
+
+
+def _batch_report(items, model):
+    count = valid = 0
+    errors = []
+    for index, data in items:
+        count += 1
+        report = validate(data, model)
+        if report['valid']:
+            valid += 1
+        for error in report['errors']:
+            error['index'] = index
+            errors.append(error)
+    return {'count': count, 'valid': valid, 'invalid': count - valid,
+            'errors': errors}
@@ -0,0 +1,288 @@
+"""Build the sample models and a synthetic building set natively.
+
+The sample_* functions build the models of the samples folder from the pydantic
+models of this package, so the samples can be regenerated without the uwg package:
+
+.. code-block:: python
+
+    write_samples('samples')  # material.json, element.json, ..., custom_uwg.json
+
+synthetic_definitions builds a deterministic (BEMDef, SchDef) pair for each of the
+16 x 3 x 18 combinations of REF_BLDTYPE, REF_BUILTERA and REF_ZONETYPE. The values
+are derived from the sample definitions and vary in a regular way with the building
+type, the built era and the climate zone. They are made up and are NOT the DOE
+reference values of the uwg package. They only have the same shape and are valid
+against the schema, which makes them a large fixture corpus for tests and
+benchmarks. Do not use them as the reference builder of the templates module, since
+the consistency checks and the stock averages would then report made-up physical
+values.
+
+.. code-block:: python
+
+    fixtures = build_synthetic_set(processes=4)
+    bem, sch = fixtures[('4A', 'largeoffice', 'pst80')]  # dictionaries
+"""
+import json
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from .model import UWG, REF_ZONETYPE
+from .ref_bld_template import Material, Element, Building, BEMDef, SchDef, \
+    REF_BLDTYPE, REF_BUILTERA
+
+
+def _wood():
+    return Material(thermalcond=0.11, volheat=1210.0 * 544.62, name='wood')
+
+
+def _insulation():
+    return Material(thermalcond=0.049, volheat=836.8 * 265.0, name='insulation')
+
+
+def _gypsum():
+    return Material(thermalcond=0.16, volheat=830.0 * 784.9, name='gypsum')
+
+
+def _wall(insulation_thickness=0.01, horizontal=False, name='wood_frame_wall'):
+    return Element(
+        albedo=0.22, emissivity=0.92,
+        layer_thickness_lst=[0.01, insulation_thickness, 0.0127],
+        material_lst=[_wood(), _insulation(), _gypsum()], vegcoverage=0, t_init=293,
+        horizontal=horizontal, name=name)
+
+
+def _mass():
+    return Element(
+        albedo=0.2, emissivity=0.9, layer_thickness_lst=[0.05, 0.05],
+        material_lst=[_wood(), _wood()], vegcoverage=0, t_init=293, horizontal=True,
+        name='wood_floor')
+
+
+def _building(**kwargs):
+    # New Midrise Apartment, 1A
+    values = dict(
+        floor_height=3.0, int_heat_night=1, int_heat_day=1, int_heat_frad=0.1,
+        int_heat_flat=0.1, infil=0.171, vent=0.00045, glazing_ratio=0.4, u_value=3.0,
+        shgc=0.3, condtype='AIR', cop=3, coolcap=41, heateff=0.8, initial_temp=293)
+    values.update(kwargs)
+    return Building(**values)
+
+
+def _schdef(bldtype, builtera, value=0.15):
+    week = [[value] * 24 for _ in range(3)]
+    return SchDef(
+        elec=week, gas=week, light=week, occ=week, cool=week, heat=week, swh=week,
+        q_elec=18.9, q_gas=3.2, q_light=18.9, n_occ=0.12, vent=0.0013, v_swh=0.2846,
+        bldtype=bldtype, builtera=builtera)
+
+
+def _bemdef(bldtype, builtera):
+    return BEMDef(
+        building=_building(), mass=_mass(), wall=_wall(),
+        roof=_wall(horizontal=True, name='wood_frame_roof'), bldtype=bldtype,
+        builtera=builtera)
+
+
+def sample_material():
+    """Return the Material of material.json."""
+    return _insulation()
+
+
+def sample_element():
+    """Return the Element of element.json."""
+    return _wall()
+
+
+def sample_building():
+    """Return the Building of building.json."""
+    return _building()
+
+
+def sample_schdef():
+    """Return the SchDef of schdef.json."""
+    return _schdef('largeoffice', 'new')
+
+
+def sample_bemdef():
+    """Return the BEMDef of bemdef.json."""
+    return _bemdef('largeoffice', 'new')
+
+
+def sample_uwg():
+    """Return the UWG of uwg.json."""
+    return UWG(bldheight=10.0, blddensity=0.5, vertohor=0.5, zone='1A',
+               treecover=0.1, grasscover=0.1, h_mix=1)
+
+
+def sample_custom_uwg():
+    """Return the UWG of custom_uwg.json with custom BEMDef and SchDef objects.
+
+    The largeoffice definitions override the reference and the customhospital
+    definitions extend them.
+    """
+    return UWG(
+        bldheight=10.0, blddensity=0.5, vertohor=0.5, zone='1A', treecover=0.1,
+        grasscover=0.1, h_mix=1,
+        bld=[('largeoffice', 'new', 0.4), ('hospital', 'new', 0.5),
+             ('customhospital', 'new', 0.1)],
+        ref_bem_vector=[_bemdef('largeoffice', 'new'),
+                        _bemdef('customhospital', 'new')],
+        ref_sch_vector=[_schdef('largeoffice', 'new'),
+                        _schdef('customhospital', 'new', 0.35)])
+
+
+SAMPLES = OrderedDict((
+    ('material', sample_material),
+    ('element', sample_element),
+    ('building', sample_building),
+    ('schdef', sample_schdef),
+    ('bemdef', sample_bemdef),
+    ('uwg', sample_uwg),
+    ('custom_uwg', sample_custom_uwg)
+))
+
+
+def sample_dict(model):
+    """Return the dictionary of a sample model in the format of the samples folder.
+
+    The version and the unset reference vectors of UWG models are left out.
+    """
+    data = model.dict()
+    if isinstance(model, UWG):
+        del data['version']
+        for name in ('ref_sch_vector', 'ref_bem_vector'):
+            if data[name] is None:
+                del data[name]
+    return data
+
+
+def _sample(name):
+    return name, sample_dict(SAMPLES[name]())
+
+
+def build_samples(names=None, processes=None):
+    """Return an OrderedDict with the dictionary of each sample.
+
+    Args:
+        names: Optional list of SAMPLES names. Defaults to all of them.
+        processes: Optional number of worker processes. The samples are built in
+            this process if it is 1. Defaults to the number of CPUs.
+    """
+    names = list(SAMPLES) if names is None else list(names)
+    return OrderedDict(_map(_sample, names, processes))
+
+
+def write_samples(directory, names=None, processes=None):
+    """Write the samples to name.json files in a directory.
+
+    Returns:
+        A list of the written file paths.
+    """
+    paths = []
+    for name, data in build_samples(names, processes).items():
+        path = os.path.join(directory, '{}.json'.format(name))
+        with open(path, 'w') as fp:
+            json.dump(data, fp, indent=4)
+        paths.append(path)
+    return paths
+
+
+def _ramp(rise, fall, low, high):
+    """Return 24 hourly values that are high from hour rise to hour fall."""
+    return [high if rise <= hour < fall else low for hour in range(24)]
+
+
+def synthetic_definitions(zone, bldtype, builtera):
+    """Return a made-up (BEMDef, SchDef) fixture for a zone, bldtype and builtera.
+
+    The same arguments always return equal definitions. Colder zones and newer
+    eras have more wall and roof insulation and a lower window u_value, and each
+    building type has its own floor height, glazing, loads and operating hours.
+    """
+    z = REF_ZONETYPE.index(zone)
+    e = REF_BUILTERA.index(builtera)
+    t = REF_BLDTYPE.index(bldtype)
+    insulation = round(0.01 + 0.005 * z + 0.01 * e, 4)
+    building = _building(
+        floor_height=3.0 + 0.5 * (t % 3), glazing_ratio=round(0.2 + 0.02 * (t % 8), 2),
+        u_value=round(5.8 - 0.15 * z - 0.8 * e, 2), shgc=round(0.25 + 0.01 * z, 2),
+        infil=round(0.3 - 0.05 * e, 2), cop=round(2.5 + 0.5 * e, 1),
+        int_heat_day=1 + t % 4, int_heat_night=1 + t % 2)
+    bemdef = BEMDef(
+        building=building, mass=_mass(), wall=_wall(insulation),
+        roof=_wall(insulation, horizontal=True, name='wood_frame_roof'),
+        bldtype=bldtype, builtera=builtera)
+
+    rise, fall = 6 + t % 4, 17 + t % 5
+    occ = [_ramp(rise, fall, 0.05, 0.95), _ramp(rise + 2, fall - 3, 0.05, 0.4),
+           _ramp(rise + 3, fall - 5, 0.05, 0.2)]
+    equip = [[round(0.3 + 0.7 * v, 3) for v in day] for day in occ]
+    hvac = [_ramp(rise - 1, fall + 1, 0.0, 1.0), _ramp(rise + 1, fall - 2, 0.0, 1.0),
+            _ramp(rise + 3, fall - 5, 0.0, 1.0)]
+    schdef = SchDef(
+        elec=equip, gas=equip, light=equip, occ=occ, cool=hvac, heat=hvac, swh=occ,
+        q_elec=round(5 + 1.5 * t, 2), q_gas=round(0.5 * (t % 5), 2),
+        q_light=round(6 + 0.5 * t, 2), n_occ=round(0.02 + 0.01 * (t % 6), 2),
+        vent=round(0.0005 + 0.0001 * (t % 7), 4), v_swh=round(0.05 * (t % 4), 2),
+        bldtype=bldtype, builtera=builtera)
+    return bemdef, schdef
+
+
+def synthetic_keys():
+    """Return the list of all (zone, bldtype, builtera) synthetic keys in order."""
+    return [(zone, bldtype, builtera) for zone in REF_ZONETYPE
+            for bldtype in REF_BLDTYPE for builtera in REF_BUILTERA]
+
+
+def _synthetic(key):
+    bemdef, schdef = synthetic_definitions(*key)
+    return key, (bemdef.dict(), schdef.dict())
+
+
+def build_synthetic_set(keys=None, processes=None, chunksize=32):
+    """Build the dictionaries of the synthetic definitions in parallel.
+
+    Args:
+        keys: Optional list of (zone, bldtype, builtera) keys. Defaults to all of
+            the 864 synthetic_keys.
+        processes: Optional number of worker processes. The definitions are built
+            in this process if it is 1. Defaults to the number of CPUs.
+        chunksize: Number of keys that are sent to a worker at once. (Default: 32).
+
+    Returns:
+        An OrderedDict with a (BEMDef dictionary, SchDef dictionary) tuple for each
+        key, in the order of keys.
+    """
+    keys = synthetic_keys() if keys is None else list(keys)
+    return OrderedDict(_map(_synthetic, keys, processes, chunksize))
+
+
+def write_synthetic_set(directory, processes=None):
+    """Write the synthetic set to one synthetic_<zone>.json file per zone.
+
+    Each file has a ref_bem_vector and a ref_sch_vector list with the definitions
+    of every bldtype and builtera for the zone.
+
+    Returns:
+        A list of the written file paths.
+    """
+    zones = OrderedDict((zone, ([], [])) for zone in REF_ZONETYPE)
+    for (zone, _, _), (bem, sch) in build_synthetic_set(processes=processes).items():
+        zones[zone][0].append(bem)
+        zones[zone][1].append(sch)
+    paths = []
+    for zone, (bems, schs) in zones.items():
+        path = os.path.join(directory, 'synthetic_{}.json'.format(zone))
+        with open(path, 'w') as fp:
+            json.dump({'ref_bem_vector': bems, 'ref_sch_vector': schs}, fp)
+        paths.append(path)
+    return paths
+
+
+def _map(func, items, processes=None, chunksize=1):
+    """Map a function over items in a process pool and keep the order of items."""
+    if processes == 1 or len(items) < 2:
+        return [func(item) for item in items]
+    with ProcessPoolExecutor(processes) as executor:
+        return list(executor.map(func, items, chunksize=chunksize))
@@ -0,0 +1,444 @@
+"""Local asyncio HTTP service that validates UWG schema payloads.
+
+The service lets several processes share one set of warm worker processes instead of
+each importing and building the models. It only uses the standard library and can
+listen on a TCP port or a Unix socket.
+
+Endpoints:
+    POST /validate/UWG, /validate/BEMDef, /validate/SchDef: Validate a JSON body.
+        Returns {"valid": true} or {"valid": false, "errors": [...]} where each
+        error has a JSON pointer to the invalid value (see report.error_list).
+    GET /openapi: The OpenAPI document for the UWG schema.
+    GET /metrics: Request, batch, latency and throughput metrics and the number of
+        pending and queued requests.
+
+Requests that arrive together are validated as one batch in a worker process. When
+the number of queued requests reaches max_pending, new requests are rejected with
+status 503 until the queue drains. Malformed requests get status 400 and requests
+that fail in the server or in a worker get status 500, always with a JSON body that
+has an error message.
+
+Start a server from the command line with::
+
+    python -m uwg_schema.server --port 8000
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from pydantic import ValidationError
+
+from ._openapi import get_uwg_openapi
+from .model import UWG
+from .ref_bld_template import BEMDef, SchDef
+from .report import error_list
+
+MODELS = {'UWG': UWG, 'BEMDef': BEMDef, 'SchDef': SchDef}
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found',
+            405: 'Method Not Allowed', 413: 'Payload Too Large',
+            500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+
+def validate_batch(items):
+    """Validate a list of (model name, raw JSON bytes) items.
+
+    This is the function that runs in the worker processes.
+    """
+    results = []
+    for name, raw in items:
+        try:
+            MODELS[name].parse_raw(raw)
+        except ValidationError as error:
+            results.append({'valid': False, 'errors': error_list(error)})
+        else:
+            results.append({'valid': True})
+    return results
+
+
+class Metrics(object):
+    """Counters and recent latencies of a ValidationServer.
+
+    Args:
+        window: Number of recent request latencies kept for the percentiles.
+    """
+
+    def __init__(self, window=10000):
+        self.started = time.monotonic()
+        self.requests = 0
+        self.valid = 0
+        self.invalid = 0
+        self.rejected = 0
+        self.batches = 0
+        self.batched_items = 0
+        self.latencies = deque(maxlen=window)
+
+    def record(self, result, latency):
+        self.requests += 1
+        if result['valid']:
+            self.valid += 1
+        else:
+            self.invalid += 1
+        self.latencies.append(latency)
+
+    def to_dict(self):
+        """Return the metrics as a dictionary. Latencies are in milliseconds."""
+        uptime = time.monotonic() - self.started
+        latencies = sorted(self.latencies)
+
+        def percentile(p):
+            if not latencies:
+                return None
+            return 1000 * latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+        return {
+            'uptime': uptime,
+            'requests': self.requests,
+            'valid': self.valid,
+            'invalid': self.invalid,
+            'rejected': self.rejected,
+            'batches': self.batches,
+            'mean_batch_size':
+                self.batched_items / self.batches if self.batches else None,
+            'throughput': self.requests / uptime if uptime else None,
+            'latency_p50': percentile(0.5),
+            'latency_p95': percentile(0.95),
+            'latency_p99': percentile(0.99),
+        }
+
+
+class ValidationServer(object):
+    """Asyncio HTTP server that validates payloads in a process pool.
+
+    Args:
+        host: Host name for a TCP server. (Default: 127.0.0.1).
+        port: Port for a TCP server. Use 0 to pick a free port. (Default: 0).
+        path: Optional path to a Unix socket. If set, host and port are ignored.
+        workers: Number of worker processes when no executor is given.
+        executor: Optional concurrent.futures executor used instead of a new
+            ProcessPoolExecutor. The executor is not shut down by the server.
+        max_batch: Maximum number of payloads validated in one batch. (Default: 64).
+        batch_window: Seconds to wait for more requests to join a batch after the
+            first one arrives. (Default: 0.002).
+        max_pending: Maximum number of queued requests before new ones are
+            rejected with status 503. (Default: 1024).
+        max_body: Maximum request body size in bytes. (Default: 64 MB).
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, path=None, workers=None,
+                 executor=None, max_batch=64, batch_window=0.002, max_pending=1024,
+                 max_body=64 * 1024 * 1024):
+        self.host = host
+        self.port = port
+        self.path = path
+        self.workers = workers
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self.max_pending = max_pending
+        self.max_body = max_body
+        self.metrics = Metrics()
+        self._executor = executor
+        self._own_executor = executor is None
+        self._server = None
+        self._queue = None
+        self._batcher = None
+        self._batches = set()
+        self._slots = None
+        self._openapi = None
+        self._pending = 0
+
+    @property
+    def address(self):
+        """The Unix socket path or the (host, port) that the server listens on."""
+        if self.path:
+            return self.path
+        return self._server.sockets[0].getsockname()[:2]
+
+    @property
+    def pending(self):
+        """Number of accepted requests that do not have a result yet."""
+        return self._pending
+
+    @property
+    def queued(self):
+        """Number of accepted requests that are waiting to join a batch."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self):
+        """Start listening and validating."""
+        if self._own_executor:
+            self._executor = ProcessPoolExecutor(self.workers)
+        workers = getattr(self._executor, '_max_workers', None) or 1
+        self._queue = asyncio.Queue(self.max_pending)
+        self._slots = asyncio.Semaphore(workers)
+        self._batcher = asyncio.ensure_future(self._batch_loop())
+        if self.path:
+            self._server = await asyncio.start_unix_server(self._handle, path=self.path)
+        else:
+            self._server = await asyncio.start_server(
+                self._handle, self.host, self.port)
+        return self
+
+    async def stop(self):
+        """Stop listening, wait for the running batches and shut down the workers."""
+        self._server.close()
+        await self._server.wait_closed()
+        self._batcher.cancel()
+        try:
+            await self._batcher
+        except asyncio.CancelledError:
+            pass
+        if self._batches:
+            await asyncio.gather(*self._batches, return_exceptions=True)
+        if self._own_executor:
+            self._executor.shutdown()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *args):
+        await self.stop()
+
+    async def validate(self, name, raw):
+        """Queue a payload for validation and return the result dictionary.
+
+        Raises:
+            asyncio.QueueFull: If max_pending requests are already queued.
+            Exception: The error of the worker if the batch of the payload failed.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((name, raw, future))
+        self._pending += 1
+        try:
+            return await future
+        finally:
+            self._pending -= 1
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._slots.acquire()
+            task = asyncio.ensure_future(self._run_batch(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _run_batch(self, batch):
+        loop = asyncio.get_running_loop()
+        self.metrics.batches += 1
+        self.metrics.batched_items += len(batch)
+        try:
+            items = [(name, raw) for name, raw, _ in batch]
+            results = await loop.run_in_executor(self._executor, validate_batch, items)
+        except Exception as error:  # the worker died or the batch could not be sent
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+        else:
+            for (_, _, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self._slots.release()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request = await _read_request(reader, self.max_body)
+                if request is None:
+                    break
+                method, target, body, keep_alive = request
+                status, payload = await self._route(method, target, body)
+                _write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except _HTTPError as error:
+            _write_response(writer, error.status, {'error': str(error)}, False)
+        except asyncio.CancelledError:  # an Exception before Python 3.8
+            raise
+        except Exception as error:  # a bug in the server must not drop the response
+            _write_response(writer, 500, {'error': 'Internal server error: {}'.format(
+                error)}, False)
+        finally:
+            writer.close()
+
+    async def _route(self, method, target, body):
+        if target == '/openapi' or target == '/metrics':
+            if method != 'GET':
+                return 405, {'error': 'Use GET for {}.'.format(target)}
+            if target == '/metrics':
+                return 200, dict(self.metrics.to_dict(), pending=self.pending,
+                                 queued=self.queued)
+            if self._openapi is None:
+                self._openapi = get_uwg_openapi(_version())
+            return 200, self._openapi
+        if target.startswith('/validate/'):
+            name = target[len('/validate/'):]
+            if name not in MODELS:
+                return 404, {'error': 'Unknown model {}. Choose from {}.'.format(
+                    name, ', '.join(MODELS))}
+            if method != 'POST':
+                return 405, {'error': 'Use POST for {}.'.format(target)}
+            start = time.monotonic()
+            try:
+                result = await self.validate(name, body)
+            except asyncio.QueueFull:
+                self.metrics.rejected += 1
+                return 503, {'error': 'The validation queue is full. Retry later.'}
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:  # the batch failed in the worker
+                return 500, {'error': 'The validation failed: {}'.format(error)}
+            self.metrics.record(result, time.monotonic() - start)
+            return 200, result
+        return 404, {'error': 'Not found: {}'.format(target)}
+
+
+class _HTTPError(Exception):
+
+    def __init__(self, status, message):
+        Exception.__init__(self, message)
+        self.status = status
+
+
+async def _read_request(reader, max_body):
+    """Read one HTTP/1.1 request and return (method, target, body, keep_alive)."""
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, version = line.decode('latin-1').split()
+    except ValueError:
+        raise _HTTPError(400, 'Malformed request line.')
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        key, _, value = line.decode('latin-1').partition(':')
+        headers[key.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get('content-length', 0))
+    except ValueError:
+        length = -1
+    if length < 0:
+        raise _HTTPError(400, 'The Content-Length must be a non-negative integer.')
+    if length > max_body:
+        raise _HTTPError(413, 'The request body is larger than {} bytes.'.format(
+            max_body))
+    body = await reader.readexactly(length) if length else b''
+    connection = headers.get('connection', '').lower()
+    keep_alive = connection != 'close' if version == 'HTTP/1.1' \
+        else connection == 'keep-alive'
+    return method, target, body, keep_alive
+
+
+def _write_response(writer, status, payload, keep_alive):
+    body = json.dumps(payload).encode('utf-8')
+    head = 'HTTP/1.1 {} {}\r\nContent-Type: application/json\r\n' \
+        'Content-Length: {}\r\nConnection: {}\r\n\r\n'.format(
+            status, _REASONS.get(status, ''), len(body),
+            'keep-alive' if keep_alive else 'close')
+    writer.write(head.encode('latin-1') + body)
+
+
+def _version():
+    try:
+        from pkg_resources import get_distribution
+        return '.'.join(get_distribution('uwg_schema').version.split('.')[:3])
+    except Exception:  # not installed as a distribution
+        return '0.0.0'
+
+
+class ValidationClient(object):
+    """Minimal keep-alive client for a ValidationServer.
+
+    Args:
+        address: A (host, port) tuple or the path to a Unix socket.
+    """
+
+    def __init__(self, address):
+        self.address = address
+        self._reader = None
+        self._writer = None
+
+    async def request(self, method, target, body=None):
+        """Send a request and return the (status, decoded JSON body)."""
+        if self._writer is None:
+            if isinstance(self.address, str):
+                self._reader, self._writer = \
+                    await asyncio.open_unix_connection(self.address)
+            else:
+                self._reader, self._writer = \
+                    await asyncio.open_connection(*self.address)
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        body = body or b''
+        head = '{} {} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {}\r\n\r\n' \
+            .format(method, target, len(body))
+        self._writer.write(head.encode('latin-1') + body)
+        await self._writer.drain()
+        status = int((await self._reader.readline()).split()[1])
+        headers = {}
+        while True:
+            line = await self._reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            key, _, value = line.decode('latin-1').partition(':')
+            headers[key.strip().lower()] = value.strip()
+        data = await self._reader.readexactly(int(headers['content-length']))
+        if headers.get('connection') == 'close':
+            await self.close()
+        return status, json.loads(data)
+
+    async def validate(self, name, body):
+        """Validate a JSON payload against a model name and return the result."""
+        return await self.request('POST', '/validate/{}'.format(name), body)
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._reader = self._writer = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a UWG schema validation server.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--unix', help='Path to a Unix socket to listen on.')
+    parser.add_argument('--workers', type=int, help='Number of worker processes.')
+    parser.add_argument('--max-batch', type=int, default=64)
+    parser.add_argument('--max-pending', type=int, default=1024)
+    args = parser.parse_args()
+
+    async def serve():
+        server = ValidationServer(
+            args.host, args.port, args.unix, args.workers, max_batch=args.max_batch,
+            max_pending=args.max_pending)
+        async with server:
+            print('Validating on {}'.format(server.address))
+            await asyncio.Event().wait()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,249 @@
+"""Editable model sessions that re-validate only what an assignment can affect.
+
+A session keeps the validated field values of a model. Assigning a field validates
+that field and then runs only the cross-field rules and validators that depend on
+it. Several assignments can be grouped in a transaction that is validated once when
+it is committed and is rolled back as a whole if it is invalid.
+
+.. code-block:: python
+
+    session = ValidationSession(model, UWG_RULES)
+    session.bldheight = 25  # validates bldheight only
+    with session.transaction():
+        session.grasscover = 0.6
+        session.treecover = 0.3  # the cover rule runs once, on commit
+    model = session.model
+
+Rules are opt-in. Without them a session accepts exactly the values that the model
+accepts. UWG_RULES adds checks that UWG.parse_obj does not make, so a session with
+them can reject a model that the schema considers valid.
+"""
+import inspect
+from contextlib import contextmanager
+
+from pydantic import ValidationError
+from pydantic.error_wrappers import ErrorWrapper
+
+from .bldtypes import BUILDING_TYPES
+from .templates import reference_key
+
+
+class Rule(object):
+    """A consistency check that combines several fields of a model.
+
+    Args:
+        name: Text to identify the rule.
+        fields: A tuple of the field names that the rule reads.
+        check: A function that takes a dictionary of field values and raises a
+            ValueError or AssertionError if the values are inconsistent.
+    """
+    __slots__ = ('name', 'fields', 'check')
+
+    def __init__(self, name, fields, check):
+        self.name = name
+        self.fields = tuple(fields)
+        self.check = check
+
+    def __repr__(self):
+        return 'Rule({}, {})'.format(self.name, self.fields)
+
+
+def check_cover(values):
+    """Ensure the urban grass and tree cover fractions do not overlap."""
+    total = values['grasscover'] + values['treecover']
+    assert total <= 1 + 1e-10, 'The sum of grasscover and treecover must not be ' \
+        'greater than one. Got: {}.'.format(total)
+
+
+def check_bld_refs(values):
+    """Ensure custom bld types have a BEMDef and SchDef in the reference vectors.
+
+    Custom types with definitions registered in BUILDING_TYPES do not need them.
+    Like UWG.check_bld, the bldtype and builtera are matched in any case.
+    """
+    bem_keys = {reference_key(r.bldtype, r.builtera)
+                for r in values['ref_bem_vector'] or ()}
+    sch_keys = {reference_key(r.bldtype, r.builtera)
+                for r in values['ref_sch_vector'] or ()}
+    for bldtype, builtera, _ in values['bld']:
+        key = reference_key(bldtype, builtera)
+        if BUILDING_TYPES.is_reference(key[0]) or BUILDING_TYPES.has_definitions(*key):
+            continue
+        assert key in bem_keys and key in sch_keys, 'The custom building type {} ' \
+            'in bld must have a BEMDef in ref_bem_vector and a SchDef in ' \
+            'ref_sch_vector with the same bldtype and builtera.'.format(
+                [bldtype, builtera])
+
+
+UWG_RULES = (
+    Rule('cover', ('grasscover', 'treecover'), check_cover),
+    Rule('bld_refs', ('bld', 'ref_bem_vector', 'ref_sch_vector'), check_bld_refs),
+)
+
+
+class ValidationSession(object):
+    """Mutable view of a validated model with incremental re-validation.
+
+    Args:
+        model: A validated pydantic model. The model itself is never changed.
+        rules: An optional list of Rule objects to check on top of the validators
+            of the model, such as UWG_RULES. (Default: ()).
+    """
+
+    def __init__(self, model, rules=()):
+        cls = type(model)
+        _set = object.__setattr__
+        _set(self, '_cls', cls)
+        _set(self, '_rules', tuple(rules))
+        _set(self, '_values', dict(model.__dict__))
+        _set(self, '_fields_set', set(model.__fields_set__))
+        _set(self, '_dependents', _dependents(cls, rules))
+        _set(self, '_pending', None)
+        _set(self, '_model', model)
+        _set(self, 'last_checked', ())
+        errors = self._check_rules(self._values, self._rules)
+        if errors:
+            raise ValidationError(errors, cls)
+
+    @property
+    def model(self):
+        """The validated model for the current values.
+
+        The model is only rebuilt after a change and is not validated again.
+        """
+        if self._model is None:
+            fields_set = set(self._fields_set)
+            model = self._cls.construct(_fields_set=fields_set, **self._values)
+            object.__setattr__(self, '_model', model)
+        return self._model
+
+    def set(self, name, value):
+        """Assign a field value.
+
+        Outside a transaction the value is validated immediately along with every
+        rule that depends on the field. Inside a transaction validation is deferred
+        until the transaction is committed.
+        """
+        if name not in self._cls.__fields__:
+            raise AttributeError(
+                '{} has no field {}.'.format(self._cls.__name__, name))
+        if self._pending is not None:
+            self._pending[name] = value
+        else:
+            self._commit({name: value})
+
+    def update(self, **values):
+        """Assign several field values and validate them in one pass."""
+        with self.transaction():
+            for name, value in values.items():
+                self.set(name, value)
+
+    @contextmanager
+    def transaction(self):
+        """Group assignments so that they are validated once on exit.
+
+        If the block raises or the assignments are invalid, none of them are applied.
+        Nested transactions join the outermost one.
+        """
+        if self._pending is not None:
+            yield self
+            return
+        object.__setattr__(self, '_pending', {})
+        try:
+            yield self
+            pending = self._pending
+        finally:
+            object.__setattr__(self, '_pending', None)
+        self._commit(pending)
+
+    def __getattr__(self, name):
+        try:
+            values = object.__getattribute__(self, '_values')
+        except AttributeError:
+            raise AttributeError(name)
+        pending = object.__getattribute__(self, '_pending')
+        if pending and name in pending:
+            return pending[name]
+        try:
+            return values[name]
+        except KeyError:
+            raise AttributeError(
+                '{} has no field {}.'.format(self._cls.__name__, name))
+
+    def __setattr__(self, name, value):
+        self.set(name, value)
+
+    def _commit(self, changes):
+        if not changes:
+            return
+        cls = self._cls
+        values = dict(self._values)
+        errors = []
+        checked = []
+        # validate in field order so that validators can read earlier values
+        names = [n for n in cls.__fields__ if n in changes]
+        affected = set(names)
+        for name in names:
+            affected.update(self._dependents[name]['fields'])
+        for name in [n for n in cls.__fields__ if n in affected]:
+            field = cls.__fields__[name]
+            raw = changes.get(name, values[name])
+            value, error = field.validate(raw, values, loc=name, cls=cls)
+            checked.append(name)
+            if error:
+                errors.append(error)
+            else:
+                values[name] = value
+        rules = []
+        for name in names:
+            for rule in self._dependents[name]['rules']:
+                if rule not in rules:
+                    rules.append(rule)
+        if not errors:
+            errors.extend(self._check_rules(values, rules))
+            checked.extend(r.name for r in rules)
+            if cls.__post_root_validators__:
+                try:
+                    for _, validator in cls.__post_root_validators__:
+                        values = validator(cls, values)
+                except (ValueError, TypeError, AssertionError) as exc:
+                    errors.append(ErrorWrapper(exc, loc='__root__'))
+                checked.append('__root__')
+        object.__setattr__(self, 'last_checked', tuple(checked))
+        if errors:
+            raise ValidationError(errors, cls)
+        object.__setattr__(self, '_values', values)
+        self._fields_set.update(names)
+        object.__setattr__(self, '_model', None)
+
+    @staticmethod
+    def _check_rules(values, rules):
+        errors = []
+        for rule in rules:
+            try:
+                rule.check(values)
+            except (ValueError, TypeError, AssertionError) as exc:
+                errors.append(ErrorWrapper(exc, loc=('__root__', rule.name)))
+        return errors
+
+
+def _dependents(cls, rules):
+    """Map each field to the fields and rules that must be re-checked when it changes.
+
+    A field whose validators read the values argument depends on every field
+    declared before it.
+    """
+    names = list(cls.__fields__)
+    dependents = {name: {'fields': set(), 'rules': []} for name in names}
+    for i, name in enumerate(names):
+        field = cls.__fields__[name]
+        validators = (field.class_validators or {}).values()
+        # the first two arguments of a validator are the class and the field value
+        if any('values' in list(inspect.signature(v.func).parameters)[2:]
+               for v in validators):
+            for earlier in names[:i]:
+                dependents[earlier]['fields'].add(name)
+    for rule in rules:
+        for name in rule.fields:
+            dependents[name]['rules'].append(rule)
+    return dependents
@@ -0,0 +1,193 @@
+"""Building stock averages weighted by the fractions of the bld array.
+
+Each row of the bld array of a UWG model refers to a BEMDef and a SchDef with a
+fraction of the urban building stock. stock_averages resolves the rows of a batch of
+models and computes the fraction-weighted building parameters, element properties,
+peak loads and 3 x 24 schedules of every model in one pass with NumPy:
+
+.. code-block:: python
+
+    averages = stock_averages(models)
+    averages.bem['u_value']  # array of shape (N,)
+    averages.bem['wall_heat_capacity']  # J/m2-K of the wall layers
+    averages.schedules['occ']  # array of shape (N, 3, 24)
+    averages.item(0)  # plain dictionaries for the first model
+
+    model.stock_average()  # the same dictionaries for a single model
+
+The bld fractions of a validated model sum to one so the weighted sums are averages.
+The UWG fields that replace a value for every building (flr_h, glzr, shgc, albroof,
+albwall and vegroof) replace the matching average when they are not None.
+
+NumPy is an optional dependency of uwg-schema and is only imported when one of these
+functions is called.
+"""
+from .arrays import _numpy
+from .ref_bld_template import Building
+from .templates import resolve_references
+
+# numeric Building fields in the order of the bem averages
+BUILDING_PROPERTIES = tuple(name for name, field in Building.__fields__.items()
+                            if issubclass(field.type_, float))
+ELEMENTS = ('mass', 'wall', 'roof')
+# albedo, emissivity and vegcoverage of each element and properties of its layers:
+# the total thickness [m], the heat capacity [J/m2-K] and the thermal resistance
+# [m2-K/W]
+ELEMENT_PROPERTIES = ('albedo', 'emissivity', 'vegcoverage', 'thickness',
+                      'heat_capacity', 'resistance')
+BEM_PROPERTIES = BUILDING_PROPERTIES + tuple(
+    '{}_{}'.format(element, prop) for element in ELEMENTS
+    for prop in ELEMENT_PROPERTIES)
+LOAD_PROPERTIES = ('q_elec', 'q_gas', 'q_light', 'n_occ', 'vent', 'v_swh')
+SCHEDULES = ('elec', 'gas', 'light', 'occ', 'cool', 'heat', 'swh')
+# UWG fields that replace the bem property of every building when they are not None
+OVERRIDES = (
+    ('floor_height', 'flr_h'), ('glazing_ratio', 'glzr'), ('shgc', 'shgc'),
+    ('roof_albedo', 'albroof'), ('wall_albedo', 'albwall'),
+    ('roof_vegcoverage', 'vegroof')
+)
+
+
+def _bem_row(bemdef):
+    building = bemdef.building
+    row = [getattr(building, name) for name in BUILDING_PROPERTIES]
+    for element in (bemdef.mass, bemdef.wall, bemdef.roof):
+        layers = list(zip(element.layer_thickness_lst, element.material_lst))
+        row.extend((
+            element.albedo, element.emissivity, element.vegcoverage,
+            sum(t for t, _ in layers),
+            sum(t * m.volheat for t, m in layers),
+            sum(t / m.thermalcond for t, m in layers)
+        ))
+    return row
+
+
+def _sch_row(schdef):
+    row = [getattr(schdef, name) for name in LOAD_PROPERTIES]
+    for name in SCHEDULES:
+        for day in getattr(schdef, name):
+            row.extend(day)
+    return row
+
+
+class _Definitions(object):
+    """Table rows of the distinct definition objects of a batch."""
+
+    def __init__(self, to_row):
+        self._to_row = to_row
+        self._index = {}
+        self.rows = []
+
+    def index(self, definition):
+        try:
+            return self._index[id(definition)][1]
+        except KeyError:
+            i = len(self.rows)
+            self.rows.append(self._to_row(definition))
+            # keep the definition so that its id is not reused during the batch
+            self._index[id(definition)] = (definition, i)
+            return i
+
+
+def _weighted_sums(np, offsets, index, fractions, table, chunk_size):
+    """Sum the fraction-weighted table rows of each model, chunk_size models at once.
+    """
+    count = len(offsets) - 1
+    sums = np.empty((count, table.shape[1]), dtype='f8')
+    for start in range(0, count, chunk_size):
+        stop = min(start + chunk_size, count)
+        first, last = offsets[start], offsets[stop]
+        rows = table[index[first:last]] * fractions[first:last, None]
+        # every model has at least one bld row so the offsets are increasing
+        sums[start:stop] = np.add.reduceat(rows, offsets[start:stop] - first, axis=0)
+    return sums
+
+
+class StockAverages(object):
+    """Fraction-weighted averages of a batch of UWG models.
+
+    Args:
+        bem: A dictionary with an array of shape (N,) for each BEM_PROPERTIES name.
+        loads: A dictionary with an array of shape (N,) for each LOAD_PROPERTIES
+            name.
+        schedules: A dictionary with an array of shape (N, 3, 24) for each
+            SCHEDULES name.
+    """
+    __slots__ = ('bem', 'loads', 'schedules')
+
+    def __init__(self, bem, loads, schedules):
+        self.bem = bem
+        self.loads = loads
+        self.schedules = schedules
+
+    def __len__(self):
+        return len(self.bem[BEM_PROPERTIES[0]])
+
+    def item(self, index):
+        """Return the averages of one model as dictionaries of Python numbers.
+
+        The returned dictionary has a bem, a loads and a schedules key with the
+        same names as the attributes of this object.
+        """
+        return {
+            'bem': {k: v[index].item() for k, v in self.bem.items()},
+            'loads': {k: v[index].item() for k, v in self.loads.items()},
+            'schedules': {k: v[index].tolist() for k, v in self.schedules.items()}
+        }
+
+
+def stock_averages(models, cache=None, chunk_size=4096):
+    """Compute the fraction-weighted stock averages of a batch of UWG models.
+
+    Args:
+        models: A sequence of validated UWG models.
+        cache: Optional ReferenceCache for the DOE reference buildings. Defaults to
+            the shared REFERENCE_CACHE.
+        chunk_size: Number of models that are summed at once, which limits the
+            size of the intermediate arrays. (Default: 4096).
+
+    Returns:
+        A StockAverages.
+    """
+    np = _numpy()
+    bems, schs = _Definitions(_bem_row), _Definitions(_sch_row)
+    offsets, bem_index, sch_index, fractions = [0], [], [], []
+    for model in models:
+        for _, _, fraction, bemdef, schdef in resolve_references(model, cache):
+            bem_index.append(bems.index(bemdef))
+            sch_index.append(schs.index(schdef))
+            fractions.append(fraction)
+        offsets.append(len(fractions))
+    offsets = np.array(offsets, dtype='i8')
+    fractions = np.array(fractions, dtype='f8')
+    bem_table = np.array(bems.rows, dtype='f8').reshape(-1, len(BEM_PROPERTIES))
+    sch_table = np.array(schs.rows, dtype='f8').reshape(
+        -1, len(LOAD_PROPERTIES) + 72 * len(SCHEDULES))
+    bem = _weighted_sums(np, offsets, np.array(bem_index, dtype='i8'), fractions,
+                         bem_table, chunk_size)
+    sch = _weighted_sums(np, offsets, np.array(sch_index, dtype='i8'), fractions,
+                         sch_table, chunk_size)
+
+    bem = {name: bem[:, j] for j, name in enumerate(BEM_PROPERTIES)}
+    for name, field in OVERRIDES:
+        # None becomes NaN in a float array
+        values = np.array([getattr(m, field) for m in models], dtype='f8')
+        bem[name] = np.where(np.isnan(values), bem[name], values)
+    loads = {name: sch[:, j] for j, name in enumerate(LOAD_PROPERTIES)}
+    schedules = sch[:, len(LOAD_PROPERTIES):].reshape(len(sch), len(SCHEDULES), 3, 24)
+    schedules = {name: schedules[:, j] for j, name in enumerate(SCHEDULES)}
+    return StockAverages(bem, loads, schedules)
+
+
+def stock_average(model, cache=None):
+    """Return the fraction-weighted stock averages of a single UWG model.
+
+    Args:
+        model: A validated UWG model.
+        cache: Optional ReferenceCache for the DOE reference buildings.
+
+    Returns:
+        A dictionary with a bem, a loads and a schedules dictionary (see
+        StockAverages.item).
+    """
+    return stock_averages([model], cache).item(0)
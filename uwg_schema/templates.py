@@ -0,0 +1,135 @@
+"""Process-wide cache of zone-specific reference building definitions.
+
+The DOE reference buildings have construction and HVAC parameters that depend on the
+UWG climate zone. The definitions themselves are not part of this schema package, so
+they come from a builder function that is registered once per process::
+
+    def builder(zone, bldtype, builtera):
+        ...  # return a (BEMDef, SchDef) tuple of models or dictionaries
+
+    set_reference_builder(builder)
+    bemdef, schdef = get_reference('4A', 'largeoffice', 'pst80')
+
+Each (zone, bldtype, builtera) definition is built and validated once and then
+shared by every UWG model in the process until it is evicted. The bldtype and
+builtera of the keys are lower case, like the bld rows that UWG.check_bld accepts
+in any case.
+"""
+from ._cache import LRUCache
+from .bldtypes import BUILDING_TYPES, REF_BUILTERA, REF_BUILTERA_SET
+from .model import REF_ZONETYPE, REF_ZONETYPE_SET
+from .ref_bld_template import BEMDef, SchDef
+
+
+def reference_key(bldtype, builtera):
+    """Return the lower case (bldtype, builtera) key of a definition or a bld row."""
+    return bldtype.lower(), builtera.lower()
+
+
+class ReferenceCache(object):
+    """Least recently used cache of validated (BEMDef, SchDef) reference pairs.
+
+    Args:
+        builder: A function that takes a zone, a bldtype and a builtera and returns
+            a (BEMDef, SchDef) tuple. Items can be models or dictionaries.
+        maxsize: Maximum number of cached (zone, bldtype, builtera) definitions.
+            (Default: 864, which is 16 DOE types x 3 eras x 18 zones).
+    """
+
+    def __init__(self, builder=None, maxsize=864):
+        self.builder = builder
+        self._cache = LRUCache(maxsize)
+
+    def get(self, zone, bldtype, builtera):
+        """Return the validated (BEMDef, SchDef) for a zone, bldtype and builtera."""
+        bldtype, builtera = reference_key(bldtype, builtera)
+        key = (zone, bldtype, builtera)
+        value = self._cache.get(key)
+        if value is None:
+            value = self._build(zone, bldtype, builtera)
+            self._cache.put(key, value)
+        return value
+
+    def info(self):
+        """Return a CacheInfo with hits, misses, evictions and the current size."""
+        return self._cache.info()
+
+    def clear(self):
+        """Remove every cached definition and reset the counters."""
+        self._cache.clear()
+
+    def _build(self, zone, bldtype, builtera):
+        assert zone in REF_ZONETYPE_SET, \
+            'The zone must be one of {}. Got: {}.'.format(REF_ZONETYPE, zone)
+        assert builtera in REF_BUILTERA_SET, \
+            'The builtera must be one of {}. Got: {}.'.format(REF_BUILTERA, builtera)
+        if self.builder is None:
+            raise LookupError(
+                'No reference builder is registered to create the {} {} definitions '
+                'for zone {}. Register one with set_reference_builder.'.format(
+                    bldtype, builtera, zone))
+        bemdef, schdef = self.builder(zone, bldtype, builtera)
+        if not isinstance(bemdef, BEMDef):
+            bemdef = BEMDef.parse_obj(bemdef)
+        if not isinstance(schdef, SchDef):
+            schdef = SchDef.parse_obj(schdef)
+        for ref in (bemdef, schdef):
+            assert reference_key(ref.bldtype, ref.builtera) == (bldtype, builtera), \
+                'The reference builder returned a {} for ({}, {}) when ({}, {}) was ' \
+                'requested.'.format(type(ref).__name__, ref.bldtype, ref.builtera,
+                                    bldtype, builtera)
+        return bemdef, schdef
+
+
+# cache shared by every UWG model in the process
+REFERENCE_CACHE = ReferenceCache()
+
+
+def set_reference_builder(builder):
+    """Register the function that builds the shared reference definitions.
+
+    Changing the builder clears the shared cache.
+    """
+    REFERENCE_CACHE.builder = builder
+    REFERENCE_CACHE.clear()
+
+
+def get_reference(zone, bldtype, builtera):
+    """Return the shared validated (BEMDef, SchDef) for a zone, bldtype and builtera."""
+    return REFERENCE_CACHE.get(zone, bldtype, builtera)
+
+
+def resolve_references(model, cache=None):
+    """Return the definitions for every row of the bld array of a UWG model.
+
+    Custom definitions in ref_bem_vector and ref_sch_vector take precedence over the
+    definitions registered in BUILDING_TYPES and over the cached reference
+    definitions for the zone of the model. The bldtype and builtera of the bld rows
+    and of the definitions are matched in any case.
+
+    Args:
+        model: A validated UWG model.
+        cache: Optional ReferenceCache. Defaults to the shared REFERENCE_CACHE.
+
+    Returns:
+        A list with a (bldtype, builtera, fraction, BEMDef, SchDef) tuple for
+        each row of model.bld.
+    """
+    cache = REFERENCE_CACHE if cache is None else cache
+    bems = {reference_key(r.bldtype, r.builtera): r for r in model.ref_bem_vector or ()}
+    schs = {reference_key(r.bldtype, r.builtera): r for r in model.ref_sch_vector or ()}
+    resolved = []
+    for bldtype, builtera, fraction in model.bld:
+        key = reference_key(bldtype, builtera)
+        if key in bems and key in schs:
+            bemdef, schdef = bems[key], schs[key]
+        elif BUILDING_TYPES.has_definitions(*key):
+            bemdef, schdef = BUILDING_TYPES.definitions(*key)
+            bemdef = bems.get(key, bemdef)
+            schdef = schs.get(key, schdef)
+        else:
+            bemdef, schdef = cache.get(model.zone, *key)
+            bemdef = bems.get(key, bemdef)
+            schdef = schs.get(key, schdef)
+        resolved.append((bldtype, builtera, fraction, bemdef, schdef))
+    return resolved
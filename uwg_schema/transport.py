@@ -0,0 +1,265 @@
+"""Fast transfer of validated models to worker processes.
+
+Schedules and layer thickness lists make up most of a pickled UWG model and are
+pickled float by float. The helpers in this module move every list of floats of a
+model into one contiguous float64 buffer and pickle the rest of the model without
+them. The workers put the lists back into the unpickled models and get regular
+models without validating them again.
+
+pack wraps a model so that it pickles with the float buffer attached. With pickle
+protocol 5 the buffer can be sent out-of-band without any copy (see dumps and
+loads). SharedModels puts the buffers of a whole batch in one block of shared
+memory so that only small references are pickled per model. A worker attaches to
+the block while it rebuilds a model and closes it as soon as the floats are copied
+into the model, so the workers of a long-lived pool keep no mapping of the block.
+
+.. code-block:: python
+
+    with Pool(8) as pool:
+        results = pool.map(simulate, [pack(m) for m in models])
+
+    with SharedModels(models) as shared, Pool(8) as pool:
+        results = pool.map(simulate, shared.refs)
+
+In both cases simulate receives UWG models.
+"""
+import copy
+import pickle
+import threading
+from array import array
+
+from pydantic import BaseModel
+
+try:
+    from multiprocessing import resource_tracker, shared_memory
+except ImportError:  # Python < 3.8
+    shared_memory = None
+
+# serializes the replacement of resource_tracker.register in _attach
+_TRACKER_LOCK = threading.Lock()
+
+
+def _float_shape(value):
+    """Return the shape of a list or 2D list of floats or None for other values."""
+    if type(value) is not list or not value:
+        return None
+    if all(type(v) is float for v in value):
+        return (len(value),)
+    if all(type(v) is list for v in value):
+        width = len(value[0])
+        if width and all(len(v) == width and all(type(x) is float for x in v)
+                         for v in value):
+            return (len(value), width)
+    return None
+
+
+def _strip(value, data, path, holes):
+    """Return a copy of a value without its float lists.
+
+    The floats are appended to data and a (path, offset, shape) tuple is added to
+    holes for each removed list. Values without float lists are not copied.
+    """
+    shape = _float_shape(value)
+    if shape is not None:
+        holes.append((tuple(path), len(data), shape))
+        if len(shape) == 1:
+            data.extend(value)
+        else:
+            for row in value:
+                data.extend(row)
+        return None
+    if isinstance(value, BaseModel):
+        values = {}
+        for name, v in value.__dict__.items():
+            path.append(name)
+            values[name] = _strip(v, data, path, holes)
+            path.pop()
+        if all(values[name] is v for name, v in value.__dict__.items()):
+            return value
+        model = value.__class__.__new__(value.__class__)
+        object.__setattr__(model, '__dict__', values)
+        object.__setattr__(model, '__fields_set__', set(value.__fields_set__))
+        return model
+    if type(value) is list:
+        items = []
+        for i, v in enumerate(value):
+            path.append(i)
+            items.append(_strip(v, data, path, holes))
+            path.pop()
+        if all(a is b for a, b in zip(items, value)):
+            return value
+        return items
+    return value
+
+
+def _fill(skeleton, holes, floats):
+    """Put the float lists back into a stripped value and return it."""
+    for path, offset, shape in holes:
+        if len(shape) == 1:
+            value = floats[offset:offset + shape[0]].tolist()
+        else:
+            rows, width = shape
+            flat = floats[offset:offset + rows * width].tolist()
+            value = [flat[i:i + width] for i in range(0, rows * width, width)]
+        if not path:
+            return value
+        parent = skeleton
+        for key in path[:-1]:
+            parent = parent.__dict__[key] if type(key) is str else parent[key]
+        if type(path[-1]) is str:
+            # set directly since the value was validated before it was packed
+            parent.__dict__[path[-1]] = value
+        else:
+            parent[path[-1]] = value
+    return skeleton
+
+
+def _pack(model, data):
+    """Return the packed (skeleton, holes) state of a model."""
+    holes = []
+    return _strip(model, data, [], holes), holes
+
+
+def _as_floats(buffer):
+    view = memoryview(buffer)
+    return view.cast('B').cast('d') if view.format != 'd' else view
+
+
+def _rebuild(state, buffer):
+    skeleton, holes = state
+    return _fill(skeleton, holes, _as_floats(buffer))
+
+
+class PackedModel(object):
+    """A model prepared for fast pickling. It unpickles as the original model.
+
+    Args:
+        model: A validated model.
+    """
+    __slots__ = ('state', 'data')
+
+    def __init__(self, model):
+        self.data = array('d')
+        self.state = _pack(model, self.data)
+
+    def unpack(self):
+        """Return a new model from the packed state without validating it."""
+        skeleton, holes = copy.deepcopy(self.state)
+        return _fill(skeleton, holes, self.data)
+
+    def __reduce_ex__(self, protocol):
+        if protocol >= 5 and hasattr(pickle, 'PickleBuffer'):
+            return _rebuild, (self.state, pickle.PickleBuffer(self.data))
+        return _rebuild, (self.state, self.data.tobytes())
+
+
+def pack(model):
+    """Return a PackedModel that pickles faster than the model and unpickles as it."""
+    return PackedModel(model)
+
+
+def dumps(models, protocol=5):
+    """Pickle a list of models with the float buffers sent out-of-band.
+
+    Returns:
+        A tuple with the pickle bytes and a list of buffers. Pass both to loads.
+    """
+    buffers = []
+    payload = pickle.dumps([pack(m) for m in models], protocol=protocol,
+                           buffer_callback=buffers.append)
+    return payload, [b.raw() for b in buffers]
+
+
+def loads(payload, buffers=()):
+    """Load a list of models pickled with dumps."""
+    return pickle.loads(payload, buffers=buffers)
+
+
+class SharedModelRef(object):
+    """Reference to a model in a SharedModels block. It unpickles as the model."""
+    __slots__ = ('name', 'state', 'offset', 'count')
+
+    def __init__(self, name, state, offset, count):
+        self.name = name
+        self.state = state
+        self.offset = offset
+        self.count = count
+
+    def load(self):
+        """Return the model, attaching to the shared memory block if needed."""
+        state = copy.deepcopy(self.state)
+        return _load_shared(self.name, state, self.offset, self.count)
+
+    def __reduce__(self):
+        return _load_shared, (self.name, self.state, self.offset, self.count)
+
+
+def _attach(name):
+    """Attach to a block without registering it with the resource tracker.
+
+    Only the process that created the block unlinks it, so workers must not ask the
+    resource tracker to remove it when they exit.
+    """
+    try:
+        return shared_memory.SharedMemory(name, track=False)
+    except TypeError:  # Python < 3.13 does not have the track argument
+        with _TRACKER_LOCK:
+            register = resource_tracker.register
+            resource_tracker.register = lambda *args: None
+            try:
+                return shared_memory.SharedMemory(name)
+            finally:
+                resource_tracker.register = register
+
+
+def _load_shared(name, state, offset, count):
+    skeleton, holes = state
+    block = _attach(name)
+    try:
+        # _fill copies the floats into lists, so the model keeps no view of the block
+        with block.buf.cast('d') as floats, floats[offset:offset + count] as view:
+            return _fill(skeleton, holes, view)
+    finally:
+        block.close()
+
+
+class SharedModels(object):
+    """Put the float data of a batch of models into one block of shared memory.
+
+    The block stays available until close is called or the context manager exits.
+    Only the process that created the block should close it.
+
+    Args:
+        models: A list of validated models.
+    """
+
+    def __init__(self, models):
+        if shared_memory is None:
+            raise RuntimeError('Shared memory requires Python 3.8 or later.')
+        data = array('d')
+        states = []
+        for model in models:
+            # float offsets in each state are relative to the model's own slice
+            floats = array('d')
+            state = _pack(model, floats)
+            states.append((state, len(data), len(floats)))
+            data.extend(floats)
+        with _TRACKER_LOCK:
+            self.block = shared_memory.SharedMemory(
+                create=True, size=max(data.itemsize * len(data), 1))
+        if data:
+            self.block.buf[:data.itemsize * len(data)] = data.tobytes()
+        self.refs = [SharedModelRef(self.block.name, state, offset, count)
+                     for state, offset, count in states]
+
+    def close(self):
+        """Release and remove the shared memory block."""
+        self.block.close()
+        self.block.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
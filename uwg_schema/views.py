@@ -0,0 +1,82 @@
+"""Compact read-only views of validated models.
+
+A view is a namedtuple with the same attribute names as its model. Nested models
+become nested views and lists become tuples, so views are immutable, hashable, use
+no per-instance dictionary and pickle to a fraction of the size of the models.
+
+.. code-block:: python
+
+    view = to_view(element)
+    view.material_lst[0].thermalcond
+    element = from_view(view)
+"""
+from collections import namedtuple
+
+from pydantic import BaseModel
+
+from .model import UWG
+from .ref_bld_template import Material, Element, Building, BEMDef, SchDef
+
+
+def _view_class(model):
+    view = namedtuple('{}View'.format(model.__name__), list(model.__fields__))
+    view.__module__ = __name__  # so that views can be pickled
+    view.__doc__ = 'Read-only view of a {} model.'.format(model.__name__)
+    return view
+
+
+MaterialView = _view_class(Material)
+ElementView = _view_class(Element)
+BuildingView = _view_class(Building)
+BEMDefView = _view_class(BEMDef)
+SchDefView = _view_class(SchDef)
+UWGView = _view_class(UWG)
+
+VIEWS = {
+    Material: MaterialView,
+    Element: ElementView,
+    Building: BuildingView,
+    BEMDef: BEMDefView,
+    SchDef: SchDefView,
+    UWG: UWGView
+}
+MODELS = {view: model for model, view in VIEWS.items()}
+
+
+def to_view(model):
+    """Return a read-only view of a validated model.
+
+    Args:
+        model: A Material, Element, Building, BEMDef, SchDef or UWG model.
+    """
+    try:
+        view = VIEWS[type(model)]
+    except KeyError:
+        raise TypeError('No view is defined for {}.'.format(type(model).__name__))
+    return view._make(_freeze(model.__dict__[name]) for name in model.__fields__)
+
+
+def from_view(view):
+    """Return the model for a view without validating it again."""
+    try:
+        model = MODELS[type(view)]
+    except KeyError:
+        raise TypeError('{} is not a view of a model.'.format(type(view).__name__))
+    return model.construct(**{name: _thaw(value)
+                              for name, value in zip(view._fields, view)})
+
+
+def _freeze(value):
+    if isinstance(value, BaseModel):
+        return to_view(value)
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _thaw(value):
+    if type(value) in MODELS:
+        return from_view(value)
+    if isinstance(value, tuple):
+        return [_thaw(v) for v in value]
+    return value
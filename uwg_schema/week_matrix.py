@@ -0,0 +1,423 @@
+"""Weekly schedule matrices and their compact binary JSON encoding.
+
+A WEEK_MATRIX is a 3 x 24 matrix of numbers for the hours of a weekday, a Saturday
+and a Sunday. As JSON text the seven schedules of a SchDef make up almost all of its
+size. Every WEEK_MATRIX field also accepts an EncodedWeekMatrix object with the 72
+values as base64 encoded little-endian float64, float32 or uint8 numbers:
+
+.. code-block:: python
+
+    {
+        "type": "EncodedWeekMatrix",
+        "encoding": "uint8",
+        "data": "Dw8PDw8PFBQUFBQU...",
+        "scale": 100,
+        "offset": 0
+    }
+
+Each uint8 number q is decoded to (q + offset) / scale. With a scale of 100,
+fractions with two decimal places such as occupancy schedules are stored exactly.
+
+Encoded matrices are decoded before validation. Use compact_dict or compact_json to
+write a model with encoded matrices.
+
+Models hold regular nested lists unless they are validated inside a
+run_length_matrices block. Their week matrices are then stored as a RunLengthMatrix,
+which keeps one value per run of equal hours. Schedules are mostly piecewise
+constant, so this takes a fraction of the memory of the nested lists of a large
+reference library:
+
+.. code-block:: python
+
+    with run_length_matrices():
+        library = [SchDef.parse_obj(d) for d in schdefs]
+
+A RunLengthMatrix can be read like a nested list and compares equal to its nested
+list. The dict and json methods of the models return nested lists.
+"""
+import base64
+import json
+import sys
+from array import array
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+
+from pydantic import BaseModel, Field, conlist
+from pydantic.fields import SHAPE_LIST
+
+from ._base import NoExtraBaseModel, type_tag
+
+WEEK_MATRIX = \
+    conlist(conlist(float, min_items=24, max_items=24),
+            min_items=3, max_items=3)
+
+# number of values in a week matrix
+WEEK_SIZE = 72
+ENCODINGS = ('float64', 'float32', 'uint8')
+_TYPECODES = {'float64': 'd', 'float32': 'f', 'uint8': 'B'}
+_ENCODED_KEYS = {'type', 'encoding', 'data', 'scale', 'offset'}
+# uint8 scales tried in order when the scale is not given
+_UINT8_SCALES = (1, 2, 4, 5, 10, 20, 25, 50, 100)
+
+
+class EncodedWeekMatrix(NoExtraBaseModel):
+    """Binary encoding of a 3 x 24 week matrix."""
+
+    type: type_tag('EncodedWeekMatrix') = 'EncodedWeekMatrix'
+
+    encoding: str = Field(
+        ...,
+        regex='^(float64|float32|uint8)$',
+        description='Text for the type of the encoded numbers. Choose from: '
+        '"float64", "float32", "uint8".'
+    )
+
+    data: str = Field(
+        ...,
+        description='Base64 encoded little-endian numbers for the 72 values of the '
+        'matrix in row order.'
+    )
+
+    scale: float = Field(
+        1,
+        gt=0,
+        description='Number of uint8 steps per unit. Each uint8 number q is decoded '
+        'to (q + offset) / scale. Not used for float encodings.'
+    )
+
+    offset: float = Field(
+        0,
+        description='Number of steps added to every uint8 number before it is '
+        'divided by the scale. Not used for float encodings.'
+    )
+
+
+def decode(value):
+    """Return a 3 x 24 nested list from an EncodedWeekMatrix or its dictionary."""
+    if isinstance(value, EncodedWeekMatrix):
+        value = value.dict()
+    # check the dictionary by hand since this runs for every schedule of a payload
+    extra = set(value) - _ENCODED_KEYS
+    if extra:
+        raise ValueError('Unexpected keys in EncodedWeekMatrix: {}.'.format(
+            ', '.join(sorted(extra))))
+    if value.get('type', 'EncodedWeekMatrix') != 'EncodedWeekMatrix':
+        raise ValueError('The type of an encoded week matrix must be '
+                         'EncodedWeekMatrix. Got: {}.'.format(value['type']))
+    encoding = value.get('encoding')
+    if encoding not in _TYPECODES:
+        raise ValueError('The encoding of an EncodedWeekMatrix must be one of {}. '
+                         'Got: {}.'.format(ENCODINGS, encoding))
+    numbers = array(_TYPECODES[encoding])
+    try:
+        numbers.frombytes(base64.b64decode(value.get('data'), validate=True))
+    except (TypeError, ValueError):
+        raise ValueError('The data of an EncodedWeekMatrix must be base64 text for '
+                         '{} {} numbers.'.format(WEEK_SIZE, encoding))
+    if len(numbers) != WEEK_SIZE:
+        raise ValueError('An EncodedWeekMatrix must have {} numbers. Got: {}.'.format(
+            WEEK_SIZE, len(numbers)))
+    if encoding == 'uint8':
+        scale, offset = value.get('scale', 1), value.get('offset', 0)
+        if not isinstance(scale, (int, float)) or not scale > 0 or \
+                not isinstance(offset, (int, float)):
+            raise ValueError('The scale of an EncodedWeekMatrix must be a number '
+                             'greater than 0 and the offset must be a number.')
+        values = [(q + offset) / scale for q in numbers]
+    else:
+        if sys.byteorder == 'big':
+            numbers.byteswap()
+        values = numbers.tolist()
+    return [values[0:24], values[24:48], values[48:72]]
+
+
+def encode(matrix, encoding='auto', scale=None, offset=None):
+    """Return an EncodedWeekMatrix dictionary for a 3 x 24 matrix.
+
+    Args:
+        matrix: A 3 x 24 nested list of numbers.
+        encoding: One of float64, float32 or uint8. The default auto uses the
+            smallest encoding that decodes to the exact same values. (Default: auto).
+        scale: Optional scale for uint8. By default the smallest scale up to 100
+            that stores the values exactly is used. If there is none, the values are
+            quantized to 255 steps between the minimum and maximum value.
+        offset: Optional offset for uint8 in steps. Defaults to the minimum value
+            times the scale.
+    """
+    values = [float(v) for row in matrix for v in row]
+    if len(values) != WEEK_SIZE:
+        raise ValueError('A week matrix must have {} values. Got: {}.'.format(
+            WEEK_SIZE, len(values)))
+    if encoding == 'auto':
+        params = _uint8_params(values, scale, offset, exact=True)
+        if params is not None:
+            return _encode(values, 'uint8', *params)
+        as_float32 = array('f', values)
+        encoding = 'float32' if as_float32.tolist() == values else 'float64'
+        return _encode(values, encoding)
+    if encoding == 'uint8':
+        return _encode(values, 'uint8', *_uint8_params(values, scale, offset))
+    if encoding not in _TYPECODES:
+        raise ValueError('Unsupported week matrix encoding: {}. Choose from '
+                         '{}.'.format(encoding, ENCODINGS))
+    return _encode(values, encoding)
+
+
+def _uint8_params(values, scale=None, offset=None, exact=False):
+    """Return the (scale, offset) of a uint8 encoding.
+
+    None is returned if exact is True and the values cannot be stored exactly.
+    """
+    for s in ((scale,) if scale is not None else _UINT8_SCALES):
+        steps = [round(v * s) for v in values]
+        if any(n / s != v for n, v in zip(steps, values)):
+            continue
+        o = min(steps) if offset is None else offset
+        if min(steps) - o >= 0 and max(steps) - o <= 255:
+            return s, o
+    if exact:
+        return None
+    # quantize the values to 255 steps between the minimum and maximum
+    low, high = min(values), max(values)
+    if scale is None:
+        scale = 255 / (high - low) if high > low else 1
+    if offset is None:
+        offset = low * scale
+    if round(low * scale - offset) < 0 or round(high * scale - offset) > 255:
+        raise ValueError('The week matrix values from {} to {} do not fit in uint8 '
+                         'numbers with a scale of {} and an offset of {}.'.format(
+                             low, high, scale, offset))
+    return scale, offset
+
+
+def _encode(values, encoding, scale=1, offset=0):
+    if encoding == 'uint8':
+        numbers = array('B', [int(round(v * scale - offset)) for v in values])
+    else:
+        numbers = array(_TYPECODES[encoding], values)
+        if sys.byteorder == 'big':
+            numbers.byteswap()
+    data = {
+        'type': 'EncodedWeekMatrix', 'encoding': encoding,
+        'data': base64.b64encode(numbers.tobytes()).decode('ascii')
+    }
+    if encoding == 'uint8':
+        data['scale'] = scale
+        data['offset'] = offset
+    return data
+
+
+@lru_cache(maxsize=4096)
+def _run_index(ends):
+    """Return bytes with the run number of each of the 72 hours of the run ends."""
+    index = array('B')
+    start = 0
+    for run, end in enumerate(ends):
+        index.extend(array('B', [run]) * (end - start))
+        start = end
+    return index.tobytes()
+
+
+class RunLengthMatrix(object):
+    """Read-only 3 x 24 week matrix stored as runs of equal values.
+
+    The matrix reads like a nested list: matrix[day][hour] returns the value of an
+    hour from a row that is expanded on demand, and value(day, hour) returns it
+    without expanding the row. Matrices with the same runs are equal and have the
+    same hash, and a matrix is equal to the nested list of its values.
+
+    Args:
+        values: The value of each run in hour order. Runs can cross days.
+        ends: The index after the last hour of each run. The last end must be 72.
+    """
+    __slots__ = ('values', 'ends', '_index')
+
+    def __init__(self, values, ends):
+        self.values = tuple(values)
+        self.ends = tuple(ends)
+        assert len(self.values) == len(self.ends) and self.ends[-1] == WEEK_SIZE, \
+            'A RunLengthMatrix must have one end per value and end at {}.'.format(
+                WEEK_SIZE)
+        assert all(a < b for a, b in zip((0,) + self.ends, self.ends)), \
+            'The run ends of a RunLengthMatrix must be increasing.'
+        self._index = _run_index(self.ends)
+
+    @classmethod
+    def from_matrix(cls, matrix):
+        """Create a RunLengthMatrix from a 3 x 24 nested list."""
+        values, ends = [], []
+        count = 0
+        for row in matrix:
+            for value in row:
+                count += 1
+                if values and value == values[-1]:
+                    ends[-1] = count
+                else:
+                    values.append(value)
+                    ends.append(count)
+        return cls(values, ends)
+
+    def value(self, day, hour):
+        """Return the value of an hour of a day."""
+        return self.values[self._index[day * 24 + hour]]
+
+    def tolist(self):
+        """Return the 3 x 24 nested list of the values."""
+        return [self[day] for day in range(3)]
+
+    def __len__(self):
+        return 3
+
+    def __getitem__(self, day):
+        if isinstance(day, slice):
+            return [self[d] for d in range(3)[day]]
+        start = (0, 24, 48)[day]
+        values = self.values
+        return [values[run] for run in self._index[start:start + 24]]
+
+    def __iter__(self):
+        for day in range(3):
+            yield self[day]
+
+    def __eq__(self, other):
+        if isinstance(other, RunLengthMatrix):
+            return self.values == other.values and self.ends == other.ends
+        if isinstance(other, list):
+            return self.tolist() == other
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self.values, self.ends))
+
+    def __reduce__(self):
+        return RunLengthMatrix, (self.values, self.ends)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __repr__(self):
+        return 'RunLengthMatrix(values={}, ends={})'.format(self.values, self.ends)
+
+
+# True inside a run_length_matrices block of the current thread or asyncio task
+_run_length = ContextVar('run_length', default=False)
+
+
+@contextmanager
+def run_length_matrices(enabled=True):
+    """Store the week matrices of the models validated in the block as RunLengthMatrix.
+
+    The setting only applies to the current thread or asyncio task and is restored
+    when the block exits. Models keep their matrices after the block.
+
+    Args:
+        enabled: Set to False to validate regular nested lists inside an enclosing
+            block. (Default: True).
+    """
+    token = _run_length.set(bool(enabled))
+    try:
+        yield
+    finally:
+        _run_length.reset(token)
+
+
+class WeekMatrixModel(NoExtraBaseModel):
+    """Base class of the models with WEEK_MATRIX fields.
+
+    The dict and json methods return the nested list of every RunLengthMatrix.
+    """
+
+    @classmethod
+    def _get_value(cls, v, to_dict, *args, **kwargs):
+        if to_dict and isinstance(v, RunLengthMatrix):
+            return v.tolist()
+        return super()._get_value(v, to_dict, *args, **kwargs)
+
+
+def decode_week_matrix(cls, value):
+    """Validator that decodes an EncodedWeekMatrix before the matrix is validated."""
+    if isinstance(value, (dict, EncodedWeekMatrix)):
+        return decode(value)
+    if isinstance(value, RunLengthMatrix):
+        return value.tolist()
+    return value
+
+
+def run_length_week_matrix(cls, value):
+    """Validator that stores a valid matrix as a RunLengthMatrix if it is enabled."""
+    if _run_length.get():
+        return RunLengthMatrix.from_matrix(value)
+    return value
+
+
+def week_matrix_fields(model):
+    """Return the names of the WEEK_MATRIX fields of a model class."""
+    return tuple(name for name, field in model.__fields__.items()
+                 if field.outer_type_ is WEEK_MATRIX)
+
+
+def schema_extra(schema, model):
+    """Document the EncodedWeekMatrix alternative for every WEEK_MATRIX property."""
+    encoded = EncodedWeekMatrix.schema()
+    for name in week_matrix_fields(model):
+        prop = schema['properties'][name]
+        matrix = {k: v for k, v in prop.items()
+                  if k not in ('title', 'description', 'default')}
+        new = {k: v for k, v in prop.items() if k not in matrix}
+        new['anyOf'] = [matrix, encoded]
+        schema['properties'][name] = new
+
+
+def compact_dict(model, encoding='auto', **kwargs):
+    """Return the dictionary of a model with every week matrix encoded.
+
+    Args:
+        model: A validated model.
+        encoding: The encoding of the matrices (see encode). (Default: auto).
+        kwargs: Optional keyword arguments for the dict method of the model.
+    """
+    return _compact(type(model), model.dict(**kwargs), encoding,
+                    kwargs.get('by_alias', False))
+
+
+def compact_json(model, encoding='auto', include=None, exclude=None, by_alias=False,
+                 exclude_unset=False, exclude_defaults=False, exclude_none=False,
+                 **dumps_kwargs):
+    """Return the compact JSON text of a model with every week matrix encoded.
+
+    Like the json method of the model, the include, exclude, by_alias and
+    exclude_* arguments are used for the dictionary of the model and the other
+    keyword arguments are passed to json.dumps.
+
+    Args:
+        model: A validated model.
+        encoding: The encoding of the matrices (see encode). (Default: auto).
+        dumps_kwargs: Optional keyword arguments for json.dumps.
+    """
+    data = compact_dict(
+        model, encoding, include=include, exclude=exclude, by_alias=by_alias,
+        exclude_unset=exclude_unset, exclude_defaults=exclude_defaults,
+        exclude_none=exclude_none)
+    dumps_kwargs.setdefault('separators', (',', ':'))
+    return json.dumps(data, **dumps_kwargs)
+
+
+def _compact(model, data, encoding, by_alias):
+    for name, field in model.__fields__.items():
+        key = field.alias if by_alias else name
+        if key not in data or data[key] is None:
+            continue
+        if field.outer_type_ is WEEK_MATRIX:
+            data[key] = encode(data[key], encoding)
+        elif isinstance(field.type_, type) and issubclass(field.type_, BaseModel):
+            # the model class is used since exclude can drop items of a list
+            if field.shape == SHAPE_LIST:
+                data[key] = [_compact(field.type_, d, encoding, by_alias)
+                             for d in data[key]]
+            else:
+                data[key] = _compact(field.type_, data[key], encoding, by_alias)
+    return data
@@ -0,0 +1,290 @@
+"""Precomputed simulation windows and a lazily parsed EPW weather file reader.
+
+The month, day, nday, dtsim and dtweather fields of a UWG model define which rows of
+the EPW weather file are simulated and at which time step. plan_window turns them
+into integer index arrays with one item per simulation step:
+
+.. code-block:: python
+
+    epw = open_epw('SGP_Singapore.486980_IWEC.epw')
+    window = plan_window(model, epw)
+    window.weather_row[n]  # EPW data row of step n
+    window.day_type[n], window.hour[n]  # row and column of the week matrices
+    window.veg_active[n]  # 1 from the start of vegstart to the end of vegend
+    weather = window.weather(epw, ('dry_bulb_temperature', 'wind_speed'))
+
+Windows only depend on the fields returned by window_key, the first weekday of
+the weather file and whether it has the 366 days of a leap year. They are cached
+and the same window object is shared by every model with the same key, so its
+arrays must not be modified.
+"""
+import mmap
+import os
+from array import array
+from functools import lru_cache
+
+from ._cache import LRUCache
+
+EPW_FIELDS = (
+    'year', 'month', 'day', 'hour', 'minute', 'data_source', 'dry_bulb_temperature',
+    'dew_point_temperature', 'relative_humidity', 'atmospheric_station_pressure',
+    'extraterrestrial_horizontal_radiation', 'extraterrestrial_direct_normal_radiation',
+    'horizontal_infrared_radiation_intensity', 'global_horizontal_radiation',
+    'direct_normal_radiation', 'diffuse_horizontal_radiation',
+    'global_horizontal_illuminance', 'direct_normal_illuminance',
+    'diffuse_horizontal_illuminance', 'zenith_luminance', 'wind_direction',
+    'wind_speed', 'total_sky_cover', 'opaque_sky_cover', 'visibility',
+    'ceiling_height', 'present_weather_observation', 'present_weather_codes',
+    'precipitable_water', 'aerosol_optical_depth', 'snow_depth',
+    'days_since_last_snowfall', 'albedo', 'liquid_precipitation_depth',
+    'liquid_precipitation_quantity')
+EPW_HEADER_LINES = 8
+WEEKDAYS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday',
+            'Sunday')
+MONTH_DAYS = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+LEAP_MONTH_DAYS = (31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+# row of the week matrices for each weekday from Monday to Sunday
+DAY_TYPES = (0, 0, 0, 0, 0, 1, 2)
+
+# month of each day of a non-leap and a leap year
+_DAY_MONTHS = tuple(m + 1 for m, days in enumerate(MONTH_DAYS) for _ in range(days))
+_LEAP_DAY_MONTHS = tuple(
+    m + 1 for m, days in enumerate(LEAP_MONTH_DAYS) for _ in range(days))
+
+
+class EPWReader(object):
+    """Memory-mapped EPW file that only parses the rows that are read.
+
+    The file is indexed the first time a row is read. Use open_epw to share one
+    reader per version of a file. The memory map is closed by close, at the end of
+    a with statement or when the last reference to the reader is released.
+
+    Args:
+        path: Path to an EPW file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as inf:
+            self._mmap = mmap.mmap(inf.fileno(), 0, access=mmap.ACCESS_READ)
+        self._header = None
+        self._offsets = None
+
+    @property
+    def header(self):
+        """List of the header lines of the file."""
+        if self._header is None:
+            self._index()
+        return self._header
+
+    @property
+    def first_weekday(self):
+        """Weekday of the first data row from 0 (Monday) to 6 (Sunday)."""
+        data_periods = self.header[7].split(',')
+        return WEEKDAYS.index(data_periods[4].strip().capitalize())
+
+    @property
+    def leap_year(self):
+        """True if the data rows cover the 366 days of a leap year."""
+        return len(self) % 366 == 0
+
+    def __len__(self):
+        if self._offsets is None:
+            self._index()
+        return len(self._offsets) - 1
+
+    def row(self, index):
+        """Return the text fields of a data row."""
+        if self._offsets is None:
+            self._index()
+        start, stop = self._offsets[index], self._offsets[index + 1]
+        return self._mmap[start:stop].decode('ascii').rstrip('\r\n').split(',')
+
+    def columns(self, names, start=0, stop=None):
+        """Return a dictionary with a float array for each named field.
+
+        Args:
+            names: A sequence of names from EPW_FIELDS.
+            start: Index of the first data row. (Default: 0).
+            stop: Index after the last data row. Defaults to the end of the file.
+        """
+        indices = [EPW_FIELDS.index(name) for name in names]
+        stop = len(self) if stop is None else stop
+        columns = [array('d') for _ in indices]
+        for i in range(start, stop):
+            fields = self.row(i)
+            for column, j in zip(columns, indices):
+                column.append(float(fields[j]))
+        return dict(zip(names, columns))
+
+    @property
+    def closed(self):
+        """True if the memory map is closed."""
+        return self._mmap.closed
+
+    def close(self):
+        """Close the memory map."""
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _index(self):
+        mm = self._mmap
+        header = []
+        pos = 0
+        for _ in range(EPW_HEADER_LINES):
+            end = mm.find(b'\n', pos)
+            header.append(mm[pos:end].decode('latin-1').rstrip('\r'))
+            pos = end + 1
+        offsets = array('q')
+        size = len(mm)
+        while pos < size:
+            offsets.append(pos)
+            end = mm.find(b'\n', pos)
+            pos = size if end == -1 else end + 1
+        offsets.append(size)
+        self._header = header
+        self._offsets = offsets
+
+
+# EPWReader for each (path, mtime, size) of the 16 most recently opened files
+_readers = LRUCache(maxsize=16)
+
+
+def open_epw(path):
+    """Return a shared EPWReader for a path, reopened if the file has changed.
+
+    The cache does not close the readers that it evicts. The memory map of a reader
+    stays open until its last reference is released or it is closed, after which
+    open_epw returns a new reader for the file.
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    reader = _readers.get(key)
+    if reader is None or reader.closed:
+        reader = EPWReader(path)
+        _readers.put(key, reader)
+    return reader
+
+
+def window_key(model):
+    """Return the tuple of UWG fields that define the simulation window of a model."""
+    return (model.month, model.day, model.nday, model.dtsim, model.dtweather,
+            model.vegstart, model.vegend)
+
+
+class SimulationWindow(object):
+    """Precomputed index arrays for the steps of a simulation.
+
+    Args:
+        key: The window_key of the models that use this window.
+        first_weekday: Weekday of the first row of the weather file from 0
+            (Monday) to 6 (Sunday).
+        leap_year: Set to True if the weather file has the 366 days of a leap
+            year. (Default: False).
+    """
+    __slots__ = ('key', 'first_weekday', 'leap_year', 'steps_per_weather',
+                 'first_row', 'stop_row', 'weather_row', 'day_type', 'hour',
+                 'veg_active')
+
+    def __init__(self, key, first_weekday, leap_year=False):
+        month, day, nday, dtsim, dtweather, vegstart, vegend = key
+        month_days = LEAP_MONTH_DAYS if leap_year else MONTH_DAYS
+        day_months = _LEAP_DAY_MONTHS if leap_year else _DAY_MONTHS
+        if not 1 <= month <= 12:
+            raise ValueError('The simulation month must be between 1 and 12. '
+                             'Got: {}.'.format(month))
+        if day > month_days[month - 1]:
+            raise ValueError('Month {} does not have a day {}.'.format(month, day))
+        if dtsim <= 0 or dtweather <= 0 or dtweather % dtsim or 86400 % dtweather:
+            raise ValueError('dtsim must evenly divide dtweather and dtweather must '
+                             'evenly divide a day. Got: {} and {}.'.format(
+                                 dtsim, dtweather))
+        start = sum(month_days[:month - 1]) + day - 1
+        if start + nday > len(day_months):
+            raise ValueError('The simulation of {} days from {}/{} goes past the end '
+                             'of the year.'.format(nday, month, day))
+        self.key = key
+        self.first_weekday = first_weekday
+        self.leap_year = leap_year
+        self.steps_per_weather = dtweather // dtsim
+        day_steps = 86400 // dtsim
+        rows_per_day = 86400 // dtweather
+        row_offsets = [s * dtsim // dtweather for s in range(day_steps)]
+        hours = array('b', [s * dtsim // 3600 for s in range(day_steps)])
+        self.weather_row = array('l')
+        self.day_type = array('b')
+        self.hour = array('b')
+        self.veg_active = array('b')
+        for d in range(start, start + nday):
+            first = d * rows_per_day
+            self.weather_row.extend([first + r for r in row_offsets])
+            day_type = DAY_TYPES[(first_weekday + d) % 7]
+            self.day_type.extend(array('b', [day_type]) * day_steps)
+            self.hour.extend(hours)
+            active = int(vegstart <= day_months[d] <= vegend)
+            self.veg_active.extend(array('b', [active]) * day_steps)
+        self.first_row = start * rows_per_day
+        self.stop_row = (start + nday) * rows_per_day
+
+    def __len__(self):
+        return len(self.weather_row)
+
+    def weather(self, epw, names):
+        """Return the named EPW fields for the rows of the window.
+
+        Args:
+            epw: An EPWReader or the path to an EPW file.
+            names: A sequence of names from EPW_FIELDS.
+
+        Returns:
+            A dictionary with a float array for each name. Index the arrays with
+            weather_row[n] - first_row for the value at step n.
+        """
+        if not isinstance(epw, EPWReader):
+            epw = open_epw(epw)
+        return epw.columns(names, self.first_row, self.stop_row)
+
+    def __repr__(self):
+        return 'SimulationWindow({}, steps={})'.format(self.key, len(self))
+
+
+@lru_cache(maxsize=256)
+def _plan(key, first_weekday, leap_year):
+    return SimulationWindow(key, first_weekday, leap_year)
+
+
+def plan_window(model, epw=None, first_weekday=None, leap_year=None):
+    """Return the shared SimulationWindow of a UWG model.
+
+    Args:
+        model: A validated UWG model.
+        epw: Optional EPWReader or path to the EPW file of the simulation. It is
+            used to get the weekday of the first row of the weather data and
+            whether the file has the 366 days of a leap year.
+        first_weekday: Optional weekday of the first row of the weather data from 0
+            (Monday) to 6 (Sunday). Required if epw is None.
+        leap_year: Optional boolean to note whether the weather data has the 366
+            days of a leap year. Defaults to the leap_year of the epw or to False
+            if epw is None.
+    """
+    if first_weekday is None or leap_year is None:
+        if epw is None and first_weekday is None:
+            raise ValueError('Either epw or first_weekday must be given.')
+        if epw is not None and not isinstance(epw, EPWReader):
+            epw = open_epw(epw)
+        if first_weekday is None:
+            first_weekday = epw.first_weekday
+        if leap_year is None:
+            leap_year = epw.leap_year if epw is not None else False
+    return _plan(window_key(model), first_weekday, leap_year)
+
+
+def window_cache_info():
+    """Return the functools cache info of the shared windows."""
+    return _plan.cache_info()